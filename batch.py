@@ -0,0 +1,244 @@
+#!/usr/local/bin/python3
+'''
+Solves many River Crossing puzzles at once across a pool of worker processes.
+
+Results are given back as soon as each puzzle is solved, as dictionaries like:
+    {"name": "Expert40", "solved": true, "solution": [["walk", 15], ...],
+     "rc_solution": "UX-IX GI-GQ ...", "nodes_expanded": 18688, "wall_time": 0.12,
+     "stats": {...}}
+"rc_solution" is only there if the puzzle has a translator;
+...puzzles that fail (or that a puzzle file gets wrong) get {"name": ..., "solved": false,
+...and "error": ...} instead;
+..."stats" is the solver's node_solvers.SolverStats, and is only there if asked for.
+With a time limit, each puzzle gets the best solution found within it (see
+...node_solvers.NodeSolver.solve_within, which looks for the fewest moves whichever solver is used)
+...and a "status" entry: "optimal", "feasible", "unsolvable" or "unknown".
+
+Can be run from the command line; see `python3 batch.py --help`.
+Puzzle files have one JSON object per line, like:
+    {"name": "Beginner1", "start": 32, "finish": 4, "pegs": [4, 14, 13, 23, 22, 32],
+     "planks": [[32, 22], [22, 23]]}
+...with optional "held_plank" and "translator" ({peg: RC character}) entries,
+...and optional "width", "height" and "plank_lengths" entries for boards that aren't
+...the usual size (see geometry.BoardGeometry).
+
+See terms.txt for the types of the different terms.
+'''
+
+import argparse
+import inspect
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union, Any
+import puzzles
+from bitboard import CompactPuzzle, State
+from framework import Board, Move, check_planks, get_plank
+from geometry import DEFAULT_GEOMETRY, get_geometry
+from node_solvers import NodeSolver, BFSSolver, AStarSolver
+from solvers import (PlankMoveHeuristic, plank_move_cost,
+                     _state_namer) # pylint: disable=protected-access
+from util import PegTranslator, convert_to_rc_solution
+
+# (name, board, translator or None)
+PuzzleJob = Tuple[str, Board, Optional[PegTranslator]]
+Result = Dict[str, Any]
+# takes the puzzle, the starting state and the expander to use, and returns the solver
+SolverCreator = Callable[[CompactPuzzle, State, Callable[[State], List[Move]]], NodeSolver]
+
+def _create_bfs_solver(puzzle: CompactPuzzle, start_state: State, # pylint: disable=unused-argument
+                       expander: Callable[[State], List[Move]]) -> NodeSolver:
+    '''Creates a solver for the fewest moves'''
+    return BFSSolver(_state_namer, puzzle.solved, expander, puzzle.make_move)
+
+def _create_astar_solver(puzzle: CompactPuzzle, start_state: State,
+                         expander: Callable[[State], List[Move]]) -> NodeSolver:
+    '''Creates a solver for the fewest grab and place moves'''
+    return AStarSolver(_state_namer, puzzle.solved, expander, puzzle.make_move,
+                       PlankMoveHeuristic(puzzle, start_state), plank_move_cost)
+
+SOLVERS: Dict[str, SolverCreator] = {
+    'bfs': _create_bfs_solver,
+    'astar': _create_astar_solver,
+}
+
+
+def solve_puzzle(job: PuzzleJob, solver_name: str = 'bfs', with_stats: bool = False,
+                 time_limit: Optional[float] = None) -> Result:
+    '''
+    Solves a single puzzle and returns its result.
+    with_stats: also time the solver's functions (which slows it down) and add its stats
+    time_limit: seconds to give the solver, after which the best solution found so far is used;
+                ...None for no limit
+    '''
+    name, board, translator = job
+    start_time = time.perf_counter()
+    puzzle = CompactPuzzle(board)
+    start_state = puzzle.encode(board)
+
+    # counting calls to the expander is cheap enough to always do, unlike timing everything
+    nodes_expanded = 0
+    def expander(state: State) -> List[Move]:
+        nonlocal nodes_expanded
+        nodes_expanded += 1
+        return puzzle.get_moves(state)
+
+    solver = SOLVERS[solver_name](puzzle, start_state, expander)
+    stats = solver.enable_stats() if with_stats else None
+    status = None
+    if time_limit is None:
+        solution = solver.solve(start_state)
+    else:
+        budgeted = solver.solve_within(start_state, time_limit,
+                                       heuristic=PlankMoveHeuristic(puzzle, start_state))
+        solution, status = budgeted.solution, budgeted.status
+    result: Result = {
+        'name': name,
+        'solved': solution is not None,
+        'solution': solution,
+        'nodes_expanded': nodes_expanded,
+        'wall_time': time.perf_counter() - start_time,
+    }
+    if status is not None:
+        result['status'] = status
+    if solution is not None and translator is not None:
+        result['rc_solution'] = convert_to_rc_solution(solution, translator, board.person_position)
+    if stats is not None:
+        result['stats'] = stats.to_dict()
+    return result
+
+def solve_puzzles(jobs: Iterable[Union[PuzzleJob, Result]], solver_name: str = 'bfs',
+                  workers: Optional[int] = None, with_stats: bool = False,
+                  time_limit: Optional[float] = None) -> Iterator[Result]:
+    '''
+    Solves every puzzle across a pool of worker processes (None for one per CPU),
+    ...each within the time limit (see solve_puzzle) if there is one.
+    Yields the results in the order the puzzles are solved, not the order they were given.
+    A puzzle that can't be solved because something went wrong gets
+    ...{"name": ..., "solved": false, "error": ...} instead, and the rest are still solved.
+    Results in the jobs (for puzzles read_puzzle_jobs couldn't read) are yielded first, as they are.
+    '''
+    if solver_name not in SOLVERS:
+        raise ValueError("Solver {} not recognized".format(solver_name))
+    with ProcessPoolExecutor(workers) as pool:
+        # {future: name of its puzzle}
+        futures = {}
+        for job in jobs:
+            if isinstance(job, dict):
+                yield job
+            else:
+                futures[pool.submit(solve_puzzle, job, solver_name, with_stats,
+                                    time_limit)] = job[0]
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as error: # pylint: disable=broad-except
+                yield {'name': futures[future], 'solved': False,
+                       'error': '{}: {}'.format(type(error).__name__, error)}
+
+
+def get_catalogue_jobs(names: Optional[Iterable[str]] = None) -> List[PuzzleJob]:
+    '''
+    Returns the puzzles in puzzles.py with the given class names (all of them if None).
+    A puzzle's translator is the <NAME>_TRANSLATOR in puzzles.py, if there is one.
+    '''
+    classes: Dict[str, Callable[[], Board]] = {
+        name: value for name, value in vars(puzzles).items()
+        if inspect.isclass(value) and issubclass(value, Board) and value is not Board}
+    if names is None:
+        names = classes
+    jobs = []
+    for name in names:
+        if name not in classes:
+            raise ValueError("Puzzle {} not recognized".format(name))
+        translator = getattr(puzzles, name.upper() + '_TRANSLATOR', None)
+        jobs.append((name, classes[name](), translator))
+    return jobs
+
+def read_puzzle_job(line: str, line_number: int = 1) -> PuzzleJob:
+    '''
+    Returns the puzzle on a line of a puzzle file (see the top of this file);
+    ...it's named after the line number if it has no name.
+    Raises ValueError if the line isn't a puzzle that could be on a board.
+    '''
+    definition = json.loads(line)
+    try:
+        planks = [get_plank(*plank) for plank in definition['planks']]
+        geometry = get_geometry(definition.get('width', DEFAULT_GEOMETRY.width),
+                                definition.get('height', DEFAULT_GEOMETRY.height),
+                                definition.get('plank_lengths', DEFAULT_GEOMETRY.plank_lengths))
+        start, finish = definition['start'], definition['finish']
+        pegs = [int(peg) for peg in definition['pegs']]
+        held_plank = definition.get('held_plank')
+        translator = definition.get('translator')
+        if translator is not None:
+            # JSON object keys are always strings
+            translator = {int(peg): letter for peg, letter in translator.items()}
+        name = str(definition.get('name', line_number))
+    except (KeyError, TypeError, AttributeError) as error:
+        raise ValueError("Not a puzzle: {}: {}".format(type(error).__name__, error)) from error
+
+    for peg in pegs:
+        if not 0 < peg <= geometry.peg_count:
+            raise ValueError("Peg {} isn't on the board".format(peg))
+    peg_mask = sum(1 << peg for peg in pegs)
+    for peg in (start, finish):
+        if not (isinstance(peg, int) and 0 < peg <= geometry.peg_count and peg_mask >> peg & 1):
+            raise ValueError("Peg {} isn't on the board".format(peg))
+    check_planks(planks, peg_mask, geometry)
+    if held_plank is not None and held_plank not in geometry.plank_lengths:
+        raise ValueError("There is no plank of length {}".format(held_plank))
+    return (name, Board(start, finish, pegs, planks, held_plank, geometry), translator)
+
+def read_puzzle_jobs(lines: Iterable[str]) -> Iterator[Union[PuzzleJob, Result]]:
+    '''
+    Yields the puzzles from the lines of a puzzle file (see the top of this file).
+    A line that isn't a puzzle gets {"name": ..., "solved": false, "error": ...} instead
+    ...(named after its line number unless it has a name), and the rest are still read.
+    '''
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            job: Union[PuzzleJob, Result] = read_puzzle_job(line, line_number)
+        except ValueError as error:
+            job = {'name': _get_line_name(line, line_number), 'solved': False,
+                   'error': 'Line {}: {}'.format(line_number, error)}
+        yield job
+
+def _get_line_name(line: str, line_number: int) -> str:
+    '''Returns the name of the puzzle on a line that might not be a puzzle'''
+    try:
+        return str(json.loads(line)['name'])
+    except (ValueError, TypeError, KeyError):
+        return str(line_number)
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    '''Command line entry point; prints one JSON result per line as puzzles are solved'''
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('names', nargs='*',
+                        help='names of puzzles in puzzles.py (default: all of them)')
+    parser.add_argument('--file', help="file of puzzles to solve instead ('-' for stdin)")
+    parser.add_argument('--solver', default='bfs', choices=sorted(SOLVERS))
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--stats', action='store_true',
+                        help="add the solver's stats to each result (slows solving down)")
+    parser.add_argument('--time-limit', type=float,
+                        help='seconds to give each puzzle before using the best solution so far')
+    parsed = parser.parse_args(arguments)
+
+    if parsed.file == '-':
+        jobs: Iterable[Union[PuzzleJob, Result]] = list(read_puzzle_jobs(sys.stdin))
+    elif parsed.file:
+        with open(parsed.file) as puzzle_file:
+            jobs = list(read_puzzle_jobs(puzzle_file))
+    else:
+        jobs = get_catalogue_jobs(parsed.names or None)
+
+    for result in solve_puzzles(jobs, parsed.solver, parsed.workers, parsed.stats,
+                                parsed.time_limit):
+        print(json.dumps(result), flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/local/bin/python3
+'''
+Times the solvers on every puzzle in puzzles.py and on some generated puzzles,
+...and checks the times against a stored baseline.
+
+Each solver is run on each puzzle in a fresh process, so the peak memory is just that run's.
+Results are saved as JSON like:
+    {"results": {"bfs/Expert40": {"wall_time": 0.81, "peak_rss_kb": 61000,
+                                  "nodes_expanded": 15687, "nodes_per_second": 19000,
+                                  "solution_length": 103}, ...},
+     "generated": [<puzzles in batch.py's format>]}
+"nodes_expanded" and "nodes_per_second" are null for solvers that aren't NodeSolvers.
+The baseline is a results file saved earlier (with --save-baseline).
+
+Can be run from the command line; see `python3 benchmark.py --help`.
+Exits with 1 if anything got slower (or used more memory) than the threshold allows,
+...or if a solver's solution changed length.
+See terms.txt for the types of the different terms.
+'''
+
+import argparse
+import itertools
+import json
+import resource
+import sys
+import time
+from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import batch
+from bitboard import CompactPuzzle, ComponentPuzzle
+from framework import Board, FrozenBoard
+from generator import generate_puzzles
+from external import ExternalBFSSolver
+from frontier import VectorBFSSolver
+from node_solvers import NodeSolver, BFSSolver as GeneralBFSSolver
+from puzzles import SimplePuzzle
+from solvers import (BFSSolver, FrozenBFSSolver, PlankBFSSolver, PlankTargetSolver,
+                     CompactBFSSolver, MacroMoveExpander, ParallelBFSSolver,
+                     BidirectionalBFSSolver, IDDFSSolver, ShortestSolutionsSolver, BudgetedSolver,
+                     IDAStarSolver)
+
+# {'bfs/Expert40': {measurement: value}}
+Results = Dict[str, Dict[str, Any]]
+# takes a board and returns the solver to time (anything with a solve method)
+# ...and the info to start it from (anything done here is not timed)
+BenchmarkSetup = Callable[[Board], Tuple[Any, Any]]
+
+def _setup_bfs(board: Board) -> Tuple[NodeSolver, Any]:
+    '''Searches Board objects for the fewest moves'''
+    return BFSSolver(), board
+
+def _setup_frozen_bfs(board: Board) -> Tuple[NodeSolver, Any]:
+    '''Searches FrozenBoards for the fewest moves'''
+    return FrozenBFSSolver(), FrozenBoard.from_board(board)
+
+def _setup_plank_bfs(board: Board) -> Tuple[NodeSolver, Any]:
+    '''Searches Board objects for the planks being where a shortest solution leaves them'''
+    return PlankBFSSolver(_get_solved_board(board)), board
+
+def _setup_plank_target(board: Board) -> Tuple[Any, Any]:
+    '''Searches compact states for the planks being where a shortest solution leaves them'''
+    return PlankTargetSolver(board), _get_solved_board(board)
+
+def _setup_compact_bfs(board: Board) -> Tuple[NodeSolver, Any]:
+    '''Searches compact states for the fewest moves'''
+    puzzle = CompactPuzzle(board)
+    start_state = puzzle.encode(board)
+    return batch.SOLVERS['bfs'](puzzle, start_state, puzzle.get_moves), start_state
+
+def _setup_component_bfs(board: Board) -> Tuple[NodeSolver, Any]:
+    '''Searches component states for the fewest grab and place moves'''
+    puzzle = ComponentPuzzle(board)
+    solver: NodeSolver = GeneralBFSSolver(lambda state: state, puzzle.solved, puzzle.get_moves,
+                                          puzzle.make_move)
+    return solver, puzzle.encode(board)
+
+def _setup_macro_bfs(board: Board) -> Tuple[NodeSolver, Any]:
+    '''Searches Board objects with macro moves for the fewest grab and place moves'''
+    solver: NodeSolver = GeneralBFSSolver(MacroMoveExpander.namer, MacroMoveExpander.detector,
+                                          MacroMoveExpander.expander, MacroMoveExpander.follower)
+    return solver, MacroMoveExpander.make_node(board)
+
+def _setup_vector_bfs(board: Board) -> Tuple[Any, Any]:
+    '''Searches a layer of compact states at a time with NumPy for the fewest moves'''
+    return VectorBFSSolver(), board
+
+def _setup_external_bfs(board: Board) -> Tuple[Any, Any]:
+    '''Searches compact states for the fewest moves, keeping the layers in files'''
+    return ExternalBFSSolver(), board
+
+def _setup_bidirectional_bfs(board: Board) -> Tuple[Any, Any]:
+    '''Searches compact states from both ends for the fewest moves'''
+    return BidirectionalBFSSolver(), board
+
+def _setup_parallel_bfs(board: Board) -> Tuple[Any, Any]:
+    '''Searches compact states across worker processes for the fewest moves'''
+    # the workers are started here, so starting them isn't timed
+    solver = ParallelBFSSolver()
+    solver.solve(SimplePuzzle())
+    return solver, board
+
+def _setup_iddfs(board: Board) -> Tuple[NodeSolver, Any]:
+    '''Searches deeper and deeper from a Board object for the fewest moves'''
+    return IDDFSSolver(), board
+
+def _setup_shortest_solutions(board: Board) -> Tuple[Any, Any]:
+    '''Searches compact states for every solution with the fewest moves'''
+    return ShortestSolutionsSolver(), board
+
+def _setup_budgeted(board: Board) -> Tuple[Any, Any]:
+    '''Searches compact states for the fewest moves, with no budget'''
+    return BudgetedSolver(), board
+
+def _setup_astar(board: Board) -> Tuple[NodeSolver, Any]:
+    '''Searches compact states for the fewest grab and place moves'''
+    puzzle = CompactPuzzle(board)
+    start_state = puzzle.encode(board)
+    return batch.SOLVERS['astar'](puzzle, start_state, puzzle.get_moves), start_state
+
+def _setup_idastar(board: Board) -> Tuple[Any, Any]:
+    '''Searches compact states deeper and deeper for the fewest grab and place moves'''
+    return IDAStarSolver(), board
+
+def _get_solved_board(board: Board) -> Board:
+    '''Returns the board after a shortest solution'''
+    solved_board = deepcopy(board)
+    for move in CompactBFSSolver().solve(board) or []:
+        solved_board.make_move(move)
+    return solved_board
+
+# add new solvers here to have them benchmarked
+BENCHMARKS: Dict[str, BenchmarkSetup] = {
+    'bfs': _setup_bfs,
+    'frozen-bfs': _setup_frozen_bfs,
+    'plank-bfs': _setup_plank_bfs,
+    'compact-bfs': _setup_compact_bfs,
+    'component-bfs': _setup_component_bfs,
+    'macro-bfs': _setup_macro_bfs,
+    'vector-bfs': _setup_vector_bfs,
+    'external-bfs': _setup_external_bfs,
+    'bidirectional-bfs': _setup_bidirectional_bfs,
+    'parallel-bfs': _setup_parallel_bfs,
+    'iddfs': _setup_iddfs,
+    'shortest-solutions': _setup_shortest_solutions,
+    'budgeted': _setup_budgeted,
+    'plank-target': _setup_plank_target,
+    'astar': _setup_astar,
+    'idastar': _setup_idastar,
+}
+
+
+def _run_benchmark(benchmark_name: str, board: Board) -> Dict[str, Any]:
+    '''
+    Runs one solver on one board (in a fresh worker process) and returns the measurements.
+    Nodes are only counted for NodeSolvers; the rest have None for them.
+    '''
+    solver, start_info = BENCHMARKS[benchmark_name](board)
+    nodes_expanded: Optional[int] = None
+    if isinstance(solver, NodeSolver):
+        nodes_expanded = 0
+        get_moves = solver.get_moves
+        def expander(info: Any) -> Iterable[Any]:
+            nonlocal nodes_expanded
+            nodes_expanded += 1
+            return get_moves(info)
+        solver.get_moves = expander
+
+    try:
+        start_time = time.perf_counter()
+        solution = solver.solve(start_info)
+        wall_time = time.perf_counter() - start_time
+    finally:
+        if hasattr(solver, 'close'):
+            solver.close()
+    # kilobytes on Linux, but bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_rss //= 1024
+    return {'wall_time': wall_time, 'peak_rss_kb': peak_rss, 'nodes_expanded': nodes_expanded,
+            'nodes_per_second': None if nodes_expanded is None
+                                else nodes_expanded / wall_time if wall_time else 0.0,
+            'solution_length': None if solution is None else len(solution)}
+
+def measure(benchmark_name: str, board: Board, repeats: int = 1) -> Dict[str, Any]:
+    '''
+    Runs one solver on one board the given number of times, each in a fresh process,
+    ...and returns the measurements of the fastest run.
+    '''
+    runs = []
+    for _ in range(repeats):
+        with ProcessPoolExecutor(1) as pool:
+            runs.append(pool.submit(_run_benchmark, benchmark_name, board).result())
+    return min(runs, key=lambda run: run['wall_time'])
+
+
+def get_generated_puzzles(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    '''Returns the first `count` generated puzzles that need at least 16 grab and place moves'''
+    return list(itertools.islice(
+        generate_puzzles(1000, seed, peg_count=16, plank_lengths=(1, 2, 2, 3),
+                         min_plank_moves=16), count))
+
+def run_benchmarks(benchmark_names: Iterable[str], boards: Dict[str, Board],
+                   repeats: int = 1) -> Results:
+    '''Runs every solver on every board, printing the measurements as it goes'''
+    results: Results = {}
+    for benchmark_name in benchmark_names:
+        if benchmark_name not in BENCHMARKS:
+            raise ValueError("Solver {} not recognized".format(benchmark_name))
+        for board_name, board in boards.items():
+            key = '{}/{}'.format(benchmark_name, board_name)
+            results[key] = measure(benchmark_name, board, repeats)
+            nodes_per_second = results[key]['nodes_per_second']
+            print('{:40} {:9.4f}s {:8} KB {:>12} nodes/s'.format(
+                key, results[key]['wall_time'], results[key]['peak_rss_kb'],
+                '-' if nodes_per_second is None else '{:.0f}'.format(nodes_per_second)),
+                  flush=True)
+    return results
+
+def compare(results: Results, baseline: Results, threshold: float = 0.25,
+            min_wall_time: float = 0.05) -> List[str]:
+    '''
+    Returns a description of each regression from the baseline:
+    ...a wall time or peak memory more than `threshold` (as a fraction) above the baseline's,
+    ...or a different solution length.
+    Wall times are only compared if the baseline's is at least min_wall_time seconds,
+    ...since shorter times are mostly noise.
+    Runs that aren't in both are ignored.
+    '''
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        old = baseline[key]
+        if result['solution_length'] != old['solution_length']:
+            regressions.append('{}: solution length changed from {} to {}'.format(
+                key, old['solution_length'], result['solution_length']))
+        if (old['wall_time'] >= min_wall_time
+                and result['wall_time'] > old['wall_time'] * (1 + threshold)):
+            regressions.append('{}: wall time went from {:.4f}s to {:.4f}s'.format(
+                key, old['wall_time'], result['wall_time']))
+        if result['peak_rss_kb'] > old['peak_rss_kb'] * (1 + threshold):
+            regressions.append('{}: peak RSS went from {} KB to {} KB'.format(
+                key, old['peak_rss_kb'], result['peak_rss_kb']))
+    return regressions
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    '''Command line entry point; returns the exit code'''
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--solvers', nargs='+', default=list(BENCHMARKS),
+                        choices=sorted(BENCHMARKS))
+    parser.add_argument('--puzzles', nargs='+',
+                        help='names of puzzles in puzzles.py (default: all of them)')
+    parser.add_argument('--generated', type=int, default=3,
+                        help='how many generated puzzles to add (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the generated puzzles')
+    parser.add_argument('--repeats', type=int, default=3,
+                        help='runs of each solver on each puzzle; the fastest is kept')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', default='benchmark_baseline.json')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='save the results as the new baseline instead of comparing')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown as a fraction of the baseline (default: 0.25)')
+    parser.add_argument('--min-wall-time', type=float, default=0.05,
+                        help="don't compare wall times shorter than this many seconds")
+    parsed = parser.parse_args(arguments)
+
+    boards = {name: board for name, board, _ in batch.get_catalogue_jobs(parsed.puzzles)}
+    generated = get_generated_puzzles(parsed.generated, parsed.seed)
+    boards.update((name, board) for name, board, _
+                  in (batch.read_puzzle_job(json.dumps(puzzle)) for puzzle in generated))
+    results = run_benchmarks(parsed.solvers, boards, parsed.repeats)
+
+    with open(parsed.baseline if parsed.save_baseline else parsed.output, 'w') as results_file:
+        json.dump({'results': results, 'generated': generated}, results_file, indent=4)
+    if parsed.save_baseline:
+        return 0
+
+    try:
+        with open(parsed.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+    except FileNotFoundError:
+        print("No baseline at {}; run with --save-baseline to make one".format(parsed.baseline))
+        return 0
+    regressions = compare(results, baseline, parsed.threshold, parsed.min_wall_time)
+    for regression in regressions:
+        print('REGRESSION ' + regression)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+#!/usr/local/bin/python3
+'''
+Compact integer encoding of River Crossing boards
+
+A state is a single integer that holds everything about a board that can change:
+    the planks on the board (one bit per plank slot),
+    the position of the person,
+    and the length of the held plank (0 if there is no held plank).
+
+Everything that can't change (the pegs, the finish and the geometry) is kept once
+...in a CompactPuzzle. Plank slots are the slots of the board's geometry, but the layout of
+...the person and the held plank is the same for every geometry (up to MAX_WIDTH x MAX_HEIGHT),
+...so the functions here that don't deal with planks work for any geometry.
+See terms.txt for the types of the different terms.
+'''
+
+# pylint: disable=too-few-public-methods
+from typing import List, Dict, Tuple, Iterable, Iterator
+from framework import Board, Move, Peg, Plank, find_walks, get_plank, get_walk
+from geometry import BoardGeometry, DEFAULT_GEOMETRY, MAX_WIDTH, MAX_HEIGHT
+
+State = int
+# a bitmask with one bit per plank slot
+PlankMask = int
+
+# state layout, from the least significant bit:
+#     held plank length, person position, plank mask
+HELD_BITS = (max(MAX_WIDTH, MAX_HEIGHT) - 1).bit_length()
+PERSON_BITS = (MAX_WIDTH * MAX_HEIGHT).bit_length()
+PLANK_SHIFT = HELD_BITS + PERSON_BITS
+HELD_MASK = (1 << HELD_BITS) - 1
+PERSON_MASK = (1 << PERSON_BITS) - 1
+
+
+def encode(person_position: Peg, planks: Iterable[Plank], held_plank: int = 0,
+           geometry: BoardGeometry = DEFAULT_GEOMETRY) -> State:
+    '''Packs the changing parts of a board into a state'''
+    plank_mask = 0
+    for plank in planks:
+        plank_mask |= 1 << geometry.slot_index[plank]
+    return (plank_mask << PLANK_SHIFT) | (person_position << HELD_BITS) | held_plank
+
+def encode_board(board: Board) -> State:
+    '''Returns the state of a board'''
+    return encode(board.person_position, board.planks, board.held_plank or 0, board.geometry)
+
+def get_person_position(state: State) -> Peg:
+    '''Returns the position of the person in a state'''
+    return (state >> HELD_BITS) & PERSON_MASK
+
+def get_held_plank(state: State) -> int:
+    '''Returns the length of the held plank in a state; 0 if there is no held plank'''
+    return state & HELD_MASK
+
+def get_plank_mask(state: State) -> PlankMask:
+    '''Returns the plank mask of a state'''
+    return state >> PLANK_SHIFT
+
+def get_planks(state: State, geometry: BoardGeometry = DEFAULT_GEOMETRY) -> List[Plank]:
+    '''Returns the planks on the board in a state'''
+    plank_mask = get_plank_mask(state)
+    return [plank for index, plank in enumerate(geometry.plank_slots) if plank_mask >> index & 1]
+
+
+class CompactPuzzle:
+    '''
+    The parts of a board that don't change when moves are made.
+    Generates and makes moves on states without creating any Board objects.
+    '''
+    def __init__(self, board: Board):
+        self.finish = board.finish
+        self.pegs = frozenset(board.pegs)
+        self.geometry = geometry = board.geometry
+
+        # every plank slot that a plank could ever be in at each peg
+        # {peg: [(plank bit, other peg, plank length, bits of planks this plank can't cross)]}
+        # upgrade: this only depends on the pegs, so it could be shared between puzzles
+        self.slots_at: Dict[Peg, List[Tuple[int, Peg, int, int]]] = {peg: [] for peg in self.pegs}
+        peg_mask = sum(1 << peg for peg in self.pegs)
+        waypoint_masks = geometry.slot_waypoint_masks
+        usable = [slot for slot, plank in enumerate(geometry.plank_slots)
+                  if plank[0] in self.pegs and plank[1] in self.pegs
+                  and not waypoint_masks[slot] & peg_mask]
+        for slot in usable:
+            # a plank can't be placed where there already is a plank...
+            conflicts = 1 << slot
+            # ...or across a plank
+            for other_slot in usable:
+                if waypoint_masks[slot] & waypoint_masks[other_slot]:
+                    conflicts |= 1 << other_slot
+            peg1, peg2 = geometry.plank_slots[slot]
+            length = geometry.slot_lengths[slot]
+            self.slots_at[peg1].append((1 << slot, peg2, length, conflicts))
+            self.slots_at[peg2].append((1 << slot, peg1, length, conflicts))
+
+    def encode(self, board: Board) -> State:
+        '''Returns the state of a board of this puzzle'''
+        assert (board.finish == self.finish and board.pegs == self.pegs
+                and board.geometry == self.geometry)
+        return encode_board(board)
+
+    def decode(self, state: State) -> Board:
+        '''Returns the board that a state represents'''
+        return Board(get_person_position(state), self.finish, self.pegs,
+                     get_planks(state, self.geometry), get_held_plank(state) or None, self.geometry)
+
+    def solved(self, state: State) -> bool:
+        '''Returns boolean whether or not the state is solved'''
+        return get_person_position(state) == self.finish
+
+    def get_moves(self, state: State) -> List[Move]:
+        '''Returns a list of all of the available moves; same as Board.get_moves'''
+        held_plank = state & HELD_MASK
+        plank_mask = state >> PLANK_SHIFT
+        slots = self.slots_at[(state >> HELD_BITS) & PERSON_MASK]
+
+        moves: List[Move] = [("walk", peg) for bit, peg, length, conflicts in slots
+                             if plank_mask & bit]
+        if not held_plank:
+            moves.extend([("grab", peg) for move_type, peg in moves])
+        else:
+            moves.extend([("place", peg) for bit, peg, length, conflicts in slots
+                          if length == held_plank and not plank_mask & conflicts])
+        return moves
+
+    def make_move(self, state: State, move: Move) -> State:
+        '''Returns the state after making a move'''
+        move_type, target = move
+        person_position = (state >> HELD_BITS) & PERSON_MASK
+        if move_type == "walk":
+            return (state & ~(PERSON_MASK << HELD_BITS)) | (target << HELD_BITS)
+
+        slot = self.geometry.slot_index[get_plank(person_position, target)]
+        bit = 1 << (slot + PLANK_SHIFT)
+        if move_type == "grab":
+            return (state & ~bit & ~HELD_MASK) | self.geometry.slot_lengths[slot]
+        elif move_type == "place":
+            return (state | bit) & ~HELD_MASK
+        else:
+            raise ValueError("Move type {} not recognized".format(move_type))
+
+    def get_predecessors(self, state: State) -> List[Tuple[State, Move]]:
+        '''
+        Returns (parent state, move) for every state that has a move leading to this state.
+        Every move can be undone by another move, so these are found with the moves from
+        ...this state: walking back undoes a walk, placing the plank back undoes a grab,
+        ...and grabbing undoes a place.
+        '''
+        person_position = (state >> HELD_BITS) & PERSON_MASK
+        undo_types = {"walk": "walk", "grab": "place", "place": "grab"}
+        ans = []
+        for move_type, target in self.get_moves(state):
+            parent = self.make_move(state, (move_type, target))
+            if move_type == "walk":
+                ans.append((parent, ("walk", person_position)))
+            else:
+                ans.append((parent, (undo_types[move_type], target)))
+        return ans
+
+    def get_goal_states(self, state: State) -> Iterator[State]:
+        '''
+        Yields every state with the same planks as the given state (on the board or held)
+        ...where the person has just walked onto the finish.
+        These are all of the goal states a shortest solution can end on
+        ...(but they aren't necessarily reachable from the given state).
+        '''
+        plank_mask = get_plank_mask(state)
+        slot_lengths = self.geometry.slot_lengths
+        lengths = [slot_lengths[slot] for slot in range(len(slot_lengths))
+                   if plank_mask >> slot & 1]
+        if get_held_plank(state):
+            lengths.append(get_held_plank(state))
+        lengths.sort()
+
+        # {length: [(plank bit, bits of planks it can't share the board with)]} in plank slot order
+        slots_by_length: Dict[int, List[Tuple[int, int]]] = {}
+        for slot_ends in self.slots_at.values():
+            for bit, _, length, conflicts in slot_ends:
+                slots_by_length.setdefault(length, []).append((bit, conflicts))
+        for slots in slots_by_length.values():
+            # each slot was added once for each of its ends
+            slots[:] = sorted(set(slots))
+        # the person must have walked onto the finish over a plank
+        finish_mask = 0
+        for bit, _, _, _ in self.slots_at.get(self.finish, []):
+            finish_mask |= bit
+
+        def placements(to_place: List[int], mask: PlankMask, after_bit: int) -> Iterator[PlankMask]:
+            '''
+            Yields every way to add planks of the sorted lengths to the mask without any crossing.
+            Planks of the same length are interchangeable, so they're only placed in slot order:
+            ...after_bit is the bit of the last plank placed if it was the same length, 0 otherwise
+            '''
+            if not to_place:
+                yield mask
+                return
+            length, rest = to_place[0], to_place[1:]
+            for bit, conflicts in slots_by_length.get(length, []):
+                if bit > after_bit and not mask & conflicts:
+                    next_after_bit = bit if rest and rest[0] == length else 0
+                    yield from placements(rest, mask | bit, next_after_bit)
+
+        person = self.finish << HELD_BITS
+        for held_plank in sorted(set(lengths)) + [0]:
+            to_place = lengths[:]
+            if held_plank:
+                to_place.remove(held_plank)
+            for mask in placements(to_place, 0, 0):
+                if mask & finish_mask:
+                    yield (mask << PLANK_SHIFT) | person | held_plank
+
+    def get_reachable(self, state: State) -> Dict[Peg, Peg]:
+        '''
+        Returns every peg the person can walk to without moving any planks.
+        Each peg maps to the peg it is walked to from on a shortest walk; the person maps to itself.
+        '''
+        plank_mask = state >> PLANK_SHIFT
+        slots_at = self.slots_at
+        return find_walks((state >> HELD_BITS) & PERSON_MASK,
+                          lambda peg: [other_peg for bit, other_peg, _, _ in slots_at[peg]
+                                       if plank_mask & bit])
+
+    def get_walk(self, state: State, peg: Peg) -> List[Move]:
+        '''Returns walk moves that take the person to a peg they can reach without moving planks'''
+        return get_walk(self.get_reachable(state), peg)
+
+
+# a plank move (grab or place) and the peg to make it from
+PlankMove = Tuple[Peg, Move]
+
+class ComponentPuzzle:
+    '''
+    A CompactPuzzle where states that only differ in where the person is
+    ...within the same group of pegs connected by planks are the same state.
+    In these states the person is always on the lowest peg they can walk to.
+
+    Walking is free when counting grab and place moves, so searching these states
+    ...finds solutions with the fewest grab and place moves with a much smaller state space.
+    The moves are plank moves: a grab or place move and the peg to walk to before making it.
+    '''
+    def __init__(self, board: Board):
+        self.puzzle = CompactPuzzle(board)
+        self.finish = board.finish
+
+    def get_canonical_state(self, state: State) -> State:
+        '''Returns the state with the person on the lowest peg they can walk to'''
+        lowest_peg = min(self.puzzle.get_reachable(state))
+        return (state & ~(PERSON_MASK << HELD_BITS)) | (lowest_peg << HELD_BITS)
+
+    def encode(self, board: Board) -> State:
+        '''Returns the canonical state of a board of this puzzle'''
+        return self.get_canonical_state(self.puzzle.encode(board))
+
+    def solved(self, state: State) -> bool:
+        '''Returns boolean whether or not the person can walk to the finish'''
+        return self.finish in self.puzzle.get_reachable(state)
+
+    def get_moves(self, state: State) -> List[PlankMove]:
+        '''Returns every grab and place move that can be made after walking somewhere'''
+        ans = []
+        person_bits = PERSON_MASK << HELD_BITS
+        for peg in self.puzzle.get_reachable(state):
+            moved_state = (state & ~person_bits) | (peg << HELD_BITS)
+            ans.extend([(peg, move) for move in self.puzzle.get_moves(moved_state)
+                        if move[0] != "walk"])
+        return ans
+
+    def make_move(self, state: State, plank_move: PlankMove) -> State:
+        '''Returns the canonical state after walking and then making the grab or place move'''
+        peg, move = plank_move
+        moved_state = (state & ~(PERSON_MASK << HELD_BITS)) | (peg << HELD_BITS)
+        return self.get_canonical_state(self.puzzle.make_move(moved_state, move))
+
+    def expand_solution(self, board: Board, plank_moves: Iterable[PlankMove]) -> List[Move]:
+        '''Turns a solution of plank moves into a solution for the board, walks included'''
+        state = self.puzzle.encode(board)
+        ans: List[Move] = []
+        for peg, move in plank_moves:
+            walk = self.puzzle.get_walk(state, peg)
+            for walk_move in walk + [move]:
+                state = self.puzzle.make_move(state, walk_move)
+            ans.extend(walk)
+            ans.append(move)
+        ans.extend(self.puzzle.get_walk(state, self.finish))
+        return ans
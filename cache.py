@@ -0,0 +1,193 @@
+#!/usr/local/bin/python3
+'''
+Persistent cache of solutions, stored in a SQLite file
+
+Solutions are keyed by a hash of everything that defines a puzzle
+...(start, finish, pegs, planks, held plank and geometry) and the name of the solver,
+...since different solvers can find different solutions.
+When the cache is full, the least recently used solutions are thrown out.
+The whole cache is thrown out if it was made with a different framework.MOVE_RULES_VERSION.
+'''
+
+import hashlib
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+from framework import Board, Move, MOVE_RULES_VERSION
+from geometry import DEFAULT_GEOMETRY
+
+# the layout of the database; change this if the tables change
+_SCHEMA_VERSION = 1
+# attributes of node_solvers.NodeSolver that are how it's wired up or measured, not settings
+_NOT_SETTINGS = ('get_name', 'is_goal', 'get_moves', 'follow_move', 'unfollow_move', 'stats')
+# how many uses of solutions to remember before saving them
+_MAX_PENDING_USES = 1000
+
+def get_puzzle_key(board: Board, solver_name: str) -> str:
+    '''Returns the cache key for solving the board with the solver'''
+    definition = [board.person_position, board.finish, sorted(board.pegs),
+                  sorted(board.planks), board.held_plank, solver_name]
+    if board.geometry != DEFAULT_GEOMETRY:
+        # (only added for other geometries so that keys from before geometries still work)
+        definition.append(board.geometry.get_definition())
+    return hashlib.sha256(json.dumps(definition).encode()).hexdigest()
+
+
+class SolutionCache:
+    '''
+    Cache of solutions that lasts between runs.
+    Unsolvable puzzles are cached too (their solution is None).
+    '''
+    def __init__(self, path: str, max_entries: int = 100000):
+        '''
+        path: the SQLite file to keep the cache in (':memory:' for a cache that doesn't last)
+        max_entries: the most solutions to keep
+        '''
+        self.max_entries = max_entries
+        self._connection = sqlite3.connect(path)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS meta '
+                                     '(key TEXT PRIMARY KEY, value)')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS solutions '
+                                     '(key TEXT PRIMARY KEY, solution TEXT, last_used INTEGER)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS solutions_last_used '
+                                     'ON solutions (last_used)')
+            version = [_SCHEMA_VERSION, MOVE_RULES_VERSION]
+            if self._get_meta('version') != version:
+                self._connection.execute('DELETE FROM solutions')
+                self._set_meta('version', version)
+        row = self._connection.execute('SELECT MAX(last_used) FROM solutions').fetchone()
+        # increases every time a solution is used; smaller means less recently used
+        self._clock = row[0] or 0
+        # {key: clock} for solutions used since the last write, so reading never has to write
+        self._pending_uses: Dict[str, int] = {}
+        # how many solutions are cached, so they only have to be counted when the cache is full
+        self._entries = len(self)
+
+    def _get_meta(self, key: str) -> Any:
+        row = self._connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def _set_meta(self, key: str, value: Any) -> None:
+        self._connection.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                                 (key, json.dumps(value)))
+
+    def get(self, board: Board, solver_name: str) -> Tuple[bool, Optional[List[Move]]]:
+        '''Returns whether the solution was cached, and the solution if it was'''
+        key = get_puzzle_key(board, solver_name)
+        row = self._connection.execute('SELECT solution FROM solutions WHERE key = ?',
+                                       (key,)).fetchone()
+        if row is None:
+            return False, None
+        self._clock += 1
+        self._pending_uses[key] = self._clock
+        if len(self._pending_uses) >= _MAX_PENDING_USES:
+            self.flush()
+        solution = json.loads(row[0])
+        if solution is None:
+            return True, None
+        return True, [(move_type, peg) for move_type, peg in solution]
+
+    def put(self, board: Board, solver_name: str, solution: Optional[List[Move]]) -> None:
+        '''Caches a solution, throwing out the least recently used ones if the cache is full'''
+        key = get_puzzle_key(board, solver_name)
+        self._clock += 1
+        with self._connection:
+            self._write_pending_uses()
+            is_new = self._connection.execute('SELECT 1 FROM solutions WHERE key = ?',
+                                              (key,)).fetchone() is None
+            self._connection.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)',
+                                     (key, json.dumps(solution), self._clock))
+            if is_new:
+                self._entries += 1
+                if self._entries > self.max_entries:
+                    self._evict()
+
+    def _evict(self) -> None:
+        '''Throws out the least recently used solutions until there are only max_entries left'''
+        # other connections to the file could have changed it, so it's counted again
+        self._entries = len(self)
+        if self._entries > self.max_entries:
+            # the oldest are found with the last_used index instead of sorting every solution
+            self._connection.execute('DELETE FROM solutions WHERE key IN '
+                                     '(SELECT key FROM solutions ORDER BY last_used LIMIT ?)',
+                                     (self._entries - self.max_entries,))
+            self._entries = self.max_entries
+
+    def flush(self) -> None:
+        '''Saves which solutions have been used recently'''
+        with self._connection:
+            self._write_pending_uses()
+
+    def _write_pending_uses(self) -> None:
+        self._connection.executemany('UPDATE solutions SET last_used = ? WHERE key = ?',
+                                     [(clock, key) for key, clock in self._pending_uses.items()])
+        self._pending_uses.clear()
+
+    def __len__(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+    def clear(self) -> None:
+        '''Throws out every cached solution'''
+        self._pending_uses.clear()
+        with self._connection:
+            self._connection.execute('DELETE FROM solutions')
+        self._entries = 0
+
+    def close(self) -> None:
+        '''Saves and closes the cache file'''
+        self.flush()
+        self._connection.close()
+
+    def __enter__(self) -> 'SolutionCache':
+        return self
+
+    def __exit__(self, *exception_info: Any) -> None:
+        self.close()
+
+
+def get_solver_name(solver: Any) -> str:
+    '''
+    Returns a name for a solver made from its class and its settings, like
+    ...CompactBFSSolver(reduce_components=True), so differently set up solvers aren't mixed up.
+    Settings are the public attributes (other than NodeSolver's functions and stats);
+    ...functions are named by their qualified names.
+    Raises ValueError if a setting can't be named (like a target board),
+    ...in which case the name has to be given to CachedSolver.
+    '''
+    settings = []
+    for attribute, value in sorted(vars(solver).items()):
+        if attribute.startswith('_') or attribute in _NOT_SETTINGS:
+            continue
+        if value is None or isinstance(value, (bool, int, float, str)):
+            settings.append('{}={!r}'.format(attribute, value))
+        elif callable(value):
+            settings.append('{}={}'.format(attribute, getattr(value, '__qualname__',
+                                                              type(value).__qualname__)))
+        else:
+            raise ValueError("The {} setting of {} can't be named; give the solver a name".format(
+                attribute, type(solver).__name__))
+    return '{}({})'.format(type(solver).__name__, ', '.join(settings))
+
+
+class CachedSolver: # pylint: disable=too-few-public-methods
+    '''Wraps a River Crossing solver so that it only solves each puzzle once'''
+    def __init__(self, solver: Any, cache: SolutionCache, solver_name: Optional[str] = None):
+        '''
+        solver: anything with a `solve(board)` method (like solvers.BFSSolver())
+        solver_name: the name to cache the solutions under; defaults to get_solver_name(solver),
+                     ...and has to be given if that can't name the solver
+        '''
+        self.solver = solver
+        self.cache = cache
+        self.solver_name = solver_name or get_solver_name(solver)
+
+    def solve(self, board: Board) -> Optional[List[Move]]:
+        '''Returns the cached solution for the board, solving it if it isn't cached'''
+        cached, solution = self.cache.get(board, self.solver_name)
+        if not cached:
+            solution = self.solver.solve(board)
+            self.cache.put(board, self.solver_name, solution)
+        return solution
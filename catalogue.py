@@ -0,0 +1,190 @@
+#!/usr/local/bin/python3
+'''
+A compact text format for catalogues of River Crossing puzzles, and a fast loader for it.
+
+Each line is one puzzle:
+    <name> <start> <finish> <peg mask> <planks> [held=<length>] [size=<width>x<height>]
+    ...[lengths=<plank lengths>] [rc=<RC characters>]
+For example:
+    Beginner1 32 4 0x100c06010 22-23,22-32
+The peg mask is in hexadecimal, with bit `peg` set for each peg on the board.
+The planks are pairs of pegs joined by '-' and separated by ',', or '-' if there are none.
+"size" and "lengths" are only needed for boards that aren't the usual size
+...(see geometry.BoardGeometry), like size=9x9 lengths=1,2,3,4.
+"rc" is a translator: the RC character of each peg, in order of the pegs.
+Blank lines and lines starting with '#' are skipped.
+
+PuzzleCatalogue checks every line as it reads the file, and keeps the puzzles by name;
+...Board objects are only made when a puzzle is asked for.
+Can be run from the command line to write catalogues; see `python3 catalogue.py --help`.
+See terms.txt for the types of the different terms.
+'''
+
+import argparse
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from batch import PuzzleJob, Result, get_catalogue_jobs, read_puzzle_jobs
+from framework import Board, HeldPlank, Peg, Plank, check_planks, get_plank
+from geometry import DEFAULT_GEOMETRY, get_geometry
+from util import PegTranslator
+
+# (start, finish, peg mask, planks, held plank, (width, height, plank lengths), translator)
+PuzzleRecord = Tuple[Peg, Peg, int, Tuple[Plank, ...], HeldPlank, Tuple[int, int, Tuple[int, ...]],
+                     Optional[PegTranslator]]
+
+
+def parse_puzzle_line(line: str) -> Tuple[str, PuzzleRecord]:
+    '''
+    Reads and checks one line of a catalogue; returns (name, record).
+    Raises ValueError if the line isn't a puzzle that can be set up.
+    '''
+    fields = line.split()
+    if len(fields) < 5:
+        raise ValueError("A puzzle needs a name, start, finish, peg mask and planks")
+    name, start, finish, peg_mask = fields[0], int(fields[1]), int(fields[2]), int(fields[3], 16)
+    plank_pegs = [] if fields[4] == '-' else [plank.split('-') for plank in fields[4].split(',')]
+    if not all(len(pegs) == 2 for pegs in plank_pegs):
+        raise ValueError("{} isn't a list of planks".format(fields[4]))
+    planks = tuple(get_plank(int(peg1), int(peg2)) for peg1, peg2 in plank_pegs)
+    for field in fields[5:]:
+        if '=' not in field:
+            raise ValueError("Option {} isn't written as <name>=<value>".format(field))
+    options = dict(field.split('=', 1) for field in fields[5:])
+    unknown_options = set(options) - {'held', 'size', 'lengths', 'rc'}
+    if unknown_options:
+        raise ValueError("Unknown options: {}".format(', '.join(sorted(unknown_options))))
+    held_plank = int(options['held']) if 'held' in options else None
+    width, height = (DEFAULT_GEOMETRY.width, DEFAULT_GEOMETRY.height) if 'size' not in options \
+        else (int(side) for side in options['size'].split('x'))
+    plank_lengths = DEFAULT_GEOMETRY.plank_lengths if 'lengths' not in options \
+        else tuple(int(length) for length in options['lengths'].split(','))
+    geometry = get_geometry(width, height, plank_lengths)
+
+    if peg_mask & 1 or peg_mask >> (geometry.peg_count + 1):
+        raise ValueError("The peg mask has pegs that aren't on a {}x{} board".format(width, height))
+    for peg in (start, finish):
+        if not (0 < peg <= geometry.peg_count and peg_mask >> peg & 1):
+            raise ValueError("Peg {} isn't on the board".format(peg))
+    check_planks(planks, peg_mask, geometry)
+    if held_plank is not None and held_plank not in geometry.plank_lengths:
+        raise ValueError("There is no plank of length {}".format(held_plank))
+
+    translator = None
+    if 'rc' in options:
+        pegs = [peg for peg in geometry.pegs if peg_mask >> peg & 1]
+        if len(options['rc']) != len(pegs):
+            raise ValueError("There are {} pegs but {} RC characters".format(len(pegs),
+                                                                            len(options['rc'])))
+        translator = dict(zip(pegs, options['rc']))
+    return name, (start, finish, peg_mask, planks, held_plank, geometry.get_definition(),
+                  translator)
+
+def read_catalogue(lines: Iterable[str]) -> Iterator[Tuple[str, PuzzleRecord]]:
+    '''
+    Yields (name, record) for each puzzle in the lines of a catalogue.
+    Raises ValueError saying which line is wrong if one can't be read.
+    '''
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            yield parse_puzzle_line(line)
+        except ValueError as error:
+            raise ValueError("Line {}: {}".format(line_number, error)) from error
+
+def make_board(record: PuzzleRecord) -> Board:
+    '''Sets up the board of a record'''
+    start, finish, peg_mask, planks, held_plank, definition, _ = record
+    geometry = get_geometry(*definition)
+    return Board(start, finish, [peg for peg in geometry.pegs if peg_mask >> peg & 1], planks,
+                 held_plank, geometry)
+
+def format_puzzle(name: str, board: Board, translator: Optional[PegTranslator] = None) -> str:
+    '''Returns the catalogue line for a board; the name can't have any whitespace'''
+    fields = [name, str(board.person_position), str(board.finish),
+              hex(sum(1 << peg for peg in board.pegs)),
+              ','.join('{}-{}'.format(*plank) for plank in sorted(board.planks)) or '-']
+    if board.held_plank:
+        fields.append('held={}'.format(board.held_plank))
+    if board.geometry != DEFAULT_GEOMETRY:
+        fields.append('size={}x{}'.format(board.geometry.width, board.geometry.height))
+        fields.append('lengths=' + ','.join(map(str, board.geometry.plank_lengths)))
+    if translator is not None:
+        fields.append('rc=' + ''.join(translator[peg] for peg in sorted(board.pegs)))
+    return ' '.join(fields)
+
+
+class PuzzleCatalogue:
+    '''
+    The puzzles of a catalogue, by name.
+    Every puzzle is checked when the catalogue is read; boards are made when they're asked for.
+    '''
+    def __init__(self, lines: Iterable[str]):
+        '''Reads the lines of a catalogue; raises ValueError if a line is wrong or a name repeats'''
+        self._records: Dict[str, PuzzleRecord] = {}
+        for name, record in read_catalogue(lines):
+            if name in self._records:
+                raise ValueError("Puzzle {} is in the catalogue twice".format(name))
+            self._records[name] = record
+
+    @classmethod
+    def from_file(cls, path: str) -> 'PuzzleCatalogue':
+        '''Reads a catalogue file'''
+        with open(path) as catalogue_file:
+            return cls(catalogue_file)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._records
+
+    def __iter__(self) -> Iterator[str]:
+        '''Yields the names of the puzzles, in the order they're in the catalogue'''
+        return iter(self._records)
+
+    def __getitem__(self, name: str) -> Board:
+        '''Returns a new board of the puzzle with the given name'''
+        return make_board(self._records[name])
+
+    def get_translator(self, name: str) -> Optional[PegTranslator]:
+        '''Returns the translator from pegs to RC characters of a puzzle, if it has one'''
+        return self._records[name][-1]
+
+    def get_jobs(self, names: Optional[Iterable[str]] = None) -> Iterator[PuzzleJob]:
+        '''Yields the puzzles with the given names (all of them if None) as batch.py jobs'''
+        for name in self._records if names is None else names:
+            if name not in self._records:
+                raise ValueError("Puzzle {} not recognized".format(name))
+            yield (name, self[name], self.get_translator(name))
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    '''Command line entry point; prints the catalogue lines of puzzles'''
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('names', nargs='*',
+                        help='names of puzzles in puzzles.py (default: all of them)')
+    parser.add_argument('--file',
+                        help="file of puzzles in batch.py's format to convert instead "
+                             "('-' for stdin)")
+    parsed = parser.parse_args(arguments)
+
+    if parsed.file == '-':
+        jobs: Iterable[Union[PuzzleJob, Result]] = read_puzzle_jobs(sys.stdin)
+    elif parsed.file:
+        with open(parsed.file) as puzzle_file:
+            jobs = list(read_puzzle_jobs(puzzle_file))
+    else:
+        jobs = get_catalogue_jobs(parsed.names or None)
+
+    for job in jobs:
+        if isinstance(job, dict):
+            # a line of the file that isn't a puzzle
+            print(job['error'], file=sys.stderr)
+            continue
+        name, board, translator = job
+        print(format_puzzle(name.replace(' ', '_'), board, translator))
+
+if __name__ == "__main__":
+    main()
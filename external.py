@@ -0,0 +1,164 @@
+#!/usr/local/bin/python3
+'''
+Breadth-first search that keeps its layers on disk instead of in memory,
+...so puzzles with more states than fit in memory can still be solved.
+
+Each layer is a file of sorted, unique keys (see frontier.py), read through memory mapping.
+A layer is expanded a chunk at a time; the children of each chunk are sorted, have the keys
+...of the layer and the layer before taken out (every move can be undone, so those are
+...the only layers a child could already be in), and are written to a run file.
+The runs are then merged into the next layer, which is where repeats between chunks are dropped.
+The solution is rebuilt by going back through the layers, looking for a neighbor of each key
+...in the layer before, so no parents are stored.
+
+Needs NumPy.
+See terms.txt for the types of the different terms.
+'''
+
+import os
+import tempfile
+from typing import List, Optional
+import numpy as np
+from bitboard import CompactPuzzle
+from frontier import FrontierExpander, Key, contains
+from framework import Board, Move
+
+# roughly how many bytes FrontierExpander.expand uses for each plank slot at each key it expands
+_EXPANSION_BYTES = 128
+# the most runs merged at once; more runs than this are merged in more than one pass
+MAX_MERGE_RUNS = 64
+
+
+class ExternalBFSSolver: # pylint: disable=too-few-public-methods
+    '''
+    BFSSolver for River Crossing that keeps its layers in files.
+    Finds solutions of the same length as BFSSolver.
+    '''
+    def __init__(self, memory_budget: int = 256 * 1024 * 1024, work_dir: Optional[str] = None):
+        '''
+        memory_budget: roughly the most bytes to use at once for expanding and merging,
+                       ...not counting the memory mapped layer files
+        work_dir: where to put the layer files (default: the system's temporary directory);
+                  ...they are deleted once the search is done
+        '''
+        self.memory_budget = memory_budget
+        self.work_dir = work_dir
+
+    def solve(self, board: Board) -> Optional[List[Move]]:
+        '''Returns the list of moves needed to solve the board; does not edit the board'''
+        puzzle = CompactPuzzle(board)
+        expander = FrontierExpander(puzzle)
+        start_state = puzzle.encode(board)
+        if puzzle.solved(start_state):
+            return []
+
+        with tempfile.TemporaryDirectory(dir=self.work_dir) as directory:
+            _write(_layer_path(directory, 0),
+                   np.array([expander.to_key(start_state)], dtype=np.uint64))
+            depth = 0
+            while os.path.getsize(_layer_path(directory, depth)):
+                goal = self._expand_layer(expander, directory, depth)
+                if goal is not None:
+                    return self._rebuild_path(expander, directory, depth, goal)
+                depth += 1
+        return None
+
+    def _expand_layer(self, expander: FrontierExpander, directory: str,
+                      depth: int) -> Optional[Key]:
+        '''
+        Writes the layer after the given one.
+        Returns a goal key in the next layer if there is one (and doesn't finish writing it).
+        '''
+        layer = _read(_layer_path(directory, depth))
+        previous_layer = _read(_layer_path(directory, depth - 1))
+        finish = np.uint64(expander.puzzle.finish)
+        width = max([len(slots) for slots in expander.puzzle.slots_at.values()] + [1])
+        chunk_size = max(1, self.memory_budget // (_EXPANSION_BYTES * width))
+
+        run_paths: List[str] = []
+        for start in range(0, len(layer), chunk_size):
+            children = expander.expand(np.array(layer[start:start + chunk_size]))[0]
+            goals = np.flatnonzero(expander.get_people(children) == finish)
+            if goals.size:
+                return Key(children[goals[0]])
+            children = np.unique(children)
+            children = children[~(contains(layer, children) | contains(previous_layer, children))]
+            if children.size:
+                run_paths.append(os.path.join(directory, 'run-{}.bin'.format(len(run_paths))))
+                _write(run_paths[-1], children)
+        del layer, previous_layer
+
+        # merge in passes of at most MAX_MERGE_RUNS runs until there is only one run left
+        merges = 0
+        while len(run_paths) > 1:
+            merged_paths = []
+            for start in range(0, len(run_paths), MAX_MERGE_RUNS):
+                merged_paths.append(os.path.join(directory, 'merged-{}.bin'.format(merges)))
+                merges += 1
+                group = run_paths[start:start + MAX_MERGE_RUNS]
+                _merge_runs(group, merged_paths[-1], self.memory_budget)
+                for path in group:
+                    os.remove(path)
+            run_paths = merged_paths
+
+        if run_paths:
+            os.replace(run_paths[0], _layer_path(directory, depth + 1))
+        else:
+            _write(_layer_path(directory, depth + 1), np.array([], dtype=np.uint64))
+        return None
+
+    @staticmethod
+    def _rebuild_path(expander: FrontierExpander, directory: str, depth: int,
+                      goal: Key) -> List[Move]:
+        '''
+        Goes back through the layers from the goal (in the layer after `depth`),
+        ...and finds the moves between the keys.
+        '''
+        keys = [goal]
+        for layer_depth in range(depth, -1, -1):
+            layer = _read(_layer_path(directory, layer_depth))
+            # every move can be undone, so a key's parents are among its children
+            neighbors = expander.expand(np.array([keys[-1]], dtype=np.uint64))[0]
+            keys.append(Key(neighbors[contains(layer, neighbors)][0]))
+        return expander.get_path(keys[::-1])
+
+
+def _layer_path(directory: str, depth: int) -> str:
+    '''Returns the path of the file for a layer'''
+    return os.path.join(directory, 'layer-{}.bin'.format(depth))
+
+def _write(path: str, keys: np.ndarray) -> None:
+    '''Writes keys to a file'''
+    keys.astype(np.uint64, copy=False).tofile(path)
+
+def _read(path: str) -> np.ndarray:
+    '''Memory maps a file of keys; files that don't exist are read as having no keys'''
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return np.array([], dtype=np.uint64)
+    return np.memmap(path, dtype=np.uint64, mode='r')
+
+def _merge_runs(run_paths: List[str], output_path: str, memory_budget: int) -> None:
+    '''
+    Merges files of sorted, unique keys into one file of sorted, unique keys,
+    ...reading a block of each file at a time.
+    '''
+    runs = [_read(path) for path in run_paths]
+    # the blocks, their concatenation and np.unique's copy of it are in memory at once
+    block_size = max(1, memory_budget // (3 * 8 * len(runs)))
+    positions = [0] * len(runs)
+    with open(output_path, 'wb') as output_file:
+        while True:
+            blocks = [(index, np.array(run[positions[index]:positions[index] + block_size]))
+                      for index, run in enumerate(runs) if positions[index] < len(run)]
+            if not blocks:
+                break
+            # every key after a block is bigger than the block's last key, so every key up to
+            # ...the smallest last key is in the blocks, and can be written
+            # ...(and the run with that block finishes its block, so this always gets somewhere)
+            last_key = min(block[-1] for _, block in blocks)
+            parts = []
+            for index, block in blocks:
+                taken = int(np.searchsorted(block, last_key, side='right'))
+                parts.append(block[:taken])
+                positions[index] += taken
+            np.unique(np.concatenate(parts)).tofile(output_file)
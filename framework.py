@@ -6,11 +6,12 @@ See terms.txt for the types of the different terms.
 '''
 
 # pylint: disable=too-few-public-methods, no-else-return, too-many-arguments
-from typing import List, Set, Tuple, Optional, Dict, Iterable
-
-WIDTH = 5
-HEIGHT = 7
-UP, RIGHT, DOWN, LEFT = 0, 1, 2, 3
+from typing import List, Set, Tuple, Optional, Dict, Iterable, FrozenSet, Callable
+# pylint: disable=unused-import
+from geometry import (WIDTH, HEIGHT, UP, RIGHT, DOWN, LEFT, DIRECTIONS, NEIGHBORS,
+                      DIRECTION_DISTS, WAYPOINTS, WAYPOINT_MASKS, PLANK_SLOTS, PLANK_ENDS,
+                      BoardGeometry, DEFAULT_GEOMETRY, get_geometry)
+# pylint: enable=unused-import
 
 # see terms.txt for explanations as to what these represent
 Peg = int
@@ -21,13 +22,24 @@ Move = Tuple[str, Peg]
 # But I didn't want to have to import / install Literal
 Direction = int
 Distance = int
+# (person position, held plank, planks); see Board.get_state_key
+StateKey = Tuple[Peg, HeldPlank, FrozenSet[Plank]]
+
+_NO_WAYPOINTS: FrozenSet[Peg] = frozenset()
+
+# change this whenever the rules for which moves can be made change,
+# ...so that anything saved using the old rules (like cached solutions) is thrown out
+MOVE_RULES_VERSION = 2
 
 class Board:
     '''
     Represents a River Crossing board
     '''
     def __init__(self, start: Peg, finish: Peg, pegs: Iterable[Peg], planks: Iterable[Plank],
-                 held_plank: HeldPlank = None):
+                 held_plank: HeldPlank = None, geometry: BoardGeometry = DEFAULT_GEOMETRY):
+        # the size of the board and the plank lengths allowed on it
+        self.geometry = geometry
+
         # the starting position of the person
         self.person_position = start
 
@@ -36,13 +48,16 @@ class Board:
 
         # the pegs on the board
         self.pegs: Set[Peg] = set()
+        # the pegs on the board as a peg mask (bit `peg` is set for each peg)
+        self._peg_mask = 0
         self.add_pegs(pegs)
 
         # the planks on the board
         self.planks: Set[Plank] = set()
 
-        # pegs that are covered by planks
-        self._covered_points: Set[Peg] = set()
+        # pegs that are covered by planks as a peg mask
+        # planks can't cross, so no peg is covered by more than one plank
+        self._covered_mask = 0
         self.add_planks(planks)
 
         # if the person is carrying a plank
@@ -53,7 +68,8 @@ class Board:
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, Board):
-            for attribute in ['person_position', 'finish', 'pegs', 'planks', 'held_plank']:
+            for attribute in ['person_position', 'finish', 'pegs', 'planks', 'held_plank',
+                              'geometry']:
                 if getattr(self, attribute) != getattr(other, attribute): # type: ignore
                     return False
             return True
@@ -61,12 +77,19 @@ class Board:
             return False
 
     def __hash__(self) -> int:
-        return hash(self.person_position) + hash(tuple(self.planks))
+        return hash(self.get_state_key())
 
     def __deepcopy__(self, memo: Dict[int, object]) -> 'Board':
         # ignoring `memo` as per https://stackoverflow.com/a/1950593/
         return Board(self.person_position, self.finish, self.pegs.copy(),
-                     self.planks.copy(), self.held_plank)
+                     self.planks.copy(), self.held_plank, self.geometry)
+
+    def get_state_key(self) -> StateKey:
+        '''
+        Returns a hashable key for everything about the board that moves can change.
+        Two boards of the same puzzle are equal if and only if their keys are equal.
+        '''
+        return (self.person_position, self.held_plank, frozenset(self.planks))
 
     def get_moves(self) -> List[Move]:
         '''Returns a list of all of the available moves'''
@@ -98,6 +121,17 @@ class Board:
 
         return ans
 
+    def get_walks(self) -> Dict[Peg, Peg]:
+        '''
+        Returns every peg the person can walk to without moving any planks.
+        Each peg maps to the peg it is walked to from on a shortest walk; the person maps to itself.
+        '''
+        ends: Dict[Peg, List[Peg]] = {}
+        for peg1, peg2 in self.planks:
+            ends.setdefault(peg1, []).append(peg2)
+            ends.setdefault(peg2, []).append(peg1)
+        return find_walks(self.person_position, lambda peg: ends.get(peg, []))
+
     def get_grab_planks(self) -> List[Peg]:
         '''
         Returns a list of all of the available grab moves.
@@ -114,18 +148,15 @@ class Board:
         '''
         assert self.held_plank
 
-        ans = []
-        for direction in range(4):
-            peg = get_peg_in_direction(self.person_position, direction, self.held_plank)
-            if peg is not None and peg in self.pegs:
-                works = True
-                for waypoint in get_waypoints((self.person_position, peg)):
-                    if waypoint in self._covered_points or waypoint in self.pegs:
-                        works = False
-                        break
-                if works:
-                    ans.append(peg)
-        return ans
+        blocked_mask = self._covered_mask | self._peg_mask
+        # a plank can't cross a peg or another plank, or be placed on top of another plank
+        plank_ends = self.geometry.plank_ends[self.person_position]
+        if self.held_plank >= len(plank_ends):
+            return []
+        plank_slots = self.geometry.plank_slots
+        return [peg for slot, peg, waypoint_mask in plank_ends[self.held_plank]
+                if peg in self.pegs and not waypoint_mask & blocked_mask
+                and plank_slots[slot] not in self.planks]
 
     def make_move(self, move: Move) -> None:
         '''Makes a move'''
@@ -133,7 +164,7 @@ class Board:
         if move_type == "walk":
             self.person_position = target
         elif move_type == "grab":
-            self.held_plank = get_peg_dist(self.person_position, target)
+            self.held_plank = get_peg_dist(self.person_position, target, self.geometry)
             self.remove_plank(get_plank(self.person_position, target))
         elif move_type == "place":
             self.add_plank(get_plank(self.person_position, target))
@@ -141,6 +172,25 @@ class Board:
         else:
             raise ValueError("Move type {} not recognized".format(move_type))
 
+    def unmake_move(self, move: Move, previous_position: Optional[Peg] = None) -> None:
+        '''
+        Undoes a move that was just made with make_move.
+        previous_position is where the person was before the move; it's only needed for walk moves.
+        '''
+        move_type, target = move
+        if move_type == "walk":
+            if previous_position is None:
+                raise ValueError("Undoing a walk move needs the previous position")
+            self.person_position = previous_position
+        elif move_type == "grab":
+            self.add_plank(get_plank(self.person_position, target))
+            self.held_plank = None
+        elif move_type == "place":
+            self.held_plank = get_peg_dist(self.person_position, target, self.geometry)
+            self.remove_plank(get_plank(self.person_position, target))
+        else:
+            raise ValueError("Move type {} not recognized".format(move_type))
+
     def solved(self) -> bool:
         '''Returns boolean whether or not the game has been solved'''
         return self.person_position == self.finish
@@ -157,7 +207,7 @@ class Board:
     def add_plank(self, plank: Plank) -> None:
         '''Adds a plank to the set of planks; updates the covered points'''
         self.planks.add(plank)
-        self._covered_points = self._covered_points.union(get_waypoints(plank))
+        self._covered_mask |= self.geometry.waypoint_masks.get(plank, 0)
 
     def add_pegs(self, pegs: Iterable[Peg]) -> None:
         '''Adds pegs to the set of pegs'''
@@ -167,115 +217,276 @@ class Board:
     def add_peg(self, peg: Peg) -> None:
         '''Add a peg to the set of pegs'''
         self.pegs.add(peg)
+        self._peg_mask |= 1 << peg
 
     def remove_plank(self, plank: Plank) -> None:
         '''Removes a plank from the set of planks; updates the covered points'''
         self.planks.remove(plank)
-        self._covered_points = self._covered_points.difference(get_waypoints(plank))
+        self._covered_mask &= ~self.geometry.waypoint_masks.get(plank, 0)
+
+
+class StaticPuzzle:
+    '''
+    The parts of a puzzle that moves never change: the finish, the pegs and the geometry.
+    Every FrozenBoard of a puzzle shares one of these. Can't be changed once it's made.
+    '''
+    __slots__ = ('finish', 'pegs', 'peg_mask', 'geometry')
+    finish: Peg
+    pegs: FrozenSet[Peg]
+    peg_mask: int
+    geometry: BoardGeometry
+
+    def __init__(self, finish: Peg, pegs: Iterable[Peg],
+                 geometry: BoardGeometry = DEFAULT_GEOMETRY):
+        object.__setattr__(self, 'finish', finish)
+        object.__setattr__(self, 'pegs', frozenset(pegs))
+        # the pegs as a peg mask (bit `peg` is set for each peg)
+        object.__setattr__(self, 'peg_mask', sum(1 << peg for peg in self.pegs))
+        object.__setattr__(self, 'geometry', geometry)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("StaticPuzzle can't be changed")
+
+    def __reduce__(self) -> Tuple[object, Tuple[Peg, Tuple[Peg, ...], BoardGeometry]]:
+        # __setattr__ stops pickle from setting the slots itself, so it goes through __init__
+        return StaticPuzzle, (self.finish, tuple(sorted(self.pegs)), self.geometry)
+
+    def __copy__(self) -> 'StaticPuzzle':
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, object]) -> 'StaticPuzzle':
+        return self
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, StaticPuzzle):
+            return (self.finish, self.peg_mask, self.geometry) == (other.finish, other.peg_mask,
+                                                                   other.geometry)
+        return False
+
+    def __hash__(self) -> int:
+        return hash((self.finish, self.peg_mask))
+
+
+class FrozenBoard:
+    '''
+    A River Crossing board that can't be changed: making a move returns a new FrozenBoard.
+    Only the parts that moves change are stored (the planks as a mask of plank slots),
+    ...and the rest is shared by reference through `puzzle`, so each one is small
+    ...and cheap to make, and the hash is worked out once.
+    FrozenBoards are their own names when searching.
+    '''
+    __slots__ = ('puzzle', 'person_position', 'plank_mask', 'held_plank', '_covered_mask', '_hash')
+    puzzle: StaticPuzzle
+    person_position: Peg
+    plank_mask: int
+    held_plank: HeldPlank
+    _covered_mask: int
+    _hash: int
+
+    def __init__(self, puzzle: StaticPuzzle, person_position: Peg, plank_mask: int,
+                 held_plank: HeldPlank = None, covered_mask: Optional[int] = None):
+        '''
+        plank_mask: bit `slot` is set for the plank slot of each plank on the board
+        covered_mask: the pegs covered by the planks as a peg mask; worked out if not given
+        '''
+        if covered_mask is None:
+            waypoint_masks = puzzle.geometry.slot_waypoint_masks
+            covered_mask = 0
+            for slot, waypoint_mask in enumerate(waypoint_masks):
+                if plank_mask >> slot & 1:
+                    covered_mask |= waypoint_mask
+        object.__setattr__(self, 'puzzle', puzzle)
+        object.__setattr__(self, 'person_position', person_position)
+        object.__setattr__(self, 'plank_mask', plank_mask)
+        object.__setattr__(self, 'held_plank', held_plank)
+        object.__setattr__(self, '_covered_mask', covered_mask)
+        object.__setattr__(self, '_hash', hash((person_position, plank_mask, held_plank)))
+
+    @classmethod
+    def from_board(cls, board: Board, puzzle: Optional[StaticPuzzle] = None) -> 'FrozenBoard':
+        '''
+        Returns a FrozenBoard of the board.
+        puzzle: the StaticPuzzle to share, if there already is one for the board's puzzle
+        '''
+        if puzzle is None:
+            puzzle = StaticPuzzle(board.finish, board.pegs, board.geometry)
+        slot_index = board.geometry.slot_index
+        return cls(puzzle, board.person_position,
+                   sum(1 << slot_index[plank] for plank in board.planks), board.held_plank)
+
+    def to_board(self) -> Board:
+        '''Returns a (changeable) Board of this board'''
+        return Board(self.person_position, self.puzzle.finish, self.puzzle.pegs, self.planks,
+                     self.held_plank, self.puzzle.geometry)
+
+    def __str__(self) -> str:
+        return "<FrozenBoard: person position: {}, planks: {}, held_plank: {}>".format(self.person_position, set(self.planks), self.held_plank) # pylint: disable=line-too-long
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("FrozenBoard can't be changed; make_move returns a new one")
+
+    def __reduce__(self) -> Tuple[object, Tuple[StaticPuzzle, Peg, int, HeldPlank, int]]:
+        # __setattr__ stops pickle from setting the slots itself, so it goes through __init__
+        # ...(which works the hash out again in the process that loads it)
+        return FrozenBoard, (self.puzzle, self.person_position, self.plank_mask, self.held_plank,
+                             self._covered_mask)
+
+    def __copy__(self) -> 'FrozenBoard':
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, object]) -> 'FrozenBoard':
+        return self
 
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenBoard):
+            return (self._hash == other._hash and self.person_position == other.person_position
+                    and self.plank_mask == other.plank_mask
+                    and self.held_plank == other.held_plank
+                    and (self.puzzle is other.puzzle or self.puzzle == other.puzzle))
+        return False
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    @property
+    def planks(self) -> FrozenSet[Plank]:
+        '''The planks on the board'''
+        plank_slots = self.puzzle.geometry.plank_slots
+        return frozenset(plank for slot, plank in enumerate(plank_slots)
+                         if self.plank_mask >> slot & 1)
+
+    def get_state_key(self) -> StateKey:
+        '''Returns the same state key as Board.get_state_key'''
+        return (self.person_position, self.held_plank, self.planks)
+
+    def get_moves(self) -> List[Move]:
+        '''Returns a list of all of the available moves, like Board.get_moves'''
+        plank_ends = self.puzzle.geometry.plank_ends[self.person_position]
+        plank_mask = self.plank_mask
+        walk_moves: List[Move] = [("walk", peg) for ends in plank_ends for slot, peg, _ in ends
+                                  if plank_mask >> slot & 1]
+        if not self.held_plank:
+            return walk_moves + [("grab", peg) for _, peg in walk_moves]
+        if self.held_plank >= len(plank_ends):
+            return walk_moves
+        peg_mask = self.puzzle.peg_mask
+        # a plank can't cross a peg or another plank, or be placed on top of another plank
+        blocked_mask = self._covered_mask | peg_mask
+        return walk_moves + [("place", peg) for slot, peg, waypoint_mask
+                             in plank_ends[self.held_plank]
+                             if peg_mask >> peg & 1 and not waypoint_mask & blocked_mask
+                             and not plank_mask >> slot & 1]
+
+    def make_move(self, move: Move) -> 'FrozenBoard':
+        '''Returns the board after making a move'''
+        move_type, target = move
+        if move_type == "walk":
+            return FrozenBoard(self.puzzle, target, self.plank_mask, self.held_plank,
+                               self._covered_mask)
+        geometry = self.puzzle.geometry
+        slot = geometry.slot_index[get_plank(self.person_position, target)]
+        if move_type == "grab":
+            return FrozenBoard(self.puzzle, self.person_position, self.plank_mask & ~(1 << slot),
+                               geometry.slot_lengths[slot],
+                               self._covered_mask & ~geometry.slot_waypoint_masks[slot])
+        elif move_type == "place":
+            return FrozenBoard(self.puzzle, self.person_position, self.plank_mask | 1 << slot,
+                               None, self._covered_mask | geometry.slot_waypoint_masks[slot])
+        raise ValueError("Move type {} not recognized".format(move_type))
 
-def get_waypoints(plank: Plank) -> Set[Peg]:
+    def solved(self) -> bool:
+        '''Returns boolean whether or not the game has been solved'''
+        return self.person_position == self.puzzle.finish
+
+
+def get_waypoints(plank: Plank, geometry: BoardGeometry = DEFAULT_GEOMETRY) -> FrozenSet[Peg]:
     '''Gets the points that are not the endpoints of the plank'''
-    ans: Set[Peg] = set()
-    direction, total_distance = get_peg_direction_dist(*plank)
-    if direction is None:
-        return ans
-    assert total_distance is not None
-    for path_distance in range(1, total_distance):
-        waypoint = get_peg_in_direction(plank[0], direction, how_many=path_distance)
-        if waypoint is not None:
-            ans.add(waypoint)
-    return ans
+    return geometry.waypoints.get(get_plank(*plank), _NO_WAYPOINTS)
 
 def get_plank(peg1: Peg, peg2: Peg) -> Plank:
     '''Takes two endpoints and returns a plank between those two endpoints'''
     # a plank is represented by a sorted tuple of the pegs it's between
     return (peg1, peg2) if peg1 < peg2 else (peg2, peg1)
 
-def get_peg_dist(peg1: Peg, peg2: Peg) -> Optional[Distance]:
+def check_planks(planks: Iterable[Plank], peg_mask: int,
+                 geometry: BoardGeometry = DEFAULT_GEOMETRY) -> None:
+    '''
+    Raises ValueError if the planks can't all be on a board with the pegs (as a peg mask):
+    ...if a plank isn't between two pegs a plank length apart in a line, goes over a peg,
+    ...or crosses or overlaps another plank.
+    '''
+    seen_planks: Set[Plank] = set()
+    covered_mask = 0
+    for plank in planks:
+        if plank not in geometry.slot_index:
+            raise ValueError("A plank can't go from {} to {}".format(*plank))
+        for peg in plank:
+            if not peg_mask >> peg & 1:
+                raise ValueError("Peg {} isn't on the board".format(peg))
+        if plank in seen_planks:
+            raise ValueError("The same plank is on the board twice")
+        waypoint_mask = geometry.waypoint_masks[plank]
+        if waypoint_mask & peg_mask:
+            raise ValueError("The plank from {} to {} goes over a peg".format(*plank))
+        if waypoint_mask & covered_mask:
+            raise ValueError("The plank from {} to {} crosses another plank".format(*plank))
+        seen_planks.add(plank)
+        covered_mask |= waypoint_mask
+
+def get_peg_dist(peg1: Peg, peg2: Peg,
+                 geometry: BoardGeometry = DEFAULT_GEOMETRY) -> Optional[Distance]:
     '''
     Gets the distance between two pegs.
     Diagonal distance is undefined - this function will return None
     '''
-    # the (peg - 1) part is needed because we need peg 15 to be on the same row as peg 11
-    # (In other words, the pegs aren't 0 indexed so it's causing problems)
-    peg1_mod = (peg1 - 1) % WIDTH
-    peg2_mod = (peg2 - 1) % WIDTH
-    abs_dist = abs(peg2 - peg1)
-    if peg1_mod == peg2_mod:
-        # they're in the same column
-        return abs_dist // WIDTH
-    else:
-        # they're not in the same column
-        if peg1 - peg1_mod == peg2 - peg2_mod:
-            # they're in the same row
-            return abs_dist
-        else:
-            # they're not in the same column or row; distance is undefined
-            return None
+    return geometry.direction_dists[peg1][peg2][1]
 
-def get_peg_direction_dist(peg1: Peg, peg2: Peg) -> Tuple[Optional[Direction], Optional[Distance]]:
+def get_peg_direction_dist(peg1: Peg, peg2: Peg, geometry: BoardGeometry = DEFAULT_GEOMETRY) -> Tuple[Optional[Direction], Optional[Distance]]: # pylint: disable=line-too-long
     '''
     Returns the direction from peg1 to peg2 and the distance between them as a tuple
     '''
-
-    # upgrade: this code is very similar to get_peg_dist
-    # the (peg - 1) part is needed because we need peg 15 to be on the same row as peg 11
-    # (In other words, the pegs aren't 0 indexed so it's causing problems)
-    peg1_mod = (peg1 - 1) % WIDTH
-    peg2_mod = (peg2 - 1) % WIDTH
-    abs_dist = abs(peg2 - peg1)
-    peg2_bigger = max((peg1, peg2)) == peg2
-    if peg1_mod == peg2_mod:
-        # they're in the same column
-        direction: Direction = 2 if peg2_bigger else 0
-        return direction, abs_dist // WIDTH
-    else:
-        # they're not in the same column
-        if peg1 - peg1_mod == peg2 - peg2_mod:
-            direction = 1 if peg2_bigger else 3
-            # they're in the same row
-            return direction, abs_dist
-        else:
-            # they're not in the same column or row; distance is undefined
-            return None, None
+    return geometry.direction_dists[peg1][peg2]
 
 
-def get_peg_in_direction(peg: Optional[Peg], direction: Direction,
-                         how_many: Distance = 1) -> Optional[Peg]: # pylint: disable=inconsistent-return-statements
+def get_peg_in_direction(peg: Optional[Peg], direction: Direction, how_many: Distance = 1,
+                         geometry: BoardGeometry = DEFAULT_GEOMETRY) -> Optional[Peg]:
     '''Returns the peg the given number of steps away from the given peg in the given direction'''
-    if how_many > 1:
-        peg = get_peg_in_direction(peg, direction, how_many - 1)
+    if direction not in DIRECTIONS:
+        raise ValueError("Unrecognized direction: {}".format(direction))
 
     if peg is None:
         return None
 
-    if direction == UP:
-        if peg > WIDTH:
-            # peg not on top
-            return peg - WIDTH
-
-    elif direction == RIGHT:
-        if peg % WIDTH:
-            # not on the right
-            return peg + 1
-
-    elif direction == DOWN:
-        if peg <= WIDTH * (HEIGHT - 1):
-            # not on bottom
-            return peg + WIDTH
-
-    elif direction == LEFT:
-        if peg % WIDTH != 1:
-            # not on the left
-            return peg - 1
+    line = geometry.neighbors[peg][direction]
+    return line[how_many] if how_many < len(line) else None
 
-    else:
-        raise ValueError("Unrecognized direction: {}".format(direction))
-
-    # I think this is needed for PEP 8.
-    # See https://github.com/python/mypy/issues/3974#issuecomment-331648044
-    return None
+def find_walks(person_position: Peg, get_ends: Callable[[Peg], Iterable[Peg]]) -> Dict[Peg, Peg]:
+    '''
+    Returns every peg the person can walk to from where they are without moving any planks,
+    ...given a function that returns the pegs at the other ends of the planks at a peg.
+    Each peg maps to the peg it is walked to from on a shortest walk; the person maps to itself.
+    '''
+    came_from = {person_position: person_position}
+    # to_visit grows as pegs are found, so it's gone through by index
+    to_visit = [person_position]
+    visited = 0
+    while visited < len(to_visit):
+        peg = to_visit[visited]
+        visited += 1
+        for other_peg in get_ends(peg):
+            if other_peg not in came_from:
+                came_from[other_peg] = peg
+                to_visit.append(other_peg)
+    return came_from
+
+def get_walk(came_from: Dict[Peg, Peg], peg: Peg) -> List[Move]:
+    '''Returns the walk moves to a peg, given the result of find_walks (or Board.get_walks)'''
+    ans = []
+    while came_from[peg] != peg:
+        ans.append(("walk", peg))
+        peg = came_from[peg]
+    ans.reverse()
+    return ans
 
 def count_grab_and_place(moves: Iterable[Move]) -> int:
     '''Counts how many grab moves and place moves combined there are. Useful for debugging.'''
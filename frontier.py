@@ -0,0 +1,178 @@
+#!/usr/local/bin/python3
+'''
+Move generation for whole layers of a search at once with NumPy.
+
+States are packed into unsigned 64-bit keys so that a layer is a single array.
+Keys only have bits for the plank slots that can be used in the puzzle
+...(see CompactPuzzle.slots_at), so they are much smaller than compact states;
+...a puzzle can have at most MAX_KEY_SLOTS usable plank slots.
+
+Needs NumPy.
+See terms.txt for the types of the different terms.
+'''
+
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from bitboard import (CompactPuzzle, State, HELD_BITS, PERSON_BITS, PLANK_SHIFT, HELD_MASK,
+                      PERSON_MASK, get_plank_mask)
+from framework import Board, Move
+
+# key layout, from the least significant bit:
+#     held plank length, person position, plank bits (one for each usable plank slot)
+KEY_PLANK_SHIFT = HELD_BITS + PERSON_BITS
+MAX_KEY_SLOTS = 64 - KEY_PLANK_SHIFT
+
+Key = int
+
+
+class FrontierExpander:
+    '''Turns compact states into keys and back, and finds every child of an array of keys'''
+    def __init__(self, puzzle: CompactPuzzle):
+        self.puzzle = puzzle
+
+        # global plank bit -> key plank bit
+        slot_bits = sorted({bit for slots in puzzle.slots_at.values() for bit, *_ in slots})
+        if len(slot_bits) > MAX_KEY_SLOTS:
+            raise ValueError("Puzzle has {} usable plank slots; keys only have room for {}".format(
+                len(slot_bits), MAX_KEY_SLOTS))
+        self._slot_bits = slot_bits
+        self._key_bits = {bit: 1 << index for index, bit in enumerate(slot_bits)}
+
+        # the plank slots at each peg, padded to the same number for every peg
+        # ...(pegs are rows, plank slots at the peg are columns)
+        width = max([len(slots) for slots in puzzle.slots_at.values()] + [1])
+        size = PERSON_MASK + 1
+        self._bits = np.zeros((size, width), dtype=np.uint64)
+        self._others = np.zeros((size, width), dtype=np.uint64)
+        self._lengths = np.zeros((size, width), dtype=np.uint64)
+        self._conflicts = np.zeros((size, width), dtype=np.uint64)
+        self._valid = np.zeros((size, width), dtype=bool)
+        for peg, slots in puzzle.slots_at.items():
+            for column, (bit, other_peg, length, conflicts) in enumerate(slots):
+                self._bits[peg, column] = self._key_bits[bit]
+                self._others[peg, column] = other_peg
+                self._lengths[peg, column] = length
+                self._conflicts[peg, column] = self._to_key_mask(conflicts)
+                self._valid[peg, column] = True
+
+    def _to_key_mask(self, plank_mask: int) -> int:
+        '''Turns a plank mask into the plank bits of a key'''
+        ans = 0
+        for bit, key_bit in self._key_bits.items():
+            if plank_mask & bit:
+                ans |= key_bit
+        return ans
+
+    def to_key(self, state: State) -> Key:
+        '''Returns the key of a compact state'''
+        key_mask = self._to_key_mask(get_plank_mask(state))
+        return (key_mask << KEY_PLANK_SHIFT) | (state & ((1 << PLANK_SHIFT) - 1))
+
+    def to_state(self, key: Key) -> State:
+        '''Returns the compact state of a key'''
+        key = int(key)
+        plank_mask = 0
+        key_mask = key >> KEY_PLANK_SHIFT
+        for index, bit in enumerate(self._slot_bits):
+            if key_mask >> index & 1:
+                plank_mask |= bit
+        return (plank_mask << PLANK_SHIFT) | (key & ((1 << KEY_PLANK_SHIFT) - 1))
+
+    def expand(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Returns the keys of every child of the keys (with repeats)
+        ...and the index in `keys` of the parent of each child.
+        '''
+        keys = keys.astype(np.uint64, copy=False)
+        plank_shift = np.uint64(KEY_PLANK_SHIFT)
+        held_bits = np.uint64(HELD_BITS)
+        people = ((keys >> held_bits) & np.uint64(PERSON_MASK)).astype(np.intp)
+
+        # (parents x plank slots at the person) arrays
+        bits = self._bits[people]
+        others = self._others[people]
+        lengths = self._lengths[people]
+        shape = bits.shape
+        planks = np.broadcast_to((keys >> plank_shift)[:, None], shape)
+        held = np.broadcast_to((keys & np.uint64(HELD_MASK))[:, None], shape)
+        positions = np.broadcast_to((people.astype(np.uint64) << held_bits)[:, None], shape)
+        parents = np.broadcast_to(np.arange(len(keys))[:, None], shape)
+
+        walks = (planks & bits) != 0
+        grabs = walks & (held == 0)
+        places = (self._valid[people] & (held != 0) & (lengths == held)
+                  & ((planks & self._conflicts[people]) == 0))
+        children = [
+            (planks[walks] << plank_shift) | (others[walks] << held_bits) | held[walks],
+            ((planks[grabs] ^ bits[grabs]) << plank_shift) | positions[grabs] | lengths[grabs],
+            ((planks[places] | bits[places]) << plank_shift) | positions[places],
+        ]
+        return (np.concatenate(children),
+                np.concatenate([parents[walks], parents[grabs], parents[places]]))
+
+    def get_people(self, keys: np.ndarray) -> np.ndarray:
+        '''Returns the person position of each key'''
+        return (keys >> np.uint64(HELD_BITS)) & np.uint64(PERSON_MASK)
+
+    def get_path(self, keys: Sequence[Key]) -> List[Move]:
+        '''Returns the moves between each key and the next, for keys that are a move apart'''
+        states = [self.to_state(key) for key in keys]
+        path = []
+        for state, child in zip(states, states[1:]):
+            path.extend([move for move in self.puzzle.get_moves(state)
+                         if self.puzzle.make_move(state, move) == child][:1])
+        return path
+
+
+class VectorBFSSolver: # pylint: disable=too-few-public-methods
+    '''
+    BFSSolver for River Crossing that expands a whole layer at a time with NumPy.
+    Finds solutions of the same length as BFSSolver.
+    '''
+    def solve(self, board: Board) -> Optional[List[Move]]:
+        '''Returns the list of moves needed to solve the board; does not edit the board'''
+        puzzle = CompactPuzzle(board)
+        expander = FrontierExpander(puzzle)
+        start_state = puzzle.encode(board)
+        if puzzle.solved(start_state):
+            return []
+
+        finish = np.uint64(puzzle.finish)
+        layer = np.array([expander.to_key(start_state)], dtype=np.uint64)
+        previous_layer = np.array([], dtype=np.uint64)
+        # each layer's keys (sorted) and the index in the layer before of each key's parent
+        # ...(the start is its own parent)
+        layers: List[Tuple[np.ndarray, np.ndarray]] = [(layer, np.array([0]))]
+        while layer.size:
+            children, parents = expander.expand(layer)
+            goals = np.flatnonzero(expander.get_people(children) == finish)
+            if goals.size:
+                return self._rebuild_path(expander, layers, children[goals[0]],
+                                          parents[goals[0]])
+
+            children, first = np.unique(children, return_index=True)
+            parents = parents[first]
+            # every move can be undone, so a child can only have been found
+            # ...in this layer or the one before
+            new = ~(contains(layer, children) | contains(previous_layer, children))
+            previous_layer, layer = layer, children[new]
+            layers.append((layer, parents[new]))
+        return None
+
+    @staticmethod
+    def _rebuild_path(expander: FrontierExpander, layers: List[Tuple[np.ndarray, np.ndarray]],
+                      goal: Key, parent_index: int) -> List[Move]:
+        '''Follows the parents back to the start, and finds the move between each pair of states'''
+        keys = [goal]
+        for layer, parents in reversed(layers):
+            keys.append(layer[parent_index])
+            parent_index = parents[parent_index]
+        return expander.get_path(keys[::-1])
+
+
+def contains(sorted_keys: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    '''Returns whether each key is in the sorted keys'''
+    if not sorted_keys.size:
+        return np.zeros(len(keys), dtype=bool)
+    positions = np.searchsorted(sorted_keys, keys).clip(max=len(sorted_keys) - 1)
+    return sorted_keys[positions] == keys
@@ -0,0 +1,218 @@
+#!/usr/local/bin/python3
+'''
+Generates random River Crossing puzzles and rates how hard they are.
+
+Random layouts are cheaply checked first (the person has to be able to move, and the finish has to
+...be reachable if planks could cross), and only then searched.
+Puzzles are rated by searching every state where the person is somewhere different in the
+...group of pegs they can walk around (see bitboard.ComponentPuzzle), which gives:
+    the fewest grab and place moves needed to solve it,
+    how many different ways there are of solving it with that many grab and place moves,
+    how many states there are, and how many plank moves there are from each state on average.
+
+Can be run from the command line; see `python3 generator.py --help`.
+The puzzles are printed in the same format that batch.py reads.
+See terms.txt for the types of the different terms.
+'''
+
+import argparse
+import json
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Set
+from bitboard import ComponentPuzzle, State
+from framework import Board, Plank
+from geometry import BoardGeometry, DEFAULT_GEOMETRY, get_geometry
+from solvers import PlankMoveHeuristic
+
+
+class PuzzleRating: # pylint: disable=too-few-public-methods
+    '''How hard a puzzle is'''
+    def __init__(self, plank_moves: Optional[int], solutions: int, states: int,
+                 branching_factor: float):
+        # the fewest grab and place moves needed to solve the puzzle; None if it can't be solved
+        self.plank_moves = plank_moves
+        # how many ways there are to solve the puzzle with that many grab and place moves
+        self.solutions = solutions
+        # how many states can be reached, not counting where the person is in their group of pegs
+        self.states = states
+        # how many grab and place moves there are from a state on average
+        self.branching_factor = branching_factor
+
+    def to_dict(self) -> Dict[str, object]:
+        '''Returns the rating as a dictionary (for JSON)'''
+        return dict(vars(self))
+
+
+def rate_puzzle(board: Board, max_states: Optional[int] = None) -> Optional[PuzzleRating]:
+    '''
+    Rates a puzzle by searching every state that can be reached from it.
+    Returns None if there are more than max_states states.
+    '''
+    puzzle = ComponentPuzzle(board)
+    start_state = puzzle.encode(board)
+
+    # {state: number of shortest ways to reach it} for the states in the current layer
+    layer: Dict[State, int] = {start_state: 1}
+    seen: Set[State] = {start_state}
+    plank_moves: Optional[int] = None
+    solutions = 0
+    moves_made = 0
+    depth = 0
+    while layer:
+        if plank_moves is None:
+            solutions = sum(count for state, count in layer.items() if puzzle.solved(state))
+            if solutions:
+                plank_moves = depth
+
+        next_layer: Dict[State, int] = {}
+        for state, count in layer.items():
+            children = {puzzle.make_move(state, move) for move in puzzle.get_moves(state)}
+            moves_made += len(children)
+            for child in children:
+                if child in next_layer:
+                    next_layer[child] += count
+                elif child not in seen:
+                    seen.add(child)
+                    next_layer[child] = count
+        if max_states is not None and len(seen) > max_states:
+            return None
+        layer = next_layer
+        depth += 1
+
+    return PuzzleRating(plank_moves, solutions, len(seen), moves_made / len(seen))
+
+
+def create_random_board(rng: random.Random, peg_count: int, plank_lengths: Sequence[int],
+                        geometry: BoardGeometry = DEFAULT_GEOMETRY) -> Optional[Board]:
+    '''
+    Returns a random board with the person starting on the bottom row and finishing on the top row,
+    ...or None if the planks couldn't all be placed.
+    The first plank is always placed at the start.
+    Raises ValueError if there are fewer than 2 pegs, since the start and finish need one each.
+    '''
+    if peg_count < 2:
+        raise ValueError("A board needs at least 2 pegs (the start and the finish), not {}".format(
+            peg_count))
+    width, last_peg = geometry.width, geometry.peg_count
+    start = rng.randrange(last_peg - width + 1, last_peg + 1)
+    finish = rng.randrange(1, width + 1)
+    pegs = {start, finish}
+    pegs.update(rng.sample(range(width + 1, last_peg - width + 1),
+                           min(peg_count - 2, width * (geometry.height - 2))))
+
+    planks: List[Plank] = []
+    covered: Set[int] = set()
+    for index, length in enumerate(plank_lengths):
+        options = [plank for slot, plank in enumerate(geometry.plank_slots)
+                   if geometry.slot_lengths[slot] == length
+                   and plank[0] in pegs and plank[1] in pegs
+                   and (index or start in plank) and plank not in planks
+                   and not geometry.waypoints[plank] & (pegs | covered)]
+        if not options:
+            return None
+        plank = rng.choice(options)
+        planks.append(plank)
+        covered |= geometry.waypoints[plank]
+    return Board(start, finish, pegs, planks, geometry=geometry)
+
+def is_plausible(board: Board) -> bool:
+    '''
+    Quickly checks things that any solvable puzzle needs (but that not every puzzle with them is):
+    ...the person starts next to a plank (or on the finish), and planks no longer than
+    ...the longest plank could connect the start to the finish.
+    '''
+    if board.solved():
+        return True
+    if not any(board.person_position in plank for plank in board.planks):
+        return False
+    puzzle = ComponentPuzzle(board)
+    heuristic = PlankMoveHeuristic(puzzle.puzzle, puzzle.puzzle.encode(board))
+    return heuristic(puzzle.puzzle.encode(board)) != float('inf')
+
+
+def _evaluate_candidate(seed: int, peg_count: int, plank_lengths: Sequence[int],
+                        max_states: Optional[int],
+                        geometry: BoardGeometry) -> Optional[Dict[str, object]]:
+    '''
+    Creates and rates the candidate for a seed in a worker process.
+    Returns the puzzle in batch.py's format with its rating, or None if it was rejected.
+    '''
+    board = create_random_board(random.Random(seed), peg_count, plank_lengths, geometry)
+    if board is None or not is_plausible(board):
+        return None
+    rating = rate_puzzle(board, max_states)
+    if rating is None or rating.plank_moves is None:
+        return None
+    definition: Dict[str, object] = {
+        'name': 'generated-{}'.format(seed), 'start': board.person_position,
+        'finish': board.finish, 'pegs': sorted(board.pegs), 'planks': sorted(board.planks)}
+    if geometry != DEFAULT_GEOMETRY:
+        definition.update(width=geometry.width, height=geometry.height,
+                          plank_lengths=list(geometry.plank_lengths))
+    definition['rating'] = rating.to_dict()
+    return definition
+
+def generate_puzzles(candidates: int, seed: int = 0, peg_count: int = 14,
+                     plank_lengths: Sequence[int] = (1, 2, 3), min_plank_moves: int = 0,
+                     max_plank_moves: Optional[int] = None, unique: bool = False,
+                     max_states: Optional[int] = 100000, workers: Optional[int] = None,
+                     geometry: BoardGeometry = DEFAULT_GEOMETRY) -> Iterator[Dict[str, object]]:
+    '''
+    Tries the given number of random candidates across a pool of worker processes,
+    ...and yields the ones that pass (in batch.py's format, with a "rating").
+    Candidates are numbered from the seed, so the same arguments always give the same puzzles.
+    unique: only keep puzzles with one way of solving them in the fewest grab and place moves
+    max_states: candidates with more states than this are thrown out instead of rated
+    geometry: the size of the boards and the plank lengths allowed on them
+              ...(which have to include plank_lengths)
+    '''
+    with ProcessPoolExecutor(workers) as pool:
+        seeds = range(seed, seed + candidates)
+        results = pool.map(_evaluate_candidate, seeds, [peg_count] * candidates,
+                           [tuple(plank_lengths)] * candidates, [max_states] * candidates,
+                           [geometry] * candidates,
+                           chunksize=max(1, min(100, candidates // 32)))
+        for result in results:
+            if result is None:
+                continue
+            rating = result['rating']
+            assert isinstance(rating, dict)
+            if rating['plank_moves'] < min_plank_moves:
+                continue
+            if max_plank_moves is not None and rating['plank_moves'] > max_plank_moves:
+                continue
+            if unique and rating['solutions'] != 1:
+                continue
+            yield result
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    '''Command line entry point; prints one puzzle per line'''
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('candidates', type=int, help='how many random puzzles to try')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pegs', type=int, default=14, help='pegs on each board')
+    parser.add_argument('--width', type=int, default=DEFAULT_GEOMETRY.width)
+    parser.add_argument('--height', type=int, default=DEFAULT_GEOMETRY.height)
+    parser.add_argument('--planks', type=int, nargs='+', default=[1, 2, 3],
+                        help='lengths of the planks on each board')
+    parser.add_argument('--min-plank-moves', type=int, default=0)
+    parser.add_argument('--max-plank-moves', type=int)
+    parser.add_argument('--unique', action='store_true',
+                        help='only keep puzzles with one shortest solution')
+    parser.add_argument('--max-states', type=int, default=100000)
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parsed = parser.parse_args(arguments)
+    # the usual plank lengths are allowed too, as long as they fit
+    plank_lengths = {length for length in DEFAULT_GEOMETRY.plank_lengths
+                     if length < max(parsed.width, parsed.height)}
+    geometry = get_geometry(parsed.width, parsed.height, plank_lengths | set(parsed.planks))
+
+    for puzzle in generate_puzzles(parsed.candidates, parsed.seed, parsed.pegs, parsed.planks,
+                                   parsed.min_plank_moves, parsed.max_plank_moves, parsed.unique,
+                                   parsed.max_states, parsed.workers, geometry):
+        print(json.dumps(puzzle), flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/local/bin/python3
+'''
+Lookup tables for the geometry of the River Crossing board
+
+A BoardGeometry is the size of the board and the lengths planks can be.
+Everything here only depends on the geometry, so its tables are computed once for each geometry
+...(get_geometry hands out the same object every time it's asked for the same geometry).
+The tables are tuples, frozensets and read-only mappings so that nothing can change them
+...by accident.
+Pegs are 1-indexed, so index 0 of the tables indexed by peg is unused.
+
+The module constants (WIDTH, NEIGHBORS, PLANK_SLOTS, ...) are the tables of DEFAULT_GEOMETRY,
+...the geometry of the real game.
+
+See terms.txt for the types of the different terms.
+'''
+
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Tuple, Optional, Dict, FrozenSet, Iterable, List, Mapping
+
+UP, RIGHT, DOWN, LEFT = 0, 1, 2, 3
+DIRECTIONS = (UP, RIGHT, DOWN, LEFT)
+# the biggest boards a geometry can have; states (see bitboard.py) leave room for boards this big
+MAX_WIDTH = 9
+MAX_HEIGHT = 9
+
+# types are duplicated from framework.py since framework.py imports this module
+Peg = int
+Plank = Tuple[Peg, Peg]
+Direction = int
+Distance = int
+# (plank slot, other peg, waypoint mask)
+PlankEnd = Tuple[int, Peg, int]
+# (direction, distance) from one peg to another, or (None, None) if they don't line up
+DirectionDist = Tuple[Optional[Direction], Optional[Distance]]
+
+
+class BoardGeometry: # pylint: disable=too-many-instance-attributes
+    '''
+    The size of a board and the plank lengths allowed on it, with lookup tables for them.
+    Use get_geometry instead of creating these directly, so the tables are only built once.
+    '''
+    def __init__(self, width: int, height: int, plank_lengths: Iterable[Distance]):
+        plank_lengths = tuple(sorted(set(plank_lengths)))
+        if not (1 <= width <= MAX_WIDTH and 1 <= height <= MAX_HEIGHT):
+            raise ValueError("Boards can be at most {}x{}, not {}x{}".format(
+                MAX_WIDTH, MAX_HEIGHT, width, height))
+        if not plank_lengths or not all(0 < length < max(width, height)
+                                        for length in plank_lengths):
+            raise ValueError("Plank lengths {} don't fit on a {}x{} board".format(
+                plank_lengths, width, height))
+        self.width = width
+        self.height = height
+        self.plank_lengths = plank_lengths
+        # the longest plank allowed
+        self.max_plank_length = plank_lengths[-1]
+        self.peg_count = width * height
+        self.pegs = tuple(range(1, self.peg_count + 1))
+
+        # neighbors[peg][direction][distance]: the peg `distance` steps away,
+        # ...or None if off the board
+        self.neighbors = self._build_neighbors()
+        # direction_dists[peg1][peg2]: (direction, distance) from peg1 to peg2,
+        # ...or (None, None) if they're not in the same row or column
+        self.direction_dists = self._build_direction_dists()
+        # waypoints[plank]: the pegs under the plank that are not its endpoints
+        self.waypoints = self._build_waypoints()
+        # waypoint_masks[plank]: the waypoints of the plank as a peg mask
+        # ...(bit `peg` is set for each peg)
+        self.waypoint_masks: Mapping[Plank, int] = MappingProxyType(
+            {plank: sum(1 << peg for peg in waypoints)
+             for plank, waypoints in self.waypoints.items()})
+
+        # every plank of an allowed length that could be on the board, in a fixed order;
+        # ...the index of a plank here is its plank slot
+        self.plank_slots: Tuple[Plank, ...] = tuple(
+            plank for plank in self.waypoints if len(self.waypoints[plank]) + 1 in plank_lengths)
+        self.slot_index: Mapping[Plank, int] = MappingProxyType(
+            {plank: slot for slot, plank in enumerate(self.plank_slots)})
+        self.slot_lengths: Tuple[Distance, ...] = tuple(len(self.waypoints[plank]) + 1
+                                                        for plank in self.plank_slots)
+        self.slot_waypoint_masks: Tuple[int, ...] = tuple(self.waypoint_masks[plank]
+                                                          for plank in self.plank_slots)
+        # plank_ends[peg][length]: every (plank slot, other peg, waypoint mask) for planks
+        # ...of that length that could have an end at the peg, in direction order
+        self.plank_ends = self._build_plank_ends()
+
+    def __repr__(self) -> str:
+        return 'get_geometry({}, {}, {})'.format(self.width, self.height, self.plank_lengths)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, BoardGeometry):
+            return self.get_definition() == other.get_definition()
+        return False
+
+    def __hash__(self) -> int:
+        return hash(self.get_definition())
+
+    def __reduce__(self) -> Tuple[object, Tuple[int, int, Tuple[Distance, ...]]]:
+        # send just the definition between processes, and use the other process's tables
+        return get_geometry, self.get_definition()
+
+    def get_definition(self) -> Tuple[int, int, Tuple[Distance, ...]]:
+        '''Returns (width, height, plank lengths)'''
+        return (self.width, self.height, self.plank_lengths)
+
+    def _step(self, peg: Peg, direction: Direction) -> Optional[Peg]:
+        '''Returns the peg next to the given peg in the given direction'''
+        row, column = divmod(peg - 1, self.width)
+        if direction == UP:
+            row -= 1
+        elif direction == RIGHT:
+            column += 1
+        elif direction == DOWN:
+            row += 1
+        else:
+            column -= 1
+        if 0 <= row < self.height and 0 <= column < self.width:
+            return row * self.width + column + 1
+        return None
+
+    def _build_neighbors(self) -> Tuple[Tuple[Tuple[Optional[Peg], ...], ...], ...]:
+        '''
+        Returns the table of pegs in each direction from each peg.
+        The peg `distance` steps from `peg` in `direction` is table[peg][direction][distance];
+        ...the peg at distance 0 is the peg itself.
+        '''
+        max_distance = max(self.width, self.height)
+        table: List[Tuple[Tuple[Optional[Peg], ...], ...]] = [()]
+        for peg in self.pegs:
+            in_directions = []
+            for direction in DIRECTIONS:
+                line: List[Optional[Peg]] = [peg]
+                for _ in range(max_distance):
+                    previous = line[-1]
+                    line.append(None if previous is None else self._step(previous, direction))
+                in_directions.append(tuple(line))
+            table.append(tuple(in_directions))
+        return tuple(table)
+
+    def _build_direction_dists(self) -> Tuple[Tuple[DirectionDist, ...], ...]:
+        '''Returns the table of (direction, distance) from each peg to each peg'''
+        no_direction_dist: DirectionDist = (None, None)
+        table = [tuple([no_direction_dist] * (self.peg_count + 1))]
+        for peg1 in self.pegs:
+            row = [no_direction_dist] * (self.peg_count + 1)
+            for direction in DIRECTIONS:
+                for distance, peg2 in enumerate(self.neighbors[peg1][direction]):
+                    if peg2 is not None and distance:
+                        row[peg2] = (direction, distance)
+            # pegs are 0 away from themselves; like before, the direction is down
+            row[peg1] = (DOWN, 0)
+            table.append(tuple(row))
+        return tuple(table)
+
+    def _build_waypoints(self) -> Mapping[Plank, FrozenSet[Peg]]:
+        '''Returns the waypoints of every plank that could be on an empty board of any length'''
+        table: Dict[Plank, FrozenSet[Peg]] = {}
+        for peg in self.pegs:
+            # only look right and down so that each plank is found once
+            for direction in (RIGHT, DOWN):
+                line = self.neighbors[peg][direction]
+                for distance in range(1, len(line)):
+                    other_peg = line[distance]
+                    if other_peg is not None:
+                        # the pegs between two pegs on the board are on the board too
+                        table[(peg, other_peg)] = frozenset(
+                            waypoint for waypoint in line[1:distance] if waypoint is not None)
+        return MappingProxyType(table)
+
+    def _build_plank_ends(self) -> Tuple[Tuple[Tuple[PlankEnd, ...], ...], ...]:
+        '''Returns the table of plank slots starting at each peg for each plank length'''
+        table: List[Tuple[Tuple[PlankEnd, ...], ...]] = [()]
+        for peg in self.pegs:
+            by_length = []
+            for length in range(self.max_plank_length + 1):
+                ends = []
+                for direction in DIRECTIONS:
+                    other_peg = self.neighbors[peg][direction][length] if length else None
+                    if other_peg is not None and length in self.plank_lengths:
+                        plank = (peg, other_peg) if peg < other_peg else (other_peg, peg)
+                        ends.append((self.slot_index[plank], other_peg, self.waypoint_masks[plank]))
+                by_length.append(tuple(ends))
+            table.append(tuple(by_length))
+        return tuple(table)
+
+
+def get_geometry(width: int = 5, height: int = 7,
+                 plank_lengths: Iterable[Distance] = (1, 2, 3)) -> BoardGeometry:
+    '''Returns the geometry for a board size and plank lengths, building its tables only once'''
+    return _get_geometry(width, height, tuple(sorted(set(plank_lengths))))
+
+@lru_cache(maxsize=None)
+def _get_geometry(width: int, height: int, plank_lengths: Tuple[Distance, ...]) -> BoardGeometry:
+    '''get_geometry, with the plank lengths already sorted so the same geometries are cached once'''
+    return BoardGeometry(width, height, plank_lengths)
+
+# the geometry of the real game
+DEFAULT_GEOMETRY = get_geometry()
+
+WIDTH = DEFAULT_GEOMETRY.width
+HEIGHT = DEFAULT_GEOMETRY.height
+# the longest plank in River Crossing
+MAX_PLANK_LENGTH = DEFAULT_GEOMETRY.max_plank_length
+PEG_COUNT = DEFAULT_GEOMETRY.peg_count
+PEGS = DEFAULT_GEOMETRY.pegs
+NEIGHBORS = DEFAULT_GEOMETRY.neighbors
+DIRECTION_DISTS = DEFAULT_GEOMETRY.direction_dists
+WAYPOINTS = DEFAULT_GEOMETRY.waypoints
+WAYPOINT_MASKS = DEFAULT_GEOMETRY.waypoint_masks
+PLANK_SLOTS = DEFAULT_GEOMETRY.plank_slots
+SLOT_INDEX = DEFAULT_GEOMETRY.slot_index
+SLOT_LENGTHS = DEFAULT_GEOMETRY.slot_lengths
+SLOT_WAYPOINT_MASKS = DEFAULT_GEOMETRY.slot_waypoint_masks
+PLANK_ENDS = DEFAULT_GEOMETRY.plank_ends
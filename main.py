@@ -9,7 +9,8 @@ if __name__ == "__main__":
     # pylint: disable=invalid-name
     from solvers import BFSSolver
     from puzzles import Expert39, Expert40, EXPERT40_TRANSLATOR, EXPERT40_SOLUTION
-    from util import convert_to_rc_solution, SolutionStepper, invert_dictionary
+    from util import convert_to_rc_solution, invert_dictionary
+    from replay import SolutionReplayer
     from framework import Board
     puzzle: Board = Expert39()
     solver = BFSSolver()
@@ -18,7 +19,7 @@ if __name__ == "__main__":
 
     puzzle = Expert40()
     solver = BFSSolver()
-    # this takes around 10 seconds on my computer
+    # run `python3 benchmark.py --solvers bfs --puzzles Expert40` to see how long this takes
     solution = solver.solve(puzzle)
     assert solution
     print("Solution to Expert Puzzle #40: {}".format(solution))
@@ -29,15 +30,15 @@ if __name__ == "__main__":
     # I believe this solution has less walk moves, which is why the BFS solver finds it first
     print("River Crossing solution to Expert Puzzle #40: {}".format(rc_solution))
 
-    my_stepper = SolutionStepper(Expert40, rc_solution,
-                                 invert_dictionary(EXPERT40_TRANSLATOR))
+    # replaying checks that every move of the solution is allowed
+    my_replayer = SolutionReplayer(Expert40(), rc_solution, invert_dictionary(EXPERT40_TRANSLATOR))
     # the puzzle after 26 RC moves
-    my_puzzle_after_moves = my_stepper.get_puzzle_at_step(26)
+    my_puzzle_after_moves = my_replayer.get_board_at_step(26)
     print("The board after 26 moves of my solution: {}".format(my_puzzle_after_moves))
 
-    real_stepper = SolutionStepper(Expert40, EXPERT40_SOLUTION,
-                                   invert_dictionary(EXPERT40_TRANSLATOR))
-    real_puzzle_after_moves = real_stepper.get_puzzle_at_step(26)
+    real_replayer = SolutionReplayer(Expert40(), EXPERT40_SOLUTION,
+                                     invert_dictionary(EXPERT40_TRANSLATOR))
+    real_puzzle_after_moves = real_replayer.get_board_at_step(26)
     print("The board after 26 moves of the real solution: {}".format(real_puzzle_after_moves))
 
     # the solutions are not equivalent
@@ -46,11 +47,10 @@ if __name__ == "__main__":
     # determine at what step my solution and the real solution diverge
     # note that you can also determine this just by looking at the solution strings
     # ...but this provides more of a tutorial
-    my_puzzle_after_moves, real_puzzle_after_moves = None, None # type: ignore
-    diverge_step = -1
-    while my_puzzle_after_moves == real_puzzle_after_moves:
-        diverge_step += 1
-        my_puzzle_after_moves = my_stepper.get_puzzle_at_step(diverge_step)
-        real_puzzle_after_moves = real_stepper.get_puzzle_at_step(diverge_step)
+    # iterating over a replayer gives the board after each step, one step at a time
+    for diverge_step, (my_puzzle_after_moves, real_puzzle_after_moves) in enumerate(
+            zip(my_replayer, real_replayer)):
+        if my_puzzle_after_moves != real_puzzle_after_moves:
+            break
 
     print("My solution and the real solution diverge at step {}".format(diverge_step))
@@ -2,16 +2,172 @@
 '''Classes for solving problems that can be modeled as a directed graph with goal nodes'''
 
 # pylint: disable=too-few-public-methods
+import heapq
+import os
+import sys
+import threading
+import time
 from collections import deque
-from typing import Callable, Iterable, List, Deque, Tuple, Dict, Optional, Hashable, Generic, TypeVar # pylint: disable=line-too-long
+import multiprocessing
+from multiprocessing.queues import Queue
+from multiprocessing.connection import Connection, wait
+from itertools import count
+from typing import Callable, Iterable, Iterator, List, Deque, Tuple, Dict, Optional, Hashable, Generic, TypeVar, Sized, Any, cast # pylint: disable=line-too-long
 
 # pylint: disable=invalid-name
 # Type definitions
 GenericInfo = TypeVar('GenericInfo')
 GenericName = TypeVar('GenericName', bound=Hashable)
 GenericMove = TypeVar('GenericMove')
+GenericFunction = TypeVar('GenericFunction', bound=Callable[..., Any])
 # pylint: enable=invalid-name
 
+_FUNCTION_KINDS = ('namer', 'detector', 'expander', 'follower')
+# the most names IDDFSSolver and IDAStarSolver remember by default (roughly 100 MB of names)
+DEFAULT_TABLE_SIZE = 1 << 20
+
+class SolverStats:
+    '''
+    Counts of how much work a NodeSolver did; see NodeSolver.enable_stats.
+    Work done in other processes (by ParallelBFSSolver's workers) is only counted as
+    ...the nodes sent to them and the children they send back.
+    '''
+    def __init__(self) -> None:
+        # {'namer' / 'detector' / 'expander' / 'follower': number of calls}
+        self.calls: Dict[str, int] = dict.fromkeys(_FUNCTION_KINDS, 0)
+        # {'namer' / 'detector' / 'expander' / 'follower': seconds spent in calls}
+        self.seconds: Dict[str, float] = dict.fromkeys(_FUNCTION_KINDS, 0.0)
+        # how many children were thrown out because they had already been found
+        self.duplicates_pruned = 0
+        # the most nodes waiting to be expanded at once
+        self.peak_frontier = 0
+        # the most nodes remembered at once, and roughly how many bytes that took
+        # ...(only counting the container, not the names and infos in it)
+        self.peak_visited = 0
+        self.peak_visited_bytes = 0
+
+    @property
+    def nodes_expanded(self) -> int:
+        '''How many nodes had their moves found'''
+        return self.calls['expander']
+
+    @property
+    def nodes_generated(self) -> int:
+        '''How many moves were followed'''
+        return self.calls['follower']
+
+    def record_frontier(self, frontier_size: int, *visited: Sized) -> None:
+        '''Updates the peaks with the size of the frontier and the containers of visited nodes'''
+        if frontier_size > self.peak_frontier:
+            self.peak_frontier = frontier_size
+        visited_size = sum(len(container) for container in visited)
+        if visited_size > self.peak_visited:
+            self.peak_visited = visited_size
+            self.peak_visited_bytes = sum(sys.getsizeof(container) for container in visited)
+
+    def to_dict(self) -> Dict[str, Any]:
+        '''Returns the stats as a dictionary (for JSON)'''
+        return {'nodes_expanded': self.nodes_expanded, 'nodes_generated': self.nodes_generated,
+                'duplicates_pruned': self.duplicates_pruned, 'peak_frontier': self.peak_frontier,
+                'peak_visited': self.peak_visited, 'peak_visited_bytes': self.peak_visited_bytes,
+                'calls': dict(self.calls), 'seconds': dict(self.seconds)}
+
+def _timed(function: GenericFunction, stats: SolverStats, kind: str) -> GenericFunction:
+    '''Returns a version of the function that counts and times its calls in the stats'''
+    def timed_function(*arguments: Any) -> Any:
+        start_time = time.perf_counter()
+        ans = function(*arguments)
+        stats.seconds[kind] += time.perf_counter() - start_time
+        stats.calls[kind] += 1
+        return ans
+    return cast(GenericFunction, timed_function)
+
+
+# the statuses of a budgeted solve (see NodeSolver.solve_within)
+OPTIMAL = 'optimal' # the solution has the fewest moves there can be
+FEASIBLE = 'feasible' # the solution works, but there might be a shorter one
+UNSOLVABLE = 'unsolvable' # every node that can be reached was searched, and none are goals
+UNKNOWN = 'unknown' # the budget ran out before anything was found
+# the weights of the heuristic in each search of NodeSolver.solve_within, from the first to the last
+ANYTIME_WEIGHTS = (5.0, 3.0, 2.0, 1.5, 1.0)
+# the fraction of the budget left after the first solution is found that is held back
+# ...for cutting the loops out of the best solution at the end
+SHORTENING_SHARE = 0.1
+
+class CancellationToken:
+    '''Lets another thread stop a budgeted solve early; see NodeSolver.solve_within'''
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        '''Stops every solve using this token, as soon as it next checks its budget'''
+        self._event.set()
+
+    def is_cancelled(self) -> bool:
+        '''Returns whether cancel has been called'''
+        return self._event.is_set()
+
+
+class Budget:
+    '''How much a budgeted solve can do: a time limit, a limit on nodes expanded, and a token'''
+    def __init__(self, time_limit: Optional[float] = None, node_limit: Optional[int] = None,
+                 token: Optional[CancellationToken] = None):
+        '''
+        time_limit: seconds from now until the solve has to stop
+        node_limit: the most nodes that can be expanded
+        token: stops the solve when it's cancelled
+        '''
+        self.deadline = None if time_limit is None else time.perf_counter() + time_limit
+        self.node_limit = node_limit
+        self.token = token
+        self.nodes_expanded = 0
+        # the seconds and nodes held back by reserve
+        self._reserved_time = 0.0
+        self._reserved_nodes = 0
+
+    def reserve(self, fraction: float) -> None:
+        '''Holds back a fraction of what is left, so spend runs out early until release is called'''
+        if self.deadline is not None:
+            self._reserved_time = max(0.0, self.deadline - time.perf_counter()) * fraction
+        if self.node_limit is not None:
+            self._reserved_nodes = int((self.node_limit - self.nodes_expanded) * fraction)
+
+    def release(self) -> None:
+        '''Lets spend use what reserve held back'''
+        self._reserved_time = 0.0
+        self._reserved_nodes = 0
+
+    def spend(self) -> bool:
+        '''Counts a node about to be expanded; returns False if the budget has run out instead'''
+        if (self.node_limit is not None
+                and self.nodes_expanded >= self.node_limit - self._reserved_nodes):
+            return False
+        if (self.deadline is not None
+                and time.perf_counter() >= self.deadline - self._reserved_time):
+            return False
+        if self.token is not None and self.token.is_cancelled():
+            return False
+        self.nodes_expanded += 1
+        return True
+
+
+class BudgetedResult(Generic[GenericMove]):
+    '''The best a budgeted solve could do; see NodeSolver.solve_within'''
+    def __init__(self, status: str, solution: Optional[List[GenericMove]], nodes_expanded: int,
+                 wall_time: float):
+        # OPTIMAL, FEASIBLE, UNSOLVABLE or UNKNOWN
+        self.status = status
+        # the best solution found, or None if none was found
+        self.solution = solution
+        self.nodes_expanded = nodes_expanded
+        self.wall_time = wall_time
+
+    def __repr__(self) -> str:
+        return '<BudgetedResult: {}, {} moves, {} nodes, {:.4f}s>'.format(
+            self.status, None if self.solution is None else len(self.solution),
+            self.nodes_expanded, self.wall_time)
+
+
 class NodeSolver(Generic[GenericInfo, GenericName, GenericMove]):
     '''Class for modeling problems that can be modeled as a directed graph with goal nodes'''
     def __init__(self, namer: Callable[[GenericInfo], GenericName],
@@ -33,6 +189,155 @@ class NodeSolver(Generic[GenericInfo, GenericName, GenericMove]):
         self.is_goal = detector
         self.get_moves = expander
         self.follow_move = follower
+        # set by enable_stats; solvers only do any extra work when this is not None
+        self.stats: Optional[SolverStats] = None
+        self._unwrapped_functions = (namer, detector, expander, follower)
+
+    def enable_stats(self) -> SolverStats:
+        '''
+        Starts counting the work done by this solver, and returns the stats that will be updated.
+        Each solve adds to the same stats; call this again for fresh stats.
+        '''
+        self.stats = stats = SolverStats()
+        namer, detector, expander, follower = self._unwrapped_functions
+        self.get_name = _timed(namer, stats, 'namer')
+        self.is_goal = _timed(detector, stats, 'detector')
+        self.get_moves = _timed(expander, stats, 'expander')
+        self.follow_move = _timed(follower, stats, 'follower')
+        return stats
+
+    def disable_stats(self) -> None:
+        '''Stops counting the work done by this solver'''
+        self.stats = None
+        self.get_name, self.is_goal, self.get_moves, self.follow_move = self._unwrapped_functions
+
+    def solve(self, start_info: GenericInfo) -> Optional[List[GenericMove]]:
+        '''
+        Returns the moves from the node represented by the parameter to a goal node,
+        ...or None if there is no way to reach one. Each kind of solver searches its own way.
+        '''
+        raise NotImplementedError
+
+    def solve_within(self, start_info: GenericInfo, time_limit: Optional[float] = None,
+                     node_limit: Optional[int] = None, token: Optional[CancellationToken] = None,
+                     heuristic: Optional[Callable[[GenericInfo], float]] = None) -> BudgetedResult[GenericMove]: # pylint: disable=line-too-long
+        '''
+        Solves within a budget (see Budget), and returns the best that could be done in it.
+        heuristic: takes info and returns a lower bound on the moves left to reach a goal node
+                   ...(like AStarSolver's); None for no heuristic, which makes the first search
+                   ...a breadth-first search
+        First a weighted A* search (with the first of ANYTIME_WEIGHTS) finds a solution quickly.
+        Then SHORTENING_SHARE of what is left of the budget is held back, and searches with
+        ...smaller and smaller weights look for shorter solutions, never going down a path
+        ...that can't beat the best solution so far. Last, loops are cut out of the best solution.
+        The result is OPTIMAL or UNSOLVABLE if a search proved it, FEASIBLE if a solution
+        ...was found but might not be the shortest, and UNKNOWN if nothing was found.
+        '''
+        start_time = time.perf_counter()
+        budget = Budget(time_limit, node_limit, token)
+        def result(status: str, solution: Optional[List[GenericMove]]) -> BudgetedResult:
+            return BudgetedResult(status, solution, budget.nodes_expanded,
+                                  time.perf_counter() - start_time)
+
+        if self.is_goal(start_info):
+            return result(OPTIMAL, [])
+        estimate = _no_heuristic if heuristic is None else heuristic
+        weights = ANYTIME_WEIGHTS if heuristic is not None else (1.0,)
+        finished, best = self._best_first_within(start_info, budget, estimate, weights[0])
+        if best is None:
+            return result(UNSOLVABLE if finished else UNKNOWN, None)
+
+        optimal = weights[0] == 1
+        budget.reserve(SHORTENING_SHARE)
+        for weight in weights[1:]:
+            if optimal:
+                break
+            finished, path = self._best_first_within(start_info, budget, estimate, weight,
+                                                     len(best))
+            if not finished:
+                break
+            if path is None:
+                # nothing shorter than the best solution could be reached
+                optimal = True
+            else:
+                best = path
+                optimal = weight == 1
+        budget.release()
+        if optimal:
+            return result(OPTIMAL, best)
+        return result(FEASIBLE, self._shorten_within(start_info, best, budget))
+
+    def _best_first_within(self, start_info: GenericInfo, budget: Budget,
+                           heuristic: Callable[[GenericInfo], float], weight: float,
+                           bound: Optional[int] = None) -> Tuple[bool, Optional[List[GenericMove]]]: # pylint: disable=line-too-long
+        '''
+        Weighted A* search (moves cost 1, and the heuristic counts `weight` times)
+        ...that stops when the budget runs out.
+        Nodes are searched again if a shorter path to them is found, and paths that can't reach
+        ...a goal in fewer than `bound` moves (if given) aren't followed, so if nothing is found,
+        ...there is no path to a goal shorter than the bound.
+        With a weight of 1 and a heuristic that never overestimates, the path found is a shortest.
+        Returns (whether the search finished, the path to the goal found or None).
+        '''
+        start_name = self.get_name(start_info)
+        # {name: (info, moves to reach)}
+        name_to_data: Dict[GenericName, Tuple[GenericInfo, int]] = {start_name: (start_info, 0)}
+        parents: Dict[GenericName, Tuple[GenericName, GenericMove]] = {}
+        # entries are (weighted estimated total, estimate left, tiebreaker, moves to reach, name)
+        tiebreaker = count()
+        estimate = heuristic(start_info)
+        queue = [(weight * estimate, estimate, next(tiebreaker), 0, start_name)]
+        while queue:
+            _, _, _, moves, current_name = heapq.heappop(queue)
+            current_info, best_moves = name_to_data[current_name]
+            if moves > best_moves:
+                # a shorter way here was found after this was queued
+                continue
+            if self.is_goal(current_info):
+                return True, _rebuild_path(parents, current_name)
+            if not budget.spend():
+                return False, None
+
+            child_moves = moves + 1
+            for move in self.get_moves(current_info):
+                child_info = self.follow_move(current_info, move)
+                child_name = self.get_name(child_info)
+                seen = name_to_data.get(child_name)
+                if seen is not None and seen[1] <= child_moves:
+                    continue
+                estimate = heuristic(child_info)
+                if estimate == float('inf') or (bound is not None
+                                                and child_moves + estimate >= bound):
+                    continue
+                name_to_data[child_name] = (child_info, child_moves)
+                parents[child_name] = (current_name, move)
+                heapq.heappush(queue, (child_moves + weight * estimate, estimate,
+                                       next(tiebreaker), child_moves, child_name))
+        return True, None
+
+    def _shorten_within(self, start_info: GenericInfo, path: List[GenericMove],
+                        budget: Budget) -> List[GenericMove]:
+        '''
+        Shortens a path by jumping from each node to the node furthest along the path
+        ...that one of its moves leads to, until the budget runs out.
+        '''
+        infos = [start_info]
+        for move in path:
+            infos.append(self.follow_move(infos[-1], move))
+        # {name: where it is on the path}
+        positions = {self.get_name(info): index for index, info in enumerate(infos)}
+        ans = []
+        index = 0
+        while index < len(path):
+            next_index, next_move = index + 1, path[index]
+            if budget.spend():
+                for move in self.get_moves(infos[index]):
+                    child_index = positions.get(self.get_name(self.follow_move(infos[index], move)))
+                    if child_index is not None and child_index > next_index:
+                        next_index, next_move = child_index, move
+            ans.append(next_move)
+            index = next_index
+        return ans
 
 
 class BFSSolver(NodeSolver[GenericInfo, GenericName, GenericMove]):
@@ -48,29 +353,841 @@ class BFSSolver(NodeSolver[GenericInfo, GenericName, GenericMove]):
 
         start_name = self.get_name(start_info)
 
-        # data is in the form (info, path)
-        name_to_data: Dict[GenericName, Tuple[GenericInfo, List[GenericMove]]] = {start_name: (start_info, [])} # pylint: disable=line-too-long
-        queue: Deque[GenericName] = deque()
+        # {name: (parent name, move from parent)} for every node found other than the start;
+        # ...paths are only rebuilt from these once the goal is found
+        parents: Dict[GenericName, Tuple[GenericName, GenericMove]] = {}
+        # infos are only kept until their node is expanded
+        queue: Deque[Tuple[GenericName, GenericInfo]] = deque()
 
-        queue.appendleft(start_name)
+        queue.appendleft((start_name, start_info))
+        stats = self.stats
 
         while queue:
-            current_name = queue.pop()
-            current_info, current_path = name_to_data[current_name]
+            if stats is not None:
+                stats.record_frontier(len(queue), parents)
+            current_name, current_info = queue.pop()
 
             expanded_moves = self.get_moves(current_info)
             # print("possible moves from {} is {}".format(current_info, expanded_moves))
             for move in expanded_moves:
                 child_info = self.follow_move(current_info, move)
-                child_path = current_path[:]
-                child_path.append(move)
 
                 if self.is_goal(child_info):
-                    return child_path
+                    path = _rebuild_path(parents, current_name)
+                    path.append(move)
+                    return path
 
                 child_name = self.get_name(child_info)
-                if child_name not in name_to_data:
+                if child_name not in parents and child_name != start_name:
                     # new, needs to be expanded
-                    name_to_data[child_name] = (child_info, child_path)
-                    queue.appendleft(child_name)
+                    parents[child_name] = (current_name, move)
+                    queue.appendleft((child_name, child_info))
+                elif stats is not None:
+                    stats.duplicates_pruned += 1
+        return None
+
+
+class ShortestPaths(Generic[GenericName, GenericMove]):
+    '''
+    Every shortest path from the start node to the nearest goal nodes, found by ShortestPathsSolver.
+    The paths share their moves as a graph of layers, so there can be far more paths than memory;
+    ...iterating over this makes each path only when it's needed.
+    '''
+    def __init__(self, start_name: GenericName, goal_names: List[GenericName],
+                 parents: Dict[GenericName, List[Tuple[GenericName, GenericMove]]],
+                 layers: List[List[GenericName]]):
+        self.start_name = start_name
+        # the goal nodes at the shortest distance from the start
+        self.goal_names = goal_names
+        # {name: every (parent name, move from parent)
+        # ...with the parent one layer closer to the start}
+        self.parents = parents
+        # the names at each distance from the start, up to the goals
+        self.layers = layers
+
+    def get_length(self) -> int:
+        '''Returns the number of moves in each path'''
+        return len(self.layers) - 1
+
+    def count(self) -> int:
+        '''Returns the number of paths, without making them'''
+        # {name: number of shortest paths from the start to it}, one layer at a time
+        ways = {self.start_name: 1}
+        for layer in self.layers[1:]:
+            for name in layer:
+                ways[name] = sum(ways[parent_name] for parent_name, _ in self.parents[name])
+        return sum(ways[goal_name] for goal_name in self.goal_names)
+
+    def __iter__(self) -> Iterator[List[GenericMove]]:
+        '''Yields every path, going back from each goal through the parents depth-first'''
+        for goal_name in self.goal_names:
+            if goal_name == self.start_name:
+                yield []
+                continue
+            # moves from the goal back towards the start, and the parents left to try at each node
+            moves: List[GenericMove] = []
+            parent_iterators = [iter(self.parents[goal_name])]
+            while parent_iterators:
+                parent = next(parent_iterators[-1], None)
+                if parent is None:
+                    parent_iterators.pop()
+                    if moves:
+                        moves.pop()
+                    continue
+                parent_name, move = parent
+                moves.append(move)
+                if parent_name == self.start_name:
+                    yield moves[::-1]
+                    moves.pop()
+                else:
+                    parent_iterators.append(iter(self.parents[parent_name]))
+
+
+class ShortestPathsSolver(NodeSolver[GenericInfo, GenericName, GenericMove]):
+    '''
+    Class for finding every shortest path to the goal nodes with breadth-first-search.
+    Unlike BFSSolver, every parent of a node that is one layer closer to the start is kept,
+    ...and the search finishes the layer the first goal is found in.
+    Paths are different if they go through different nodes: when more than one move leads
+    ...from a parent to the same child, only the first of them is kept.
+    '''
+    def search(self, start_info: GenericInfo) -> Optional[ShortestPaths[GenericName, GenericMove]]:
+        '''
+        Returns every shortest path from the node represented by the parameter,
+        ...or None if there are none
+        '''
+        start_name = self.get_name(start_info)
+        if self.is_goal(start_info):
+            return ShortestPaths(start_name, [start_name], {}, [[start_name]])
+
+        depths: Dict[GenericName, int] = {start_name: 0}
+        parents: Dict[GenericName, List[Tuple[GenericName, GenericMove]]] = {}
+        layers = [[start_name]]
+        frontier = [(start_name, start_info)]
+        stats = self.stats
+        while frontier:
+            if stats is not None:
+                stats.record_frontier(len(frontier), depths)
+            depth = len(layers)
+            next_frontier = []
+            goal_names = []
+            for current_name, current_info in frontier:
+                for move in self.get_moves(current_info):
+                    child_info = self.follow_move(current_info, move)
+                    child_name = self.get_name(child_info)
+                    child_depth = depths.get(child_name)
+                    if child_depth is None:
+                        depths[child_name] = depth
+                        parents[child_name] = [(current_name, move)]
+                        next_frontier.append((child_name, child_info))
+                        if self.is_goal(child_info):
+                            goal_names.append(child_name)
+                    elif child_depth == depth:
+                        # another shortest way to a node already found in this layer;
+                        # ...each parent's moves are all followed together, so a parent that
+                        # ...already leads here is the last one added
+                        child_parents = parents[child_name]
+                        if child_parents[-1][0] != current_name:
+                            child_parents.append((current_name, move))
+                    elif stats is not None:
+                        stats.duplicates_pruned += 1
+            layers.append([name for name, info in next_frontier])
+            if goal_names:
+                return ShortestPaths(start_name, goal_names, parents, layers)
+            frontier = next_frontier
+        return None
+
+    def solve(self, start_info: GenericInfo) -> Optional[List[GenericMove]]:
+        '''
+        Returns a list of moves needed to reach the goal node
+        ...from the node represented by the parameter.
+        '''
+        paths = self.search(start_info)
+        return None if paths is None else next(iter(paths))
+
+    def count_solutions(self, start_info: GenericInfo) -> int:
+        '''Returns the number of shortest solutions (0 if there are none)'''
+        paths = self.search(start_info)
+        return 0 if paths is None else paths.count()
+
+    def iter_solutions(self, start_info: GenericInfo) -> Iterator[List[GenericMove]]:
+        '''Yields every shortest solution, one at a time'''
+        paths = self.search(start_info)
+        if paths is not None:
+            yield from paths
+
+
+def _run_bfs_worker(worker_id: int, commands: Connection, inboxes: List['Queue[Any]']) -> None:
+    '''
+    Runs one worker process of a BFSWorkerPool until it's told to stop.
+    The worker owns the names with hash(name) % workers == worker_id: it keeps their parents
+    ...and the ones in the current level, and is sent every child with one of those names.
+    Replies to each command with ('ok', answer), or ('error', exception) if it went wrong.
+    '''
+    workers = len(inboxes)
+    solver: Optional[NodeSolver] = None
+    # {name: (parent name, move from parent), or None for the start} for the names this owns
+    parents: Dict[Any, Optional[Tuple[Any, Any]]] = {}
+    # (name, info) of the nodes this owns in the current level
+    frontier: List[Tuple[Any, Any]] = []
+    while True:
+        command, argument = commands.recv()
+        try:
+            if command == 'stop':
+                return
+            if command == 'start':
+                # the functions to use and the start info
+                solver, start_info = argument
+                start_name = solver.get_name(start_info)
+                owned = hash(start_name) % workers == worker_id
+                parents = {start_name: None} if owned else {}
+                frontier = [(start_name, start_info)] if owned else []
+                commands.send(('ok', None))
+            elif command == 'expand':
+                assert solver is not None
+                commands.send(('ok', _expand_level(solver, worker_id, inboxes, parents, frontier)))
+            elif command == 'parent':
+                commands.send(('ok', parents[argument]))
+        except Exception as error: # pylint: disable=broad-except
+            commands.send(('error', error))
+
+def _expand_level(solver: NodeSolver, worker_id: int, inboxes: List[Any],
+                  parents: Dict[Any, Optional[Tuple[Any, Any]]],
+                  frontier: List[Tuple[Any, Any]]) -> Tuple[int, int, int, Optional[Tuple[Any, Any]]]: # pylint: disable=line-too-long
+    '''
+    Expands this worker's part of a level, sends each child to the worker that owns its name,
+    ...and replaces the frontier with the new children this worker is sent.
+    Returns (new nodes, duplicates thrown out, moves followed,
+    ...(parent name, move) of a goal child or None).
+    '''
+    workers = len(inboxes)
+    # (child info, parent name, move) for each worker; the child's name is worked out again
+    # ...by its owner, since sending it as well would double what's sent for most names
+    outboxes: List[List[Tuple[Any, Any, Any]]] = [[] for _ in range(workers)]
+    goal = None
+    generated = 0
+    for name, info in frontier:
+        for move in solver.get_moves(info):
+            child_info = solver.follow_move(info, move)
+            generated += 1
+            if goal is None and solver.is_goal(child_info):
+                goal = (name, move)
+            outboxes[hash(solver.get_name(child_info)) % workers].append((child_info, name, move))
+    for owner, outbox in enumerate(outboxes):
+        if owner != worker_id:
+            inboxes[owner].put(outbox)
+
+    frontier.clear()
+    duplicates = 0
+    # every worker sends every other worker one list per level, even if it's empty
+    received = [outboxes[worker_id]] + [inboxes[worker_id].get() for _ in range(workers - 1)]
+    for children in received:
+        for child_info, parent_name, move in children:
+            child_name = solver.get_name(child_info)
+            if child_name in parents:
+                duplicates += 1
+            else:
+                parents[child_name] = (parent_name, move)
+                frontier.append((child_name, child_info))
+    return len(frontier), duplicates, generated, goal
+
+
+class BFSWorkerPool:
+    '''
+    Worker processes for ParallelBFSSolver, which last between solves (and between solvers).
+    Each worker keeps the nodes it owns, so the levels of a search never go through this process.
+    Stop the workers with close() (or by using the pool in a `with` block);
+    ...they're daemon processes, so they're also stopped when this process ends.
+    '''
+    def __init__(self, workers: Optional[int] = None):
+        '''workers: how many worker processes to start; None for one per CPU'''
+        self.workers = workers or os.cpu_count() or 1
+        inboxes: List['Queue[Any]'] = [multiprocessing.Queue() for _ in range(self.workers)]
+        self._connections: List[Connection] = []
+        self._processes = []
+        for worker_id in range(self.workers):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_run_bfs_worker,
+                                              args=(worker_id, worker_connection, inboxes),
+                                              daemon=True)
+            process.start()
+            self._connections.append(connection)
+            self._processes.append(process)
+
+    def __enter__(self) -> 'BFSWorkerPool':
+        return self
+
+    def __exit__(self, *exception_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        '''Stops the worker processes'''
+        for connection, process in zip(self._connections, self._processes):
+            if process.is_alive():
+                try:
+                    connection.send(('stop', None))
+                except (BrokenPipeError, OSError):
+                    pass
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+        self._connections = []
+        self._processes = []
+
+    @property
+    def closed(self) -> bool:
+        '''Whether the workers have been stopped (which happens if one of them fails)'''
+        return not self._connections
+
+    def get_owner(self, name: Hashable) -> int:
+        '''Returns the worker that owns a name'''
+        return hash(name) % self.workers
+
+    def ask(self, worker_id: int, command: str, argument: Any = None) -> Any:
+        '''Sends one worker a command and returns its answer'''
+        self._connections[worker_id].send((command, argument))
+        return self._receive([self._connections[worker_id]])[0]
+
+    def ask_all(self, command: str, argument: Any = None) -> List[Any]:
+        '''Sends every worker the same command and returns their answers, in worker order'''
+        if not self._connections:
+            raise RuntimeError("The worker pool has been closed")
+        for connection in self._connections:
+            connection.send((command, argument))
+        return self._receive(self._connections)
+
+    def _receive(self, connections: List[Connection]) -> List[Any]:
+        '''
+        Waits for an answer from each connection.
+        If a worker fails, the others could be waiting on it forever,
+        ...so the whole pool is closed and the error is raised.
+        '''
+        answers: Dict[int, Any] = {}
+        waiting = list(connections)
+        while waiting:
+            for connection in wait(waiting):
+                try:
+                    status, answer = connection.recv() # type: ignore
+                except EOFError:
+                    status, answer = 'error', RuntimeError("A BFS worker process died")
+                if status == 'error':
+                    self.close()
+                    if isinstance(answer, BaseException):
+                        raise answer
+                    raise RuntimeError("A BFS worker failed: {!r}".format(answer))
+                answers[id(connection)] = answer
+                waiting.remove(connection) # type: ignore
+        return [answers[id(connection)] for connection in connections]
+
+
+class ParallelBFSSolver(NodeSolver[GenericInfo, GenericName, GenericMove]):
+    '''
+    Class for solving node problems with breadth-first-search,
+    ...expanding each level of the search across a pool of worker processes.
+
+    Nodes are split between the workers by the hashes of their names: each worker expands
+    ...the nodes it owns, sends each child straight to the worker that owns the child's name,
+    ...and throws out the children it's sent that it has already seen.
+    Only counts come back to this process, until a goal is found and the path is asked for.
+
+    The namer, detector, expander and follower (and the infos, names and moves) must be picklable,
+    ...so they can't be locally defined functions, and names must hash the same way in every
+    ...process (ints and tuples of them do; strings only do if the workers are forked).
+    Small infos and names keep the cost of sending them between processes low.
+    Finds a solution of the same length as BFSSolver.
+    '''
+    def __init__(self, namer: Callable[[GenericInfo], GenericName],
+                 detector: Callable[[GenericInfo], bool],
+                 expander: Callable[[GenericInfo], Iterable[GenericMove]],
+                 follower: Callable[[GenericInfo, GenericMove], GenericInfo],
+                 workers: Optional[int] = None, pool: Optional[BFSWorkerPool] = None):
+        '''
+        namer, detector, expander and follower are the same as for NodeSolver.
+        workers: how many worker processes to start if no pool is given; None for one per CPU
+        pool: the worker processes to use; if not given, they're started on the first solve
+              ...and kept for later solves (call close() to stop them)
+        '''
+        super().__init__(namer, detector, expander, follower)
+        self.workers = workers
+        self.pool = pool
+        self._owns_pool = pool is None
+
+    def close(self) -> None:
+        '''Stops the worker processes, if this solver started them'''
+        if self._owns_pool and self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def solve(self, start_info: GenericInfo) -> Optional[List[GenericMove]]:
+        '''
+        Returns the list of moves needed to reach the goal node
+        ...from the node represented by the parameter.
+        '''
+        if self.is_goal(start_info):
+            return []
+        if self.pool is None or (self._owns_pool and self.pool.closed):
+            self.pool = BFSWorkerPool(self.workers)
+        pool = self.pool
+
+        # the workers get the functions without the stats wrappers, which can't be pickled
+        pool.ask_all('start', (NodeSolver(*self._unwrapped_functions), start_info))
+        frontier_size = 1
+        stats = self.stats
+        while frontier_size:
+            if stats is not None:
+                stats.record_frontier(frontier_size)
+                # the workers' calls aren't timed, but can at least be counted
+                stats.calls['expander'] += frontier_size
+            answers = pool.ask_all('expand')
+            frontier_size = sum(answer[0] for answer in answers)
+            if stats is not None:
+                stats.duplicates_pruned += sum(answer[1] for answer in answers)
+                stats.calls['follower'] += sum(answer[2] for answer in answers)
+            goals = [answer[3] for answer in answers if answer[3] is not None]
+            if goals:
+                parent_name, move = goals[0]
+                path = [move]
+                parent = pool.ask(pool.get_owner(parent_name), 'parent', parent_name)
+                while parent is not None:
+                    parent_name, move = parent
+                    path.append(move)
+                    parent = pool.ask(pool.get_owner(parent_name), 'parent', parent_name)
+                path.reverse()
+                return path
         return None
+
+
+class IDDFSSolver(NodeSolver[GenericInfo, GenericName, GenericMove]):
+    '''
+    Class for solving node problems with iterative-deepening depth-first-search.
+    Only the current path (and optionally a table of names) is kept in memory,
+    ...so it can search problems whose frontier is too big for BFSSolver.
+    '''
+    def __init__(self, namer: Callable[[GenericInfo], GenericName],
+                 detector: Callable[[GenericInfo], bool],
+                 expander: Callable[[GenericInfo], Iterable[GenericMove]],
+                 follower: Callable[[GenericInfo, GenericMove], GenericInfo],
+                 unfollower: Optional[Callable[[GenericInfo, GenericMove], GenericInfo]] = None,
+                 max_depth: Optional[int] = None,
+                 table_size: Optional[int] = DEFAULT_TABLE_SIZE):
+        '''
+        namer, detector, expander and follower are the same as for NodeSolver.
+        unfollower: takes the info returned by follower and the move that was followed,
+                    ...and returns the info from before the move.
+                    If this is given, follower is allowed to change the info it's given in place
+                    ...(so the whole search can happen on a single info).
+                    If this is not given, follower must not change the info it's given.
+                    Either way, expander must return moves that don't change when the info does.
+        max_depth: the deepest to search before giving up; None to never give up
+        table_size: the most names to remember for skipping nodes already reached
+                    ...at a shallower depth (DEFAULT_TABLE_SIZE unless given);
+                    ...None for no limit, 0 to only check the current path
+        '''
+        super().__init__(namer, detector, expander, follower)
+        self.unfollow_move = unfollower
+        self.max_depth = max_depth
+        self.table_size = table_size
+
+    def solve(self, start_info: GenericInfo) -> Optional[List[GenericMove]]:
+        '''
+        Returns the list of moves needed to reach the goal node
+        ...from the node represented by the parameter.
+        Uses depth-first search with an increasing depth limit, so the solution is a shortest one.
+        '''
+        if self.is_goal(start_info):
+            return []
+
+        depth_limit = 1
+        while self.max_depth is None or depth_limit <= self.max_depth:
+            solution, cut_off = self._search(start_info, depth_limit)
+            if solution is not None:
+                return solution
+            if not cut_off:
+                # the depth limit wasn't what stopped the search, so there are no more nodes
+                return None
+            depth_limit += 1
+        return None
+
+    def _search(self, start_info: GenericInfo,
+                depth_limit: int) -> Tuple[Optional[List[GenericMove]], bool]:
+        '''
+        Searches every path up to the given length.
+        Returns the solution (or None) and whether any path was cut off by the depth limit.
+        '''
+        cut_off = False
+        start_name = self.get_name(start_info)
+
+        # the moves, infos, names and untried moves along the current path
+        path: List[GenericMove] = []
+        infos: List[GenericInfo] = [start_info]
+        names: List[GenericName] = [start_name]
+        names_on_path = {start_name}
+        move_iterators = [iter(self.get_moves(start_info))]
+        # {name: smallest depth it has been reached at}
+        depths: Dict[GenericName, int] = {start_name: 0}
+        stats = self.stats
+
+        while move_iterators:
+            move = next(move_iterators[-1], None)
+            if move is None:
+                # every move from this node has been tried; go back to its parent
+                move_iterators.pop()
+                if path:
+                    self._go_back(path, infos)
+                    names_on_path.discard(names.pop())
+                continue
+
+            depth = len(path) + 1
+            child_info = self.follow_move(infos[-1], move)
+            if self.is_goal(child_info):
+                path.append(move)
+                return path, cut_off
+
+            child_name = self.get_name(child_info)
+            seen_depth = depths.get(child_name)
+            if child_name in names_on_path or (seen_depth is not None and seen_depth <= depth):
+                # already searched from here with at least as many moves left
+                if stats is not None:
+                    stats.duplicates_pruned += 1
+                self._undo(child_info, move, infos)
+                continue
+            if depth == depth_limit:
+                cut_off = True
+                self._undo(child_info, move, infos)
+                continue
+
+            if self.table_size is None or len(depths) < self.table_size or seen_depth is not None:
+                depths[child_name] = depth
+            path.append(move)
+            infos.append(child_info)
+            names.append(child_name)
+            names_on_path.add(child_name)
+            move_iterators.append(iter(self.get_moves(child_info)))
+            if stats is not None:
+                # the frontier of a depth-first search is the current path
+                stats.record_frontier(len(path), depths)
+
+        return None, cut_off
+
+    def _undo(self, child_info: GenericInfo, move: GenericMove, infos: List[GenericInfo]) -> None:
+        '''Undoes following a move that was never added to the path'''
+        if self.unfollow_move is not None:
+            infos[-1] = self.unfollow_move(child_info, move)
+
+    def _go_back(self, path: List[GenericMove], infos: List[GenericInfo]) -> None:
+        '''Removes the last move from the path'''
+        move = path.pop()
+        child_info = infos.pop()
+        self._undo(child_info, move, infos)
+
+
+class BidirectionalBFSSolver(NodeSolver[GenericInfo, GenericName, GenericMove]):
+    '''
+    Class for solving node problems with breadth-first-search from the start node
+    ...and backwards from every goal node at the same time, until the two searches meet.
+    '''
+    def __init__(self, namer: Callable[[GenericInfo], GenericName],
+                 detector: Callable[[GenericInfo], bool],
+                 expander: Callable[[GenericInfo], Iterable[GenericMove]],
+                 follower: Callable[[GenericInfo, GenericMove], GenericInfo],
+                 goal_finder: Callable[[GenericInfo], Iterable[GenericInfo]],
+                 predecessor_finder: Callable[[GenericInfo], Iterable[Tuple[GenericInfo, GenericMove]]]): # pylint: disable=line-too-long
+        '''
+        namer, detector, expander and follower are the same as for NodeSolver.
+        goal_finder: takes the info for the start node and returns infos for the goal nodes
+                     ...to search backwards from. Goal nodes that are left out can still be found
+                     ...by the forwards search.
+        predecessor_finder: takes info and returns (parent info, move) for every node
+                            ...that has a move (the given move) leading to the node
+                            ...that the info represents
+        '''
+        super().__init__(namer, detector, expander, follower)
+        self.get_goals = goal_finder
+        self.get_predecessors = predecessor_finder
+
+    def solve(self, start_info: GenericInfo) -> Optional[List[GenericMove]]:
+        '''
+        Returns the list of moves needed to reach the goal node
+        ...from the node represented by the parameter.
+        The solution is a shortest one.
+        '''
+        if self.is_goal(start_info):
+            return []
+
+        start_name = self.get_name(start_info)
+        # {name: (parent name, move from parent)}, searching forwards from the start
+        forward_parents: Dict[GenericName, Tuple[GenericName, GenericMove]] = {}
+        forward_depths: Dict[GenericName, int] = {start_name: 0}
+        forward_frontier = [(start_name, start_info)]
+        # {name: (child name, move to child)}, searching backwards from the goals
+        backward_children: Dict[GenericName, Tuple[GenericName, GenericMove]] = {}
+        backward_depths: Dict[GenericName, int] = {}
+        backward_frontier = []
+        for goal_info in self.get_goals(start_info):
+            goal_name = self.get_name(goal_info)
+            if goal_name not in backward_depths:
+                backward_depths[goal_name] = 0
+                backward_frontier.append((goal_name, goal_info))
+
+        if start_name in backward_depths:
+            return []
+
+        stats = self.stats
+        while forward_frontier:
+            if stats is not None:
+                stats.record_frontier(len(forward_frontier) + len(backward_frontier),
+                                      forward_depths, backward_depths)
+            # expand a whole layer of the smaller side; an empty backward side can't be expanded
+            # ...but the forwards search can still find goals on its own with the detector
+            expand_forward = (not backward_frontier
+                              or len(forward_frontier) <= len(backward_frontier))
+            # (total length, meeting name) of each path found in this layer
+            meetings: List[Tuple[int, GenericName]] = []
+            next_frontier = []
+            if expand_forward:
+                for current_name, current_info in forward_frontier:
+                    depth = forward_depths[current_name] + 1
+                    for move in self.get_moves(current_info):
+                        child_info = self.follow_move(current_info, move)
+                        child_name = self.get_name(child_info)
+                        if child_name in forward_depths:
+                            if stats is not None:
+                                stats.duplicates_pruned += 1
+                            continue
+                        forward_depths[child_name] = depth
+                        forward_parents[child_name] = (current_name, move)
+                        next_frontier.append((child_name, child_info))
+                        if child_name in backward_depths:
+                            total = depth + backward_depths[child_name]
+                        elif self.is_goal(child_info):
+                            total = depth
+                        else:
+                            continue
+                        meetings.append((total, child_name))
+                forward_frontier = next_frontier
+            else:
+                for current_name, current_info in backward_frontier:
+                    depth = backward_depths[current_name] + 1
+                    for parent_info, move in self.get_predecessors(current_info):
+                        parent_name = self.get_name(parent_info)
+                        if parent_name in backward_depths:
+                            if stats is not None:
+                                stats.duplicates_pruned += 1
+                            continue
+                        backward_depths[parent_name] = depth
+                        backward_children[parent_name] = (current_name, move)
+                        next_frontier.append((parent_name, parent_info))
+                        if parent_name in forward_depths:
+                            meetings.append((depth + forward_depths[parent_name],
+                                             parent_name))
+                backward_frontier = next_frontier
+
+            if meetings:
+                # the whole layer has been checked, so no shorter meeting is left
+                meeting_name = min(meetings, key=lambda meeting: meeting[0])[1]
+                path = _rebuild_path(forward_parents, meeting_name)
+                while meeting_name in backward_children:
+                    meeting_name, move = backward_children[meeting_name]
+                    path.append(move)
+                return path
+        return None
+
+
+def _no_heuristic(info: object) -> float: # pylint: disable=unused-argument
+    '''Knows nothing about how far a goal is'''
+    return 0
+
+def _unit_cost(info: object, move: object) -> float: # pylint: disable=unused-argument
+    '''Every move costs 1'''
+    return 1
+
+
+class AStarSolver(NodeSolver[GenericInfo, GenericName, GenericMove]):
+    '''
+    Class for solving node problems with A* search to reach the goal node as cheaply as possible
+    '''
+    def __init__(self, namer: Callable[[GenericInfo], GenericName],
+                 detector: Callable[[GenericInfo], bool],
+                 expander: Callable[[GenericInfo], Iterable[GenericMove]],
+                 follower: Callable[[GenericInfo, GenericMove], GenericInfo],
+                 heuristic: Callable[[GenericInfo], float],
+                 coster: Callable[[GenericInfo, GenericMove], float] = _unit_cost):
+        '''
+        namer, detector, expander and follower are the same as for NodeSolver.
+        heuristic: takes info and returns a lower bound on the cost of reaching a goal node from it;
+                   ...the solution is only guaranteed to be the cheapest if it never overestimates
+        coster: takes info and a move that can be made from it and returns the cost of the move;
+                ...costs can't be negative. By default every move costs 1.
+        '''
+        super().__init__(namer, detector, expander, follower)
+        self.estimate = heuristic
+        self.get_cost = coster
+
+    def solve(self, start_info: GenericInfo) -> Optional[List[GenericMove]]:
+        '''
+        Returns the cheapest list of moves needed to reach the goal node
+        ...from the node represented by the parameter.
+        '''
+        start_name = self.get_name(start_info)
+
+        # {name: (info, cost to reach)}
+        name_to_data: Dict[GenericName, Tuple[GenericInfo, float]] = {start_name: (start_info, 0)}
+        # {name: (parent name, move from parent)}
+        parents: Dict[GenericName, Tuple[GenericName, GenericMove]] = {}
+        # entries are (estimated total cost, cost to reach, tiebreaker, name)
+        # the tiebreaker keeps names from being compared and makes ties first-in-first-out
+        tiebreaker = count()
+        queue = [(self.estimate(start_info), 0.0, next(tiebreaker), start_name)]
+        stats = self.stats
+
+        while queue:
+            if stats is not None:
+                stats.record_frontier(len(queue), name_to_data)
+            total, cost, _, current_name = heapq.heappop(queue)
+            current_info, best_cost = name_to_data[current_name]
+            if cost > best_cost:
+                # a cheaper way here was found after this was queued
+                continue
+
+            if self.is_goal(current_info):
+                return _rebuild_path(parents, current_name)
+
+            for move in self.get_moves(current_info):
+                child_cost = cost + self.get_cost(current_info, move)
+                child_info = self.follow_move(current_info, move)
+                child_name = self.get_name(child_info)
+                if child_name in name_to_data and name_to_data[child_name][1] <= child_cost:
+                    if stats is not None:
+                        stats.duplicates_pruned += 1
+                    continue
+                name_to_data[child_name] = (child_info, child_cost)
+                parents[child_name] = (current_name, move)
+                total = child_cost + self.estimate(child_info)
+                heapq.heappush(queue, (total, child_cost, next(tiebreaker), child_name))
+        return None
+
+
+class IDAStarSolver(NodeSolver[GenericInfo, GenericName, GenericMove]):
+    '''
+    Class for solving node problems with iterative-deepening A* search.
+    Like IDDFSSolver, only the current path (and optionally a table of names) is kept in memory.
+    '''
+    def __init__(self, namer: Callable[[GenericInfo], GenericName],
+                 detector: Callable[[GenericInfo], bool],
+                 expander: Callable[[GenericInfo], Iterable[GenericMove]],
+                 follower: Callable[[GenericInfo, GenericMove], GenericInfo],
+                 heuristic: Callable[[GenericInfo], float],
+                 coster: Callable[[GenericInfo, GenericMove], float] = _unit_cost,
+                 unfollower: Optional[Callable[[GenericInfo, GenericMove], GenericInfo]] = None,
+                 max_cost: Optional[float] = None,
+                 table_size: Optional[int] = DEFAULT_TABLE_SIZE):
+        '''
+        heuristic and coster are the same as for AStarSolver.
+        unfollower and table_size are the same as for IDDFSSolver.
+        max_cost: the most expensive solution to look for before giving up; None to never give up
+        '''
+        super().__init__(namer, detector, expander, follower)
+        self.estimate = heuristic
+        self.get_cost = coster
+        self.unfollow_move = unfollower
+        self.max_cost = max_cost
+        self.table_size = table_size
+
+    def solve(self, start_info: GenericInfo) -> Optional[List[GenericMove]]:
+        '''
+        Returns the cheapest list of moves needed to reach the goal node
+        ...from the node represented by the parameter.
+        '''
+        if self.is_goal(start_info):
+            return []
+
+        threshold: Optional[float] = self.estimate(start_info)
+        while threshold is not None and (self.max_cost is None or threshold <= self.max_cost):
+            solution, threshold = self._search(start_info, threshold)
+            if solution is not None:
+                return solution
+        return None
+
+    def _search(self, start_info: GenericInfo,
+                threshold: float) -> Tuple[Optional[List[GenericMove]], Optional[float]]:
+        '''
+        Searches every path whose estimated total cost is at most the threshold.
+        Returns the solution (or None) and the smallest estimated total cost over the threshold
+        ...(or None if nothing was over the threshold).
+        '''
+        # upgrade: this is very similar to IDDFSSolver._search
+        next_threshold: Optional[float] = None
+        start_name = self.get_name(start_info)
+
+        # the moves, infos, costs, names and untried moves along the current path
+        path: List[GenericMove] = []
+        infos: List[GenericInfo] = [start_info]
+        costs: List[float] = [0]
+        names: List[GenericName] = [start_name]
+        names_on_path = {start_name}
+        move_iterators = [iter(self.get_moves(start_info))]
+        # {name: cheapest cost it has been reached at}
+        best_costs: Dict[GenericName, float] = {start_name: 0}
+        stats = self.stats
+
+        while move_iterators:
+            move = next(move_iterators[-1], None)
+            if move is None:
+                # every move from this node has been tried; go back to its parent
+                move_iterators.pop()
+                if path:
+                    self._undo(infos.pop(), path.pop(), infos)
+                    costs.pop()
+                    names_on_path.discard(names.pop())
+                continue
+
+            cost = costs[-1] + self.get_cost(infos[-1], move)
+            child_info = self.follow_move(infos[-1], move)
+            if self.is_goal(child_info) and cost <= threshold:
+                path.append(move)
+                return path, None
+
+            child_name = self.get_name(child_info)
+            seen_cost = best_costs.get(child_name)
+            if child_name in names_on_path or (seen_cost is not None and seen_cost <= cost):
+                # already searched from here with at least as much left to spend
+                if stats is not None:
+                    stats.duplicates_pruned += 1
+                self._undo(child_info, move, infos)
+                continue
+            total = cost + self.estimate(child_info)
+            if total > threshold:
+                if next_threshold is None or total < next_threshold:
+                    next_threshold = total
+                self._undo(child_info, move, infos)
+                continue
+
+            if (self.table_size is None or len(best_costs) < self.table_size
+                    or seen_cost is not None):
+                best_costs[child_name] = cost
+            path.append(move)
+            infos.append(child_info)
+            costs.append(cost)
+            names.append(child_name)
+            names_on_path.add(child_name)
+            move_iterators.append(iter(self.get_moves(child_info)))
+            if stats is not None:
+                stats.record_frontier(len(path), best_costs)
+
+        return None, next_threshold
+
+    def _undo(self, child_info: GenericInfo, move: GenericMove, infos: List[GenericInfo]) -> None:
+        '''Undoes following a move; infos[-1] becomes the info from before the move'''
+        if self.unfollow_move is not None:
+            infos[-1] = self.unfollow_move(child_info, move)
+
+
+def _rebuild_path(parents: Dict[GenericName, Tuple[GenericName, GenericMove]],
+                  name: GenericName) -> List[GenericMove]:
+    '''Follows the parent of each name back to the start and returns the moves taken'''
+    path = []
+    while name in parents:
+        name, move = parents[name]
+        path.append(move)
+    path.reverse()
+    return path
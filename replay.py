@@ -0,0 +1,260 @@
+#!/usr/local/bin/python3
+'''
+Checked replays of River Crossing solution strings.
+
+Each RC step ("grabbed plank-placed plank") is turned into the Board moves that make it:
+    walking to an end of the grabbed plank, grabbing it,
+    walking (carrying it) to an end of where it's placed, and placing it.
+Every move is checked against Board.get_moves, so a step that breaks the rules raises
+...an InvalidStepError saying which step it was.
+After each step the person walks to the lower peg of the plank they placed, like SolutionStepper,
+...so that replays of different solutions can be compared step by step.
+
+SolutionReplayer keeps a copy of the board every few steps, so going to any step
+...only replays the steps since the copy before it.
+Can be run from the command line to check many solutions; see `python3 replay.py --help`.
+See terms.txt for the types of the different terms.
+'''
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from batch import get_catalogue_jobs, read_puzzle_job
+from framework import Board, Move, Plank, get_plank, get_walk
+from util import RiverCrossingCharacterTranslator, RiverCrossingSolution, invert_dictionary
+
+# (grabbed plank, placed plank)
+Step = Tuple[Plank, Plank]
+# (name, board, RC solution string, translator)
+ValidationJob = Tuple[str, Board, RiverCrossingSolution, RiverCrossingCharacterTranslator]
+
+
+class InvalidStepError(ValueError):
+    '''A step of a solution that can't be made'''
+    def __init__(self, step: int, message: str):
+        # the number of steps made before this one (so the first step is step 0)
+        self.step = step
+        super().__init__("Step {}: {}".format(step + 1, message))
+
+
+def parse_rc_solution(solution_string: RiverCrossingSolution,
+                      translator: RiverCrossingCharacterTranslator) -> List[Step]:
+    '''
+    Turns a River Crossing solution string into (grabbed plank, placed plank) steps.
+    Raises InvalidStepError if a step isn't two planks or has a character the translator doesn't.
+    '''
+    steps = []
+    for index, step in enumerate(solution_string.strip().upper().split()):
+        planks = step.split('-')
+        if len(planks) != 2 or not all(len(plank) == 2 for plank in planks):
+            raise InvalidStepError(index,
+                                   "{} isn't a grabbed plank and a placed plank".format(step))
+        pegs = []
+        for character in planks[0] + planks[1]:
+            if character not in translator:
+                raise InvalidStepError(index, "{} isn't a peg".format(character))
+            pegs.append(translator[character])
+        steps.append((get_plank(pegs[0], pegs[1]), get_plank(pegs[2], pegs[3])))
+    return steps
+
+def _make_moves(board: Board, moves: Iterable[Move]) -> bool:
+    '''Makes the moves on the board until one can't be made; returns whether they all were'''
+    for move in moves:
+        if move not in board.get_moves():
+            return False
+        board.make_move(move)
+    return True
+
+def make_step(board: Board, step: Step, index: int = 0) -> List[Move]:
+    '''
+    Makes a step on the board, and returns the moves it took.
+    Raises InvalidStepError (with the index given) if the step can't be made,
+    ...in which case the board isn't changed.
+    '''
+    grab_plank, place_plank = step
+    if board.held_plank:
+        raise InvalidStepError(index, "the person is already carrying a plank")
+    if grab_plank not in board.planks:
+        raise InvalidStepError(index, "there is no plank at {}".format(grab_plank))
+    came_from = board.get_walks()
+    if not any(peg in came_from for peg in grab_plank):
+        raise InvalidStepError(index, "the person can't reach the plank at {}".format(grab_plank))
+
+    # the person can only stand on one end of the grabbed plank; try each end they can reach
+    for grab_peg, other_grab_peg in (grab_plank, grab_plank[::-1]):
+        if grab_peg not in came_from:
+            continue
+        trial = deepcopy(board)
+        moves = get_walk(came_from, grab_peg) + [("grab", other_grab_peg)]
+        if not _make_moves(trial, moves):
+            continue
+        carrying_came_from = trial.get_walks()
+        for place_peg, other_place_peg in (place_plank, place_plank[::-1]):
+            if place_peg not in carrying_came_from:
+                continue
+            place_moves = get_walk(carrying_came_from, place_peg) + [("place", other_place_peg)]
+            placed = deepcopy(trial)
+            if not _make_moves(placed, place_moves):
+                continue
+            moves.extend(place_moves)
+            if placed.person_position != place_plank[0]:
+                moves.append(("walk", place_plank[0]))
+            _make_moves(board, moves)
+            return moves
+    raise InvalidStepError(index, "the plank at {} can't be moved to {}".format(grab_plank,
+                                                                               place_plank))
+
+
+class SolutionReplayer:
+    '''
+    Replays a River Crossing solution string on a board, checking every move.
+    Copies of the board are kept every `checkpoint_interval` steps as they're reached,
+    ...so going to any step only replays the steps since the last copy before it.
+    '''
+    def __init__(self, board: Board, solution_string: RiverCrossingSolution,
+                 translator: RiverCrossingCharacterTranslator, checkpoint_interval: int = 16):
+        '''
+        Takes the board to start from (which isn't changed), a River Crossing solution string,
+        ...and a translator from RC solution characters to pegs.
+        Raises InvalidStepError if the solution string can't be read.
+        '''
+        self.steps = parse_rc_solution(solution_string, translator)
+        self.checkpoint_interval = checkpoint_interval
+        # the board after each multiple of checkpoint_interval steps that has been reached
+        self._checkpoints: List[Board] = [deepcopy(board)]
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __iter__(self) -> Iterator[Board]:
+        '''
+        Yields the board after 0 steps, after 1 step, and so on.
+        Raises InvalidStepError at a step that can't be made.
+        '''
+        board = deepcopy(self._checkpoints[0])
+        yield deepcopy(board)
+        for index in range(len(self.steps)):
+            self._make_step(board, index)
+            yield deepcopy(board)
+
+    def _make_step(self, board: Board, index: int) -> List[Move]:
+        '''
+        Makes a step on a board that has had `index` steps made,
+        ...and keeps a copy of the board if it's a checkpoint.
+        '''
+        moves = make_step(board, self.steps[index], index)
+        if (index + 1) % self.checkpoint_interval == 0:
+            checkpoint = (index + 1) // self.checkpoint_interval
+            if checkpoint == len(self._checkpoints):
+                self._checkpoints.append(deepcopy(board))
+        return moves
+
+    def get_board_at_step(self, step: int) -> Board:
+        '''
+        Returns the board after the given number of steps.
+        Raises InvalidStepError if a step before it can't be made.
+        '''
+        if not 0 <= step <= len(self.steps):
+            raise IndexError("Step {} is not between 0 and {}".format(step, len(self.steps)))
+        checkpoint = min(step // self.checkpoint_interval, len(self._checkpoints) - 1)
+        board = deepcopy(self._checkpoints[checkpoint])
+        for index in range(checkpoint * self.checkpoint_interval, step):
+            self._make_step(board, index)
+        return board
+
+    def get_moves(self) -> List[Move]:
+        '''
+        Returns the Board moves for the whole solution, walking to the finish at the end if it can.
+        Raises InvalidStepError if a step can't be made.
+        '''
+        board = deepcopy(self._checkpoints[0])
+        moves = []
+        for index in range(len(self.steps)):
+            moves.extend(self._make_step(board, index))
+        came_from = board.get_walks()
+        if board.finish in came_from:
+            moves.extend(get_walk(came_from, board.finish))
+        return moves
+
+    def validate(self) -> Dict[str, Any]:
+        '''
+        Checks the whole solution and returns
+        ...{"valid": whether every step can be made, "solved": whether the person can then
+        ...walk to the finish, "steps": number of steps},
+        ...with "error" and "step" (the number of steps made before the bad one) if not valid.
+        '''
+        result: Dict[str, Any] = {'valid': True, 'solved': False, 'steps': len(self.steps)}
+        try:
+            board = self.get_board_at_step(len(self.steps))
+        except InvalidStepError as error:
+            result.update(valid=False, error=str(error), step=error.step)
+            return result
+        result['solved'] = board.finish in board.get_walks()
+        return result
+
+
+def validate_solution(job: ValidationJob) -> Dict[str, Any]:
+    '''Checks one solution string; returns SolutionReplayer.validate's result with the name'''
+    name, board, solution_string, translator = job
+    try:
+        result = SolutionReplayer(board, solution_string, translator).validate()
+    except InvalidStepError as error:
+        result = {'valid': False, 'solved': False, 'steps': None, 'error': str(error),
+                  'step': error.step}
+    result['name'] = name
+    return result
+
+def validate_solutions(jobs: Iterable[ValidationJob],
+                       workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    '''
+    Checks every solution string across a pool of worker processes (None for one per CPU).
+    Yields the results in the order the solutions were given.
+    '''
+    with ProcessPoolExecutor(workers) as pool:
+        yield from pool.map(validate_solution, jobs, chunksize=16)
+
+def read_validation_jobs(lines: Iterable[str]) -> Iterator[ValidationJob]:
+    '''
+    Yields the solutions to check from lines of JSON like:
+        {"name": "Expert40", "solution": "UX-IX GI-GQ ..."}
+    ...for puzzles in puzzles.py,
+    ...or puzzles in batch.py's format with a "solution" and a translator.
+    '''
+    for line in lines:
+        if not line.strip():
+            continue
+        definition = json.loads(line)
+        if 'start' in definition:
+            name, board, translator = read_puzzle_job(line)
+        else:
+            name, board, translator = get_catalogue_jobs([definition['name']])[0]
+        if translator is None:
+            raise ValueError("Puzzle {} has no translator".format(name))
+        yield (name, board, definition['solution'], invert_dictionary(translator))
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    '''Command line entry point; prints one JSON result per line and returns the exit code'''
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('file', nargs='?', default='-',
+                        help="file of solutions to check, one JSON object per line "
+                             "(default: stdin); see read_validation_jobs")
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parsed = parser.parse_args(arguments)
+
+    if parsed.file == '-':
+        jobs = list(read_validation_jobs(sys.stdin))
+    else:
+        with open(parsed.file) as solution_file:
+            jobs = list(read_validation_jobs(solution_file))
+    all_solved = True
+    for result in validate_solutions(jobs, parsed.workers):
+        all_solved = all_solved and result['solved']
+        print(json.dumps(result), flush=True)
+    return 0 if all_solved else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/local/bin/python3
+'''
+A local service that solves River Crossing puzzles for many clients at once.
+
+Clients connect over TCP or a Unix socket and send puzzles one per line, in batch.py's format,
+...with an optional "solver" entry (see batch.SOLVERS; 'bfs' by default), like:
+    echo '{"name": "Beginner1", "start": 32, "finish": 4, "pegs": [4, 14, 13, 23, 22, 32],
+           "planks": [[32, 22], [22, 23]]}' | nc localhost 8765
+Each line gets one line back: batch.py's result with a "cached" entry (true if the solution
+...was already known, in which case "wall_time" is how long it took the first time),
+...or {"error": ...} if the line wasn't a puzzle.
+
+The puzzles are solved by a pool of worker processes that are started with the service,
+...and that each warm up before their first solve;
+...if a worker process dies, a new pool is started and the solve is tried once more.
+A puzzle that is already being solved isn't solved again:
+...everyone who asks for it waits for the same solve.
+With a time limit, each solve gives back the best solution it found within it
+...(see batch.solve_puzzle), and only results that are known to be the best are kept.
+The latest results are kept in memory, so popular puzzles are only solved once.
+Can be run from the command line; see `python3 service.py --help`.
+See terms.txt for the types of the different terms.
+'''
+
+import argparse
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+from batch import PuzzleJob, Result, SOLVERS, read_puzzle_job, solve_puzzle
+from cache import get_puzzle_key
+from node_solvers import FEASIBLE, UNKNOWN
+from puzzles import SimplePuzzle
+
+# (puzzle key, translator), since the translator changes the result's RC solution string
+RequestKey = Tuple[str, Optional[Tuple[Tuple[int, str], ...]]]
+
+def _warm_up() -> None:
+    '''
+    Solves a small puzzle, so a new worker process has everything loaded before it's needed.
+    Every worker process runs this when it starts, before it takes any solves.
+    '''
+    solve_puzzle(('warm-up', SimplePuzzle(), None))
+
+
+class SolveService:
+    '''
+    Solves puzzles in a pool of worker processes, solving puzzles that are asked for
+    ...at the same time once, and keeping the latest results.
+    '''
+    def __init__(self, workers: Optional[int] = None, cache_size: int = 1024,
+                 time_limit: Optional[float] = None):
+        '''
+        workers: worker processes (None for one per CPU)
+        cache_size: the most results to keep; the least recently used are thrown out first
+        time_limit: seconds to give each solve (see batch.solve_puzzle); None for no limit
+        '''
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.time_limit = time_limit
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # {request key: result}, least recently used first
+        self._cache: 'OrderedDict[RequestKey, Result]' = OrderedDict()
+        # {request key: the solve that's running for it}
+        self._running: Dict[RequestKey, asyncio.Future] = {}
+        # {'requests' / 'cache_hits' / 'coalesced' / 'solves' / 'errors' / 'pool_restarts': count}
+        self.counts = dict.fromkeys(['requests', 'cache_hits', 'coalesced', 'solves', 'errors',
+                                     'pool_restarts'], 0)
+
+    async def start(self) -> None:
+        '''Starts the worker processes, and waits until one has warmed up and can take a solve'''
+        self._pool = self._create_pool()
+        await asyncio.get_running_loop().run_in_executor(self._pool, os.getpid)
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        '''Returns a new pool of worker processes, which each warm up when they start'''
+        return ProcessPoolExecutor(self.workers, initializer=_warm_up)
+
+    def close(self) -> None:
+        '''Stops the worker processes'''
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def solve(self, job: PuzzleJob, solver_name: str = 'bfs') -> Result:
+        '''Returns the result for a puzzle, solving it if nothing else has or is'''
+        if self._pool is None:
+            raise RuntimeError("The service hasn't been started")
+        if solver_name not in SOLVERS:
+            raise ValueError("Solver {} not recognized".format(solver_name))
+        name, board, translator = job
+        key = (get_puzzle_key(board, solver_name),
+               None if translator is None else tuple(sorted(translator.items())))
+        self.counts['requests'] += 1
+
+        if key in self._cache:
+            self.counts['cache_hits'] += 1
+            self._cache.move_to_end(key)
+            return dict(self._cache[key], name=name, cached=True)
+
+        future = self._running.get(key)
+        if future is None:
+            self.counts['solves'] += 1
+            future = asyncio.ensure_future(self._run(job, solver_name))
+            self._running[key] = future
+            future.add_done_callback(lambda done: self._finish_solve(key, done))
+        else:
+            self.counts['coalesced'] += 1
+        # shielded, so a client going away doesn't cancel the solve for everyone else waiting
+        result = await asyncio.shield(future)
+        return dict(result, name=name, cached=False)
+
+    async def _run(self, job: PuzzleJob, solver_name: str) -> Result:
+        '''Solves a puzzle in the pool, with a new pool and a second try if a worker process dies'''
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            return await loop.run_in_executor(pool, solve_puzzle, job, solver_name, False,
+                                              self.time_limit)
+        except BrokenProcessPool:
+            # every solve running in the pool fails at once, but only the first starts a new one
+            if self._pool is pool:
+                self._restart_pool()
+        if self._pool is None:
+            raise RuntimeError("The service was closed while solving")
+        # if this breaks the new pool too, it's probably the puzzle that kills the workers
+        return await loop.run_in_executor(self._pool, solve_puzzle, job, solver_name, False,
+                                          self.time_limit)
+
+    def _restart_pool(self) -> None:
+        '''Replaces a pool that has a dead worker process with a new one'''
+        self.counts['pool_restarts'] += 1
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._create_pool()
+
+    def _finish_solve(self, key: RequestKey, future: asyncio.Future) -> None:
+        '''Keeps the result of a solve that has finished, if it's known to be the best'''
+        del self._running[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        if future.result().get('status') in (FEASIBLE, UNKNOWN):
+            # a solve with more time (or less load) might do better
+            return
+        self._cache[key] = future.result()
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def handle_request(self, line: str) -> Dict[str, Any]:
+        '''Returns the response to one line from a client; anything that goes wrong is sent back'''
+        try:
+            definition = json.loads(line)
+            job = read_puzzle_job(line)
+            return await self.solve(job, definition.get('solver', 'bfs'))
+        except Exception as error: # pylint: disable=broad-except
+            self.counts['errors'] += 1
+            return {'error': '{}: {}'.format(type(error).__name__, error)}
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        '''Answers each line a client sends until it disconnects'''
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await self.handle_request(line.decode())
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(service: SolveService, host: str = 'localhost', port: int = 8765,
+                unix_path: Optional[str] = None) -> None:
+    '''Starts the service and answers clients until cancelled'''
+    await service.start()
+    try:
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(service.handle_connection, unix_path)
+        else:
+            server = await asyncio.start_server(service.handle_connection, host, port)
+        print("Serving on {}".format(unix_path or '{}:{}'.format(host, port)), flush=True)
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    '''Command line entry point; runs the service until interrupted'''
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='path of a Unix socket to listen on instead of TCP')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--cache-size', type=int, default=1024,
+                        help='the most results to keep in memory (default: 1024)')
+    parser.add_argument('--time-limit', type=float,
+                        help='seconds to give each solve before using the best solution so far')
+    parsed = parser.parse_args(arguments)
+
+    service = SolveService(parsed.workers, parsed.cache_size, parsed.time_limit)
+    try:
+        asyncio.run(serve(service, parsed.host, parsed.port, parsed.unix))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,20 @@
 '''Solvers for River Crossing Puzzles'''
 
 import random
+from collections import deque
 from copy import deepcopy
-from typing import List
-from node_solvers import BFSSolver as GeneralBFSSolver
-from framework import Board, Move, Iterable
+from typing import List, Optional, Callable, Deque, Dict, Iterator, Tuple, Union
+from node_solvers import (BFSSolver as GeneralBFSSolver, IDDFSSolver as GeneralIDDFSSolver,
+                          AStarSolver as GeneralAStarSolver, IDAStarSolver as GeneralIDAStarSolver,
+                          BidirectionalBFSSolver as GeneralBidirectionalBFSSolver,
+                          ParallelBFSSolver as GeneralParallelBFSSolver, BFSWorkerPool,
+                          ShortestPathsSolver as GeneralShortestPathsSolver, ShortestPaths,
+                          NodeSolver, BudgetedResult, CancellationToken, DEFAULT_TABLE_SIZE)
+from framework import Board, FrozenBoard, Move, Peg, StateKey, Iterable, check_planks, get_walk
+from bitboard import (CompactPuzzle, ComponentPuzzle, State, PlankMove, PlankMask, encode,
+                      encode_board, get_person_position, get_held_plank, get_plank_mask)
+
+Heuristic = Callable[[State], float]
 
 class RandomSolver:
     '''Solves a puzzle by randomly trying moves'''
@@ -28,13 +38,12 @@ class RandomSolver:
         self.board.make_move(move)
 
 
-class BFSSolver(GeneralBFSSolver[Board, Board, Move]): # pylint: disable=too-few-public-methods
+class BFSSolver(GeneralBFSSolver[Board, StateKey, Move]): # pylint: disable=too-few-public-methods
     '''BFSSolver for River Crossing'''
     def __init__(self) -> None:
         '''Defines the correct functions to use the general BFS solver, and sets it up'''
-        def namer(board: Board) -> Board:
-            # upgrade: this is expensive
-            return deepcopy(board)
+        def namer(board: Board) -> StateKey:
+            return board.get_state_key()
 
         def detector(board: Board) -> bool:
             return board.solved()
@@ -50,19 +59,37 @@ class BFSSolver(GeneralBFSSolver[Board, Board, Move]): # pylint: disable=too-few
         super().__init__(namer, detector, expander, follower)
 
 
-class PlankBFSSolver(GeneralBFSSolver[Board, Board, Move]): # pylint: disable=too-few-public-methods
+class FrozenBFSSolver( # pylint: disable=too-few-public-methods
+        GeneralBFSSolver[FrozenBoard, FrozenBoard, Move]):
+    '''
+    BFSSolver for River Crossing that searches FrozenBoards,
+    ...which share the parts of the puzzle that don't change instead of copying them.
+    '''
+    def __init__(self) -> None:
+        super().__init__(_frozen_namer, FrozenBoard.solved, FrozenBoard.get_moves,
+                         FrozenBoard.make_move)
+
+    def solve(self, start_info: Union[Board, FrozenBoard]) -> Optional[List[Move]]:
+        '''Returns the list of moves needed to solve the board; does not edit the board'''
+        if isinstance(start_info, Board):
+            start_info = FrozenBoard.from_board(start_info)
+        return super().solve(start_info)
+
+
+class PlankBFSSolver( # pylint: disable=too-few-public-methods
+        GeneralBFSSolver[Board, StateKey, Move]):
     '''
     Solver for making sure the planks are in the correct position -
     ...does not care about position of person.
     '''
     def __init__(self, target_board: Board):
         self.target_board = target_board
-        def namer(board: Board) -> Board:
-            # upgrade: this is expensive
-            return deepcopy(board)
+        def namer(board: Board) -> StateKey:
+            return board.get_state_key()
 
         def detector(board: Board) -> bool:
-            return set(board.planks) == set(self.target_board.planks)
+            # both are already sets, so nothing needs to be built to compare them
+            return board.planks == self.target_board.planks
 
         def expander(board: Board) -> Iterable[Move]:
             return board.get_moves()
@@ -73,3 +100,505 @@ class PlankBFSSolver(GeneralBFSSolver[Board, Board, Move]): # pylint: disable=to
             return new_board
 
         super().__init__(namer, detector, expander, follower)
+
+
+# a board and its Board.get_walks, which every step of the macro move search needs
+MacroNode = Tuple[Board, Dict[Peg, Peg]]
+
+class MacroMoveExpander:
+    '''
+    The functions for searching boards with macro moves: walking anywhere the person can reach
+    ...and then grabbing or placing a plank is a single move, so the walks aren't searched.
+    Boards that only differ in where the person is within the pegs they can walk between
+    ...have the same name, and searching these finds the fewest grab and place moves.
+    The nodes are MacroNodes (see make_node), so the walks are only found once for each board.
+    The moves are plank moves: the peg to walk to and the grab or place move to make there.
+    '''
+    @staticmethod
+    def make_node(board: Board) -> MacroNode:
+        '''Returns the node to start a search from the board with'''
+        return board, board.get_walks()
+
+    @staticmethod
+    def namer(node: MacroNode) -> StateKey:
+        '''Returns the board's state key with the person on the lowest peg they can walk to'''
+        board, walks = node
+        return (min(walks), board.held_plank, frozenset(board.planks))
+
+    @staticmethod
+    def detector(node: MacroNode) -> bool:
+        '''Returns boolean whether or not the person can walk to the finish'''
+        board, walks = node
+        return board.finish in walks
+
+    @staticmethod
+    def expander(node: MacroNode) -> List[PlankMove]:
+        '''Returns every grab and place move that can be made after walking somewhere'''
+        board, walks = node
+        ans = []
+        person_position = board.person_position
+        # the moves from each peg are found by moving the person there and back
+        for peg in walks:
+            board.person_position = peg
+            ans.extend([(peg, move) for move in board.get_moves() if move[0] != "walk"])
+        board.person_position = person_position
+        return ans
+
+    @staticmethod
+    def follower(node: MacroNode, plank_move: PlankMove) -> MacroNode:
+        '''Returns a new node after walking and then making the grab or place move'''
+        peg, move = plank_move
+        new_board = deepcopy(node[0])
+        new_board.person_position = peg
+        new_board.make_move(move)
+        return MacroMoveExpander.make_node(new_board)
+
+    @staticmethod
+    def expand_solution(board: Board, plank_moves: Iterable[PlankMove]) -> List[Move]:
+        '''Turns a solution of plank moves into a solution for the board, walks included'''
+        board = deepcopy(board)
+        ans: List[Move] = []
+        for peg, move in plank_moves:
+            for board_move in get_walk(board.get_walks(), peg) + [move]:
+                board.make_move(board_move)
+                ans.append(board_move)
+        ans.extend(get_walk(board.get_walks(), board.finish))
+        return ans
+
+
+class MacroBFSSolver: # pylint: disable=too-few-public-methods
+    '''
+    BFSSolver for River Crossing that searches boards with macro moves (see MacroMoveExpander),
+    ...so it finds the fewest grab and place moves instead of the fewest moves.
+    '''
+    def solve(self, board: Board) -> Optional[List[Move]]:
+        '''Returns the list of moves needed to solve the board; does not edit the board'''
+        solver: GeneralBFSSolver[MacroNode, StateKey, PlankMove] = GeneralBFSSolver(
+            MacroMoveExpander.namer, MacroMoveExpander.detector, MacroMoveExpander.expander,
+            MacroMoveExpander.follower)
+        plank_moves = solver.solve(MacroMoveExpander.make_node(board))
+        if plank_moves is None:
+            return None
+        return MacroMoveExpander.expand_solution(board, plank_moves)
+
+
+class PlankTargetSolver:
+    '''
+    Finds the fewest moves to get the planks where a target board has them, like PlankBFSSolver,
+    ...for many targets from the same starting board (like the boards at the steps of a solution).
+    Searches compact states breadth-first from the start, and keeps what it has searched
+    ...between targets: each target is found by looking its plank mask up in the first state
+    ...found with each plank mask, and the search only goes further if it isn't there yet.
+    What is kept is for one starting board, not for every board with the same pegs:
+    ...the fewest moves to a plank layout depend on where the person starts and what they hold,
+    ...so a search of plank layouts alone couldn't give them.
+    '''
+    def __init__(self, board: Board):
+        '''Takes the starting board (which isn't changed)'''
+        self.puzzle = CompactPuzzle(board)
+        self._peg_mask = sum(1 << peg for peg in self.puzzle.pegs)
+        self._start_state = self.puzzle.encode(board)
+        # {state: (parent state, move from parent)} for every state found other than the start
+        self._parents: Dict[State, Tuple[State, Move]] = {}
+        # states that have been found but not expanded, in breadth-first order
+        self._queue: Deque[State] = deque([self._start_state])
+        # {plank mask: the first state found with that plank mask}; since the search is
+        # ...breadth-first, no state with that plank mask has a shorter path from the start
+        self._first_with_planks: Dict[PlankMask, State] = {
+            get_plank_mask(self._start_state): self._start_state}
+
+    def get_target_mask(self, target_board: Board) -> PlankMask:
+        '''
+        Returns the plank mask of a target board.
+        Raises ValueError if it doesn't have the same pegs and geometry as the starting board,
+        ...or its planks couldn't be on the board (see framework.check_planks).
+        '''
+        if target_board.pegs != self.puzzle.pegs or target_board.geometry != self.puzzle.geometry:
+            raise ValueError("The target board doesn't have the same pegs and geometry "
+                             "as the starting board")
+        check_planks(target_board.planks, self._peg_mask, self.puzzle.geometry)
+        return get_plank_mask(encode(0, target_board.planks, 0, self.puzzle.geometry))
+
+    def solve(self, target_board: Board) -> Optional[List[Move]]:
+        '''
+        Returns the fewest moves from the starting board that leave the planks
+        ...where they are on the target board, or None if that can't be done.
+        '''
+        state = self._find(self.get_target_mask(target_board))
+        if state is None:
+            return None
+        moves = []
+        while state != self._start_state:
+            state, move = self._parents[state]
+            moves.append(move)
+        moves.reverse()
+        return moves
+
+    def can_reach(self, target_board: Board) -> bool:
+        '''Returns whether the planks can be moved to where they are on the target board'''
+        return self._find(self.get_target_mask(target_board)) is not None
+
+    def _find(self, target_mask: PlankMask) -> Optional[State]:
+        '''Searches until a state with the plank mask is found, and returns it (None if none)'''
+        puzzle = self.puzzle
+        parents = self._parents
+        queue = self._queue
+        first_with_planks = self._first_with_planks
+        while target_mask not in first_with_planks and queue:
+            state = queue.popleft()
+            for move in puzzle.get_moves(state):
+                child = puzzle.make_move(state, move)
+                if child not in parents and child != self._start_state:
+                    parents[child] = (state, move)
+                    queue.append(child)
+                    first_with_planks.setdefault(get_plank_mask(child), child)
+        return first_with_planks.get(target_mask)
+
+
+class CompactBFSSolver: # pylint: disable=too-few-public-methods
+    '''
+    BFSSolver for River Crossing that searches over compact integer states.
+    No Board objects are copied during the search; the states themselves are the names.
+    '''
+    def __init__(self, reduce_components: bool = False):
+        '''
+        reduce_components: if True, searches ComponentPuzzle states, which finds
+                           ...the fewest grab and place moves instead of the fewest moves
+        '''
+        self.reduce_components = reduce_components
+
+    def solve(self, board: Board) -> Optional[List[Move]]:
+        '''Returns the list of moves needed to solve the board; does not edit the board'''
+        if self.reduce_components:
+            component_puzzle = ComponentPuzzle(board)
+            component_solver: GeneralBFSSolver[State, State, PlankMove] = GeneralBFSSolver(
+                _state_namer, component_puzzle.solved, component_puzzle.get_moves,
+                component_puzzle.make_move)
+            return _expand(component_puzzle, board,
+                           component_solver.solve(component_puzzle.encode(board)))
+
+        puzzle = CompactPuzzle(board)
+        solver: GeneralBFSSolver[State, State, Move] = GeneralBFSSolver(
+            _state_namer, puzzle.solved, puzzle.get_moves, puzzle.make_move)
+        return solver.solve(puzzle.encode(board))
+
+
+class ParallelBFSSolver:
+    '''
+    BFSSolver for River Crossing that expands each level across worker processes.
+    Searches over compact states, which are cheap to send between processes.
+    The worker processes are started on the first solve and kept for later ones;
+    ...call close() (or use the solver in a `with` block) to stop them.
+    '''
+    def __init__(self, workers: Optional[int] = None):
+        '''workers: how many worker processes to use; None for one per CPU'''
+        self.workers = workers
+        self._pool: Optional[BFSWorkerPool] = None
+
+    def __enter__(self) -> 'ParallelBFSSolver':
+        return self
+
+    def __exit__(self, *exception_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        '''Stops the worker processes'''
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def solve(self, board: Board) -> Optional[List[Move]]:
+        '''Returns the list of moves needed to solve the board; does not edit the board'''
+        if self._pool is None or self._pool.closed:
+            self._pool = BFSWorkerPool(self.workers)
+        puzzle = CompactPuzzle(board)
+        solver: GeneralParallelBFSSolver[State, State, Move] = GeneralParallelBFSSolver(
+            _state_namer, puzzle.solved, puzzle.get_moves, puzzle.make_move, pool=self._pool)
+        return solver.solve(puzzle.encode(board))
+
+
+class BidirectionalBFSSolver: # pylint: disable=too-few-public-methods
+    '''
+    BFSSolver for River Crossing that also searches backwards from every goal state.
+    Searches over compact states; finds the same length of solution as BFSSolver.
+    '''
+    def solve(self, board: Board) -> Optional[List[Move]]:
+        '''Returns the list of moves needed to solve the board; does not edit the board'''
+        puzzle = CompactPuzzle(board)
+        solver: GeneralBidirectionalBFSSolver[State, State, Move] = GeneralBidirectionalBFSSolver(
+            _state_namer, puzzle.solved, puzzle.get_moves, puzzle.make_move,
+            puzzle.get_goal_states, puzzle.get_predecessors)
+        return solver.solve(puzzle.encode(board))
+
+
+class ShortestSolutionsSolver:
+    '''
+    Finds every shortest solution for River Crossing (see node_solvers.ShortestPathsSolver).
+    Searches over compact states.
+    '''
+    def __init__(self, reduce_components: bool = False):
+        '''
+        reduce_components: if True, searches ComponentPuzzle states, so the solutions are the ones
+                           ...with the fewest grab and place moves, and solutions that only differ
+                           ...in how the person walks between plank moves are only counted once
+        '''
+        self.reduce_components = reduce_components
+
+    def _search(self, board: Board) -> Tuple[Optional[ShortestPaths], Callable[[List], List[Move]]]:
+        '''Returns the shortest paths, and what turns each path into a solution for the board'''
+        if self.reduce_components:
+            component_puzzle = ComponentPuzzle(board)
+            component_solver: GeneralShortestPathsSolver[State, State, PlankMove] = \
+                GeneralShortestPathsSolver(_state_namer, component_puzzle.solved,
+                                           component_puzzle.get_moves, component_puzzle.make_move)
+            return (component_solver.search(component_puzzle.encode(board)),
+                    lambda plank_moves: component_puzzle.expand_solution(board, plank_moves))
+
+        puzzle = CompactPuzzle(board)
+        solver: GeneralShortestPathsSolver[State, State, Move] = GeneralShortestPathsSolver(
+            _state_namer, puzzle.solved, puzzle.get_moves, puzzle.make_move)
+        return solver.search(puzzle.encode(board)), list
+
+    def solve(self, board: Board) -> Optional[List[Move]]:
+        '''Returns the list of moves needed to solve the board; does not edit the board'''
+        return next(self.iter_solutions(board), None)
+
+    def count_solutions(self, board: Board) -> int:
+        '''Returns the number of shortest solutions (0 if there are none) without making them'''
+        paths, _ = self._search(board)
+        return 0 if paths is None else paths.count()
+
+    def iter_solutions(self, board: Board) -> Iterator[List[Move]]:
+        '''Yields every shortest solution, one at a time'''
+        paths, convert = self._search(board)
+        if paths is not None:
+            for path in paths:
+                yield convert(path)
+
+
+class IDDFSSolver(GeneralIDDFSSolver[Board, State, Move]):
+    '''
+    IDDFSSolver for River Crossing.
+    Makes and unmakes moves on a single copy of the board instead of copying it for every node.
+    '''
+    def __init__(self, max_depth: Optional[int] = None,
+                 table_size: Optional[int] = DEFAULT_TABLE_SIZE):
+        '''Defines the correct functions to use the general IDDFS solver, and sets it up'''
+        # where the person was before each move on the current path
+        self._previous_positions: List[Peg] = []
+        previous_positions = self._previous_positions
+
+        def detector(board: Board) -> bool:
+            return board.solved()
+
+        def expander(board: Board) -> Iterable[Move]:
+            return board.get_moves()
+
+        def follower(board: Board, move: Move) -> Board:
+            previous_positions.append(board.person_position)
+            board.make_move(move)
+            return board
+
+        def unfollower(board: Board, move: Move) -> Board:
+            board.unmake_move(move, previous_positions.pop())
+            return board
+
+        super().__init__(encode_board, detector, expander, follower, unfollower,
+                         max_depth, table_size)
+
+    def solve(self, start_info: Board) -> Optional[List[Move]]:
+        '''Returns the list of moves needed to solve the board; does not edit the board'''
+        try:
+            return super().solve(deepcopy(start_info))
+        finally:
+            # the search stops without going back when it finds the goal
+            self._previous_positions.clear()
+
+
+def _state_namer(state: State) -> State:
+    '''Compact states are already hashable and unique, so they are their own names'''
+    return state
+
+def _frozen_namer(board: FrozenBoard) -> FrozenBoard:
+    '''FrozenBoards can't change and their hashes are stored, so they are their own names'''
+    return board
+
+def _expand(component_puzzle: ComponentPuzzle, board: Board,
+            plank_moves: Optional[List[PlankMove]]) -> Optional[List[Move]]:
+    '''Turns a solution found with a ComponentPuzzle into a solution for the board'''
+    if plank_moves is None:
+        return None
+    return component_puzzle.expand_solution(board, plank_moves)
+
+def plank_move_cost(state: State, move: Move) -> int: # pylint: disable=unused-argument
+    '''Grab and place moves cost 1; walk moves are free (like in the River Crossing booklet)'''
+    return 0 if move[0] == "walk" else 1
+
+def zero_heuristic(state: State) -> int: # pylint: disable=unused-argument
+    '''Heuristic that knows nothing; makes A* behave like Dijkstra's algorithm'''
+    return 0
+
+
+class PlankMoveHeuristic: # pylint: disable=too-few-public-methods
+    '''
+    Lower bound on the number of grab and place moves left to solve a compact state.
+
+    Works out the fewest planks that have to be placed to connect the person to the finish
+    ...if planks on the board are free to walk on, any plank slot between two pegs
+    ...that is no longer than the longest plank can be used, and planks are allowed to cross.
+    Each of those planks has to be placed, and all but the held plank has to be grabbed first.
+
+    (Manhattan distance divided by the longest plank length is not a lower bound:
+    ...a single short plank can connect the person to planks that are already
+    ...most of the way there.)
+    '''
+    def __init__(self, puzzle: CompactPuzzle, start_state: State):
+        self.puzzle = puzzle
+        # grabbing and placing planks never changes their lengths,
+        # ...so the longest plank at the start is always the longest plank
+        plank_mask = get_plank_mask(start_state)
+        lengths = [length for slot, length in enumerate(puzzle.geometry.slot_lengths)
+                   if plank_mask >> slot & 1]
+        self.max_length = max(lengths + [get_held_plank(start_state)])
+
+    def __call__(self, state: State) -> float:
+        plank_mask = get_plank_mask(state)
+        start = get_person_position(state)
+
+        # 0-1 breadth-first search: walking costs nothing, placing costs 1
+        places_needed = {start: 0}
+        queue: Deque[Peg] = deque([start])
+        while queue:
+            peg = queue.popleft()
+            places = places_needed[peg]
+            if peg == self.puzzle.finish:
+                grabs = max(0, places - (1 if get_held_plank(state) else 0))
+                return places + grabs
+            for bit, other_peg, length, _ in self.puzzle.slots_at[peg]:
+                if plank_mask & bit:
+                    if places_needed.get(other_peg, places + 1) > places:
+                        places_needed[other_peg] = places
+                        queue.appendleft(other_peg)
+                elif length <= self.max_length and other_peg not in places_needed:
+                    places_needed[other_peg] = places + 1
+                    queue.append(other_peg)
+        # the finish can't be reached even when planks are allowed to cross
+        return float('inf')
+
+
+class AStarSolver: # pylint: disable=too-few-public-methods
+    '''
+    A* solver for River Crossing that finds solutions with the fewest grab and place moves.
+    Searches over compact states.
+    '''
+    def __init__(self, heuristic_creator: Callable[[CompactPuzzle, State], Heuristic] = PlankMoveHeuristic, # pylint: disable=line-too-long
+                 reduce_components: bool = False):
+        '''
+        heuristic_creator: takes the puzzle and the starting state
+                           ...and returns a heuristic for the states of that puzzle
+        reduce_components: if True, searches ComponentPuzzle states (a much smaller state space)
+        '''
+        self.heuristic_creator = heuristic_creator
+        self.reduce_components = reduce_components
+
+    def solve(self, board: Board) -> Optional[List[Move]]:
+        '''Returns the list of moves needed to solve the board; does not edit the board'''
+        if self.reduce_components:
+            component_puzzle = ComponentPuzzle(board)
+            start_state = component_puzzle.encode(board)
+            component_solver: GeneralAStarSolver[State, State, PlankMove] = GeneralAStarSolver(
+                _state_namer, component_puzzle.solved, component_puzzle.get_moves,
+                component_puzzle.make_move,
+                self.heuristic_creator(component_puzzle.puzzle, start_state))
+            return _expand(component_puzzle, board, component_solver.solve(start_state))
+
+        puzzle = CompactPuzzle(board)
+        start_state = puzzle.encode(board)
+        solver: GeneralAStarSolver[State, State, Move] = GeneralAStarSolver(
+            _state_namer, puzzle.solved, puzzle.get_moves, puzzle.make_move,
+            self.heuristic_creator(puzzle, start_state), plank_move_cost)
+        return solver.solve(start_state)
+
+
+class IDAStarSolver: # pylint: disable=too-few-public-methods
+    '''
+    IDA* solver for River Crossing that finds solutions with the fewest grab and place moves.
+    Searches over compact states, and only keeps the current path and a bounded table in memory.
+    '''
+    def __init__(self, heuristic_creator: Callable[[CompactPuzzle, State], Heuristic] = PlankMoveHeuristic, # pylint: disable=line-too-long
+                 max_cost: Optional[float] = None,
+                 table_size: Optional[int] = DEFAULT_TABLE_SIZE, reduce_components: bool = False):
+        '''
+        heuristic_creator and reduce_components are the same as for AStarSolver;
+        ...the rest is the same as for node_solvers.IDAStarSolver
+        '''
+        self.heuristic_creator = heuristic_creator
+        self.max_cost = max_cost
+        self.table_size = table_size
+        self.reduce_components = reduce_components
+
+    def solve(self, board: Board) -> Optional[List[Move]]:
+        '''Returns the list of moves needed to solve the board; does not edit the board'''
+        if self.reduce_components:
+            component_puzzle = ComponentPuzzle(board)
+            start_state = component_puzzle.encode(board)
+            component_solver: GeneralIDAStarSolver[State, State, PlankMove] = GeneralIDAStarSolver(
+                _state_namer, component_puzzle.solved, component_puzzle.get_moves,
+                component_puzzle.make_move,
+                self.heuristic_creator(component_puzzle.puzzle, start_state),
+                max_cost=self.max_cost, table_size=self.table_size)
+            return _expand(component_puzzle, board, component_solver.solve(start_state))
+
+        puzzle = CompactPuzzle(board)
+        start_state = puzzle.encode(board)
+        solver: GeneralIDAStarSolver[State, State, Move] = GeneralIDAStarSolver(
+            _state_namer, puzzle.solved, puzzle.get_moves, puzzle.make_move,
+            self.heuristic_creator(puzzle, start_state), plank_move_cost,
+            max_cost=self.max_cost, table_size=self.table_size)
+        return solver.solve(start_state)
+
+
+class BudgetedSolver:
+    '''
+    Solver for River Crossing that gives back the best it can do within a time limit,
+    ...a limit on nodes expanded, or until it's cancelled
+    ...(see node_solvers.NodeSolver.solve_within).
+    Searches over compact states, guided by a heuristic.
+    '''
+    def __init__(self, reduce_components: bool = False,
+                 heuristic_creator: Callable[[CompactPuzzle, State], Heuristic] = PlankMoveHeuristic): # pylint: disable=line-too-long
+        '''
+        reduce_components: if True, searches ComponentPuzzle states, so an OPTIMAL solution
+                           ...has the fewest grab and place moves instead of the fewest moves
+        heuristic_creator: the same as for AStarSolver; the heuristic can't ever overestimate
+                           ...the moves left, or OPTIMAL solutions might not be the shortest
+        '''
+        self.reduce_components = reduce_components
+        self.heuristic_creator = heuristic_creator
+
+    def solve_within(self, board: Board, time_limit: Optional[float] = None,
+                     node_limit: Optional[int] = None,
+                     token: Optional[CancellationToken] = None) -> BudgetedResult[Move]:
+        '''Returns the best result found within the budget; does not edit the board'''
+        if self.reduce_components:
+            component_puzzle = ComponentPuzzle(board)
+            start_state = component_puzzle.encode(board)
+            component_solver: NodeSolver[State, State, PlankMove] = NodeSolver(
+                _state_namer, component_puzzle.solved, component_puzzle.get_moves,
+                component_puzzle.make_move)
+            result = component_solver.solve_within(
+                start_state, time_limit, node_limit, token,
+                self.heuristic_creator(component_puzzle.puzzle, start_state))
+            return BudgetedResult(result.status, _expand(component_puzzle, board, result.solution),
+                                  result.nodes_expanded, result.wall_time)
+
+        puzzle = CompactPuzzle(board)
+        start_state = puzzle.encode(board)
+        solver: NodeSolver[State, State, Move] = NodeSolver(
+            _state_namer, puzzle.solved, puzzle.get_moves, puzzle.make_move)
+        return solver.solve_within(start_state, time_limit, node_limit, token,
+                                   self.heuristic_creator(puzzle, start_state))
+
+    def solve(self, board: Board) -> Optional[List[Move]]:
+        '''Returns the list of moves needed to solve the board, with no budget'''
+        return self.solve_within(board).solution
@@ -0,0 +1,148 @@
+#!/usr/local/bin/python3
+'''
+Exhaustive analysis of every state reachable from a River Crossing board.
+
+The whole state space is enumerated once, and then the distance to the goal
+...(the fewest moves needed to solve) is worked out for every state at once
+...by searching outwards from all of the solved states.
+After that, distances, hints and solutions from any reachable state are just table lookups.
+
+Needs NumPy.
+See terms.txt for the types of the different terms.
+'''
+
+from typing import Dict, List, Optional, Union
+import numpy as np
+from bitboard import CompactPuzzle, State
+from frontier import FrontierExpander
+from framework import Board, Move
+
+UNSOLVABLE = -1
+
+
+class StateSpace:
+    '''
+    Every state reachable from a board, with the distance from each state to the goal.
+    The states are kept as a sorted array of frontier.py keys (8 bytes each),
+    ...and a state's index in the tables is where its key is in that array.
+    '''
+    def __init__(self, board: Board):
+        self.puzzle = CompactPuzzle(board)
+        self._expander = FrontierExpander(self.puzzle)
+        start_state = self.puzzle.encode(board)
+
+        # while the states are being found, they're numbered in the order they are found;
+        # ...the list and the dictionary are only kept until the search is done
+        states: List[State] = [start_state]
+        indexes: Dict[State, int] = {start_state: 0}
+        # the graph of moves, as arrays of the indexes of the states each state leads to:
+        # ...the moves from state i lead to neighbors[offsets[i]:offsets[i + 1]]
+        # ...(in the same order as CompactPuzzle.get_moves)
+        neighbors: List[int] = []
+        offsets = [0]
+        # states grows as new states are found, so it's gone through by index
+        state_index = 0
+        while state_index < len(states):
+            state = states[state_index]
+            state_index += 1
+            for move in self.puzzle.get_moves(state):
+                child = self.puzzle.make_move(state, move)
+                index = indexes.get(child)
+                if index is None:
+                    index = indexes[child] = len(states)
+                    states.append(child)
+                neighbors.append(index)
+            offsets.append(len(neighbors))
+        del indexes
+
+        # renumber the states in the order of their keys
+        keys = np.array([self._expander.to_key(state) for state in states], dtype=np.uint64)
+        del states
+        order = np.argsort(keys)
+        self.keys = keys[order]
+        new_indexes = np.empty(len(order), dtype=np.int32)
+        new_indexes[order] = np.arange(len(order), dtype=np.int32)
+        old_offsets = np.array(offsets, dtype=np.int64)
+        del offsets
+        old_neighbors = np.array(neighbors, dtype=np.int32)
+        del neighbors
+        self._neighbors = new_indexes[old_neighbors[_get_ranges(old_offsets[order],
+                                                                old_offsets[order + 1])]]
+        self._offsets = np.concatenate([[0], np.cumsum(np.diff(old_offsets)[order])])
+
+        self.distances = np.full(len(self.keys), UNSOLVABLE, dtype=np.int32)
+        # which of the moves from each state to make to get closer to the goal;
+        # ...-1 if there isn't one
+        self._hints = np.full(len(self.keys), -1, dtype=np.int8)
+        self._find_distances()
+
+    def get_state(self, index: int) -> State:
+        '''Returns the compact state at an index of the tables'''
+        return self._expander.to_state(int(self.keys[index]))
+
+    def _find_distances(self) -> None:
+        '''Breadth-first search out from every solved state at once'''
+        # every move can be undone, so the states that lead to a state are the states it leads to
+        # the person is on the finish in exactly the solved states
+        layer = np.flatnonzero(self._expander.get_people(self.keys) == self.puzzle.finish)
+        self.distances[layer] = 0
+        distance = 0
+        while layer.size:
+            distance += 1
+            neighbors = self._neighbors[_get_ranges(self._offsets[layer], self._offsets[layer + 1])]
+            layer = np.unique(neighbors[self.distances[neighbors] == UNSOLVABLE])
+            self.distances[layer] = distance
+
+        # the hint for each state is its first move to a state that is one move closer
+        degrees = np.diff(self._offsets)
+        sources = np.repeat(np.arange(len(self.keys)), degrees)
+        source_distances = self.distances[sources]
+        closer = (source_distances > 0) & (self.distances[self._neighbors] == source_distances - 1)
+        closer_moves = np.flatnonzero(closer)
+        hinted, first = np.unique(sources[closer_moves], return_index=True)
+        self._hints[hinted] = closer_moves[first] - self._offsets[hinted]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _get_index(self, position: Union[Board, State]) -> int:
+        '''Returns the index of a board or state; raises KeyError if it isn't reachable'''
+        state = self.puzzle.encode(position) if isinstance(position, Board) else position
+        key = self._expander.to_key(state)
+        index = int(np.searchsorted(self.keys, np.uint64(key)))
+        if index == len(self.keys) or int(self.keys[index]) != key:
+            raise KeyError(state)
+        return index
+
+    def get_distance(self, position: Union[Board, State]) -> Optional[int]:
+        '''Returns the fewest moves needed to solve the board or state, or None if it can't be'''
+        distance = int(self.distances[self._get_index(position)])
+        return None if distance == UNSOLVABLE else distance
+
+    def get_hint(self, position: Union[Board, State]) -> Optional[Move]:
+        '''Returns a move on a shortest solution, or None if solved or unsolvable'''
+        index = self._get_index(position)
+        if self._hints[index] < 0:
+            return None
+        return self.puzzle.get_moves(self.get_state(index))[self._hints[index]]
+
+    def get_solution(self, position: Union[Board, State]) -> Optional[List[Move]]:
+        '''Returns a shortest solution from the board or state, or None if it can't be solved'''
+        index = self._get_index(position)
+        if self.distances[index] == UNSOLVABLE:
+            return None
+        ans = []
+        state = self.get_state(index)
+        while not self.puzzle.solved(state):
+            move = self.get_hint(state)
+            assert move is not None
+            ans.append(move)
+            state = self.puzzle.make_move(state, move)
+        return ans
+
+
+def _get_ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    '''Returns np.arange(start, end) for every start and end, all joined together'''
+    lengths = ends - starts
+    ranges_before = np.cumsum(lengths) - lengths
+    return np.arange(lengths.sum()) - np.repeat(ranges_before - starts, lengths)
@@ -0,0 +1,42 @@
+'''Tests for reading and solving puzzle files with batch.py; run with `python3 -m pytest`'''
+
+import json
+import pytest
+from batch import read_puzzle_job, read_puzzle_jobs, solve_puzzles
+from puzzles import Beginner1
+
+BEGINNER1 = {'name': 'Beginner1', 'start': 32, 'finish': 4, 'pegs': [4, 14, 13, 23, 22, 32],
+             'planks': [[32, 22], [22, 23]]}
+
+
+def test_puzzle_lines_are_read():
+    '''A good line is read into the board it describes'''
+    name, board, translator = read_puzzle_job(json.dumps(BEGINNER1))
+    assert (name, translator) == ('Beginner1', None)
+    assert board.get_state_key() == Beginner1().get_state_key()
+
+@pytest.mark.parametrize('changes, message', [
+    ({'planks': [[32, 14]]}, "can't go from"),
+    ({'planks': [[4, 14], [4, 14]]}, 'twice'),
+    ({'pegs': [4, 9, 14, 32], 'planks': [[4, 14]]}, 'goes over a peg'),
+    ({'start': 31}, 'Peg 31'),
+    ({'pegs': [4, 14, 99]}, 'Peg 99'),
+    ({'held_plank': 4}, 'length 4'),
+    ({'planks': None}, 'Not a puzzle'),
+])
+def test_bad_puzzle_lines_are_rejected(changes, message):
+    '''Lines that can't be on a board raise ValueError'''
+    with pytest.raises(ValueError, match=message):
+        read_puzzle_job(json.dumps(dict(BEGINNER1, **changes)))
+
+def test_bad_puzzle_lines_become_results():
+    '''Reading a file carries on after a bad line, which gets a result saying what's wrong'''
+    lines = [json.dumps(BEGINNER1), '', 'not json',
+             json.dumps(dict(BEGINNER1, name='Bad', start=31))]
+    jobs = list(read_puzzle_jobs(lines))
+    assert jobs[0][0] == 'Beginner1'
+    assert jobs[1]['name'] == '3' and jobs[1]['error'].startswith('Line 3: ')
+    assert (jobs[2]['name'], jobs[2]['solved']) == ('Bad', False)
+    results = {result['name']: result for result in solve_puzzles(jobs, workers=1)}
+    assert results['Beginner1']['solved'] and len(results['Beginner1']['solution']) == 11
+    assert results['Bad'] == jobs[2]
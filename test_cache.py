@@ -0,0 +1,85 @@
+'''Tests for the solution cache of cache.py; run with `python3 -m pytest`'''
+
+import cache
+from cache import CachedSolver, SolutionCache, get_puzzle_key
+from puzzles import Beginner1, EasyMovePuzzle, Intermediate13, SimplePuzzle
+from solvers import CompactBFSSolver
+
+
+class CountingSolver: # pylint: disable=too-few-public-methods
+    '''A solver that counts how many times it's asked to solve'''
+    def __init__(self):
+        self.solves = 0
+
+    def solve(self, board):
+        '''Returns the shortest solution of the board'''
+        self.solves += 1
+        return CompactBFSSolver().solve(board)
+
+
+def test_solutions_are_cached():
+    '''A solution that was put in the cache is got back, and nothing else is'''
+    with SolutionCache(':memory:') as solution_cache:
+        solution = CompactBFSSolver().solve(Beginner1())
+        assert solution_cache.get(Beginner1(), 'bfs') == (False, None)
+        solution_cache.put(Beginner1(), 'bfs', solution)
+        solution_cache.put(SimplePuzzle(), 'bfs', None)
+        assert solution_cache.get(Beginner1(), 'bfs') == (True, solution)
+        assert solution_cache.get(SimplePuzzle(), 'bfs') == (True, None)
+        assert solution_cache.get(Beginner1(), 'astar') == (False, None)
+        assert solution_cache.get(Intermediate13(), 'bfs') == (False, None)
+        assert len(solution_cache) == 2
+
+def test_cached_solver_solves_each_puzzle_once():
+    '''CachedSolver only asks its solver about puzzles it hasn't seen'''
+    solver = CountingSolver()
+    with SolutionCache(':memory:') as solution_cache:
+        cached_solver = CachedSolver(solver, solution_cache)
+        first = cached_solver.solve(Beginner1())
+        assert cached_solver.solve(Beginner1()) == first
+        assert len(first) == 11 and solver.solves == 1
+
+def test_least_recently_used_solutions_are_thrown_out():
+    '''When the cache is full, the solution used longest ago goes first'''
+    with SolutionCache(':memory:', max_entries=2) as solution_cache:
+        solution_cache.put(SimplePuzzle(), 'bfs', [])
+        solution_cache.put(EasyMovePuzzle(), 'bfs', [])
+        assert solution_cache.get(SimplePuzzle(), 'bfs')[0]
+        solution_cache.put(Beginner1(), 'bfs', [])
+        assert len(solution_cache) == 2
+        assert not solution_cache.get(EasyMovePuzzle(), 'bfs')[0]
+        assert solution_cache.get(SimplePuzzle(), 'bfs')[0]
+        assert solution_cache.get(Beginner1(), 'bfs')[0]
+        # putting a solution that is already there doesn't throw anything out
+        solution_cache.put(Beginner1(), 'bfs', [])
+        assert len(solution_cache) == 2
+
+def test_uses_last_between_runs(tmp_path):
+    '''Which solutions were used recently is saved with the cache'''
+    path = str(tmp_path / 'cache.sqlite')
+    with SolutionCache(path, max_entries=2) as solution_cache:
+        solution_cache.put(SimplePuzzle(), 'bfs', [])
+        solution_cache.put(EasyMovePuzzle(), 'bfs', [])
+        solution_cache.get(SimplePuzzle(), 'bfs')
+    with SolutionCache(path, max_entries=2) as solution_cache:
+        solution_cache.put(Beginner1(), 'bfs', [])
+        assert solution_cache.get(SimplePuzzle(), 'bfs')[0]
+        assert not solution_cache.get(EasyMovePuzzle(), 'bfs')[0]
+
+def test_cache_is_thrown_out_when_the_move_rules_change(tmp_path, monkeypatch):
+    '''Solutions found with different move rules might not work any more'''
+    path = str(tmp_path / 'cache.sqlite')
+    with SolutionCache(path) as solution_cache:
+        solution_cache.put(Beginner1(), 'bfs', [])
+    with SolutionCache(path) as solution_cache:
+        assert len(solution_cache) == 1
+    monkeypatch.setattr(cache, 'MOVE_RULES_VERSION', cache.MOVE_RULES_VERSION + 1)
+    with SolutionCache(path) as solution_cache:
+        assert len(solution_cache) == 0
+        assert solution_cache.get(Beginner1(), 'bfs') == (False, None)
+
+def test_puzzle_keys_depend_on_the_puzzle_and_solver():
+    '''Keys are the same for the same puzzle and solver, and different otherwise'''
+    assert get_puzzle_key(Beginner1(), 'bfs') == get_puzzle_key(Beginner1(), 'bfs')
+    assert get_puzzle_key(Beginner1(), 'bfs') != get_puzzle_key(Beginner1(), 'astar')
+    assert get_puzzle_key(Beginner1(), 'bfs') != get_puzzle_key(Intermediate13(), 'bfs')
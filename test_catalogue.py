@@ -0,0 +1,61 @@
+'''Tests for the catalogue format of catalogue.py; run with `python3 -m pytest`'''
+
+import pytest
+from batch import get_catalogue_jobs
+from catalogue import PuzzleCatalogue, format_puzzle, make_board, parse_puzzle_line
+from framework import Board
+from geometry import get_geometry
+
+
+def _assert_same_board(board, other_board):
+    '''Checks that two boards are the same puzzle in the same state'''
+    assert other_board.get_state_key() == board.get_state_key()
+    assert (other_board.finish, other_board.pegs) == (board.finish, board.pegs)
+    assert other_board.geometry == board.geometry
+
+@pytest.mark.parametrize('name, board, translator', list(get_catalogue_jobs()),
+                         ids=lambda value: value if isinstance(value, str) else '')
+def test_puzzles_round_trip(name, board, translator):
+    '''Every puzzle in puzzles.py reads back from its catalogue line as the same puzzle'''
+    line = format_puzzle(name, board, translator)
+    parsed_name, record = parse_puzzle_line(line)
+    assert parsed_name == name
+    _assert_same_board(board, make_board(record))
+    assert record[-1] == translator
+    assert format_puzzle(name, make_board(record), record[-1]) == line
+
+def test_held_plank_and_geometry_round_trip():
+    '''Held planks and other geometries are written as options and read back'''
+    geometry = get_geometry(3, 4, (1, 2))
+    board = Board(1, 12, [1, 3, 4, 10, 12], [(1, 4), (10, 12)], 2, geometry)
+    line = format_puzzle('small', board)
+    assert 'held=2' in line and 'size=3x4' in line and 'lengths=1,2' in line
+    _assert_same_board(board, make_board(parse_puzzle_line(line)[1]))
+
+def test_catalogue_reads_every_line():
+    '''Comments and blank lines are skipped, and every puzzle can be looked up by name'''
+    lines = ['# a comment', ''] + [format_puzzle(name, board, translator)
+                                   for name, board, translator in get_catalogue_jobs()]
+    catalogue = PuzzleCatalogue(lines)
+    assert len(catalogue) == len(lines) - 2
+    for name, board, _ in get_catalogue_jobs():
+        _assert_same_board(board, catalogue[name])
+
+@pytest.mark.parametrize('line, message', [
+    ('A 1 3 4e 1-3,1-2', 'goes over a peg'),
+    ('A 2 12 1144 2-12,6-8', 'crosses another plank'),
+    ('A 1 3 4e 1-2 held', 'held'),
+    ('A 1 3 4e 1-2 color=red', 'Unknown options'),
+    ('A 1 3 4e 1-2,1-2', 'twice'),
+    ('A 1 9 4e 1-2', 'Peg 9'),
+    ('A 1 3 4e', 'needs'),
+])
+def test_bad_lines_are_rejected(line, message):
+    '''Lines that aren't puzzles that could be on a board say what's wrong with them'''
+    with pytest.raises(ValueError, match=message):
+        parse_puzzle_line(line)
+
+def test_errors_say_which_line():
+    '''A bad line in a catalogue says which line it is'''
+    with pytest.raises(ValueError, match='Line 2'):
+        PuzzleCatalogue(['# fine', 'A 1 3 4e 1-2 held'])
@@ -0,0 +1,55 @@
+'''Tests for the FrozenBoards of framework.py; run with `python3 -m pytest`'''
+
+import copy
+import pickle
+import pytest
+from framework import FrozenBoard, StaticPuzzle
+from geometry import get_geometry
+from node_solvers import ParallelBFSSolver
+from puzzles import Expert40, SimplePuzzle
+from solvers import _frozen_namer # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize('puzzle_class', [SimplePuzzle, Expert40])
+def test_frozen_board_pickles(puzzle_class):
+    '''A FrozenBoard pickles to an equal board with the same moves'''
+    frozen_board = FrozenBoard.from_board(puzzle_class())
+    loaded = pickle.loads(pickle.dumps(frozen_board))
+    assert loaded == frozen_board
+    assert hash(loaded) == hash(frozen_board)
+    assert loaded.planks == frozen_board.planks
+    assert loaded.get_moves() == frozen_board.get_moves()
+    assert loaded.to_board().get_state_key() == frozen_board.to_board().get_state_key()
+
+def test_frozen_boards_pickled_together_share_their_puzzle():
+    '''Boards sent together still share one StaticPuzzle instead of a copy each'''
+    frozen_board = FrozenBoard.from_board(Expert40())
+    children = [frozen_board.make_move(move) for move in frozen_board.get_moves()]
+    loaded = pickle.loads(pickle.dumps(children))
+    assert loaded == children
+    assert all(child.puzzle is loaded[0].puzzle for child in loaded)
+
+def test_static_puzzle_pickles():
+    '''A StaticPuzzle pickles through its __init__, keeping the shared geometry'''
+    puzzle = StaticPuzzle(3, [1, 3, 7, 9], get_geometry(3, 3, (1, 2)))
+    loaded = pickle.loads(pickle.dumps(puzzle))
+    assert loaded == puzzle
+    assert loaded.pegs == puzzle.pegs
+    assert loaded.geometry is puzzle.geometry
+
+def test_copies_are_the_same_object():
+    '''Boards and puzzles that can't change are their own copies'''
+    frozen_board = FrozenBoard.from_board(SimplePuzzle())
+    assert copy.copy(frozen_board) is frozen_board
+    assert copy.deepcopy(frozen_board) is frozen_board
+    assert copy.deepcopy(frozen_board.puzzle) is frozen_board.puzzle
+
+def test_frozen_boards_can_be_searched_in_parallel():
+    '''FrozenBoards can be sent to worker processes and are their own names there'''
+    solver = ParallelBFSSolver(_frozen_namer, FrozenBoard.solved, FrozenBoard.get_moves,
+                               FrozenBoard.make_move, workers=2)
+    try:
+        solution = solver.solve(FrozenBoard.from_board(Expert40()))
+    finally:
+        solver.close()
+    assert len(solution) == 103
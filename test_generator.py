@@ -0,0 +1,55 @@
+'''Tests for the puzzle generator of generator.py; run with `python3 -m pytest`'''
+
+import json
+import random
+import pytest
+from batch import get_catalogue_jobs, read_puzzle_job
+from framework import count_grab_and_place
+from generator import create_random_board, generate_puzzles, rate_puzzle
+from solvers import CompactBFSSolver, ShortestSolutionsSolver
+
+GENERATED = list(generate_puzzles(40, seed=0, workers=2))
+
+
+def test_seeds_give_the_same_boards():
+    '''Boards only depend on the seed'''
+    created = 0
+    for seed in range(10):
+        first, second = (create_random_board(random.Random(seed), 14, (1, 2, 3))
+                         for _ in range(2))
+        if first is None:
+            assert second is None
+            continue
+        created += 1
+        assert first.get_state_key() == second.get_state_key()
+        assert (first.finish, first.pegs) == (second.finish, second.pegs)
+    assert created
+
+def test_generated_puzzles_are_solvable():
+    '''Every generated puzzle can be solved in the grab and place moves its rating says'''
+    assert GENERATED
+    for definition in GENERATED:
+        _, board, _ = read_puzzle_job(json.dumps(definition))
+        solution = CompactBFSSolver(reduce_components=True).solve(board)
+        assert solution is not None
+        assert count_grab_and_place(solution) == definition['rating']['plank_moves']
+
+@pytest.mark.parametrize('definition', GENERATED, ids=lambda definition: definition['name'])
+def test_solution_counts_match_shortest_solutions(definition):
+    '''The rating's count of shortest solutions is the count ShortestSolutionsSolver finds'''
+    _, board, _ = read_puzzle_job(json.dumps(definition))
+    count = ShortestSolutionsSolver(reduce_components=True).count_solutions(board)
+    assert definition['rating']['solutions'] == count
+
+@pytest.mark.parametrize('board', [board for _, board, _ in get_catalogue_jobs()],
+                         ids=[name for name, _, _ in get_catalogue_jobs()])
+def test_catalogue_solution_counts_match_shortest_solutions(board):
+    '''The count of shortest solutions of each puzzle in puzzles.py agrees too'''
+    count = ShortestSolutionsSolver(reduce_components=True).count_solutions(board)
+    assert rate_puzzle(board).solutions == count
+
+@pytest.mark.parametrize('peg_count', [0, 1])
+def test_boards_need_a_start_and_a_finish(peg_count):
+    '''Asking for fewer than 2 pegs is a clear error'''
+    with pytest.raises(ValueError, match='at least 2 pegs'):
+        create_random_board(random.Random(0), peg_count, (1,))
@@ -0,0 +1,86 @@
+'''Tests for the checked replays of replay.py; run with `python3 -m pytest`'''
+
+from copy import deepcopy
+import pytest
+from framework import count_grab_and_place
+from puzzles import Expert40, EXPERT40_SOLUTION, EXPERT40_TRANSLATOR
+from replay import InvalidStepError, SolutionReplayer, parse_rc_solution
+from solvers import CompactBFSSolver
+from util import convert_to_rc_solution, invert_dictionary
+
+RC_TO_PEG = invert_dictionary(EXPERT40_TRANSLATOR)
+
+
+def replay_moves(board, moves):
+    '''Returns a copy of the board with the moves made, checking that each one can be'''
+    board = deepcopy(board)
+    for move in moves:
+        assert move in board.get_moves()
+        board.make_move(move)
+    return board
+
+def test_real_solution_solves_the_puzzle():
+    '''The RC solution string in puzzles.py is valid, and its moves solve the board'''
+    replayer = SolutionReplayer(Expert40(), EXPERT40_SOLUTION, RC_TO_PEG)
+    assert replayer.validate() == {'valid': True, 'solved': True, 'steps': 31}
+    moves = replayer.get_moves()
+    assert count_grab_and_place(moves) == 2 * len(replayer)
+    assert replay_moves(Expert40(), moves).solved()
+
+def test_solver_solutions_replay_as_rc_strings():
+    '''A solver's solution turned into an RC string replays to a solved board'''
+    board = Expert40()
+    solution = CompactBFSSolver().solve(board)
+    rc_solution = convert_to_rc_solution(solution, EXPERT40_TRANSLATOR, board.person_position)
+    replayer = SolutionReplayer(board, rc_solution, RC_TO_PEG)
+    assert replayer.validate()['solved']
+    assert replay_moves(board, replayer.get_moves()).solved()
+
+@pytest.mark.parametrize('solution, step, message', [
+    ('IX-UX', 0, 'no plank'),
+    ('UX-IX AK-KM', 1, "can't reach"),
+    ('UX-IX GI-G', 1, "isn't a grabbed plank"),
+    ('UX-IX GI-GZ', 1, "isn't a peg"),
+    ('UX-IX GI-23', 1, "can't be moved"),
+])
+def test_illegal_steps_are_rejected(solution, step, message):
+    '''A step that breaks the rules says which step it was'''
+    with pytest.raises(InvalidStepError, match=message) as error:
+        list(SolutionReplayer(Expert40(), solution, RC_TO_PEG))
+    assert error.value.step == step
+
+def test_illegal_steps_are_reported_by_validate():
+    '''validate gives back the bad step instead of raising'''
+    steps = EXPERT40_SOLUTION.split()
+    solution = ' '.join(steps[:10] + ['IX-UX'] + steps[10:])
+    result = SolutionReplayer(Expert40(), solution, RC_TO_PEG).validate()
+    assert (result['valid'], result['solved'], result['step']) == (False, False, 10)
+    assert result['error'].startswith('Step 11: ')
+
+def test_checkpoints_give_the_same_boards():
+    '''Going to any step, in any order, gives the board the steps lead to'''
+    boards = [board.get_state_key()
+              for board in SolutionReplayer(Expert40(), EXPERT40_SOLUTION, RC_TO_PEG)]
+    assert len(boards) == 32
+    replayer = SolutionReplayer(Expert40(), EXPERT40_SOLUTION, RC_TO_PEG, checkpoint_interval=4)
+    for step in (31, 0, 17, 4, 30, 3, 16, 31):
+        assert replayer.get_board_at_step(step).get_state_key() == boards[step]
+    with pytest.raises(IndexError):
+        replayer.get_board_at_step(32)
+
+def test_replaying_resumes_after_a_bad_step():
+    '''The steps before a bad step can still be gone to after it's found'''
+    steps = EXPERT40_SOLUTION.split()
+    solution = ' '.join(steps[:10] + ['IX-UX'])
+    replayer = SolutionReplayer(Expert40(), solution, RC_TO_PEG, checkpoint_interval=4)
+    with pytest.raises(InvalidStepError):
+        replayer.get_board_at_step(11)
+    good = SolutionReplayer(Expert40(), EXPERT40_SOLUTION, RC_TO_PEG)
+    for step in (10, 9, 8):
+        assert (replayer.get_board_at_step(step).get_state_key()
+                == good.get_board_at_step(step).get_state_key())
+
+def test_rc_strings_are_parsed_into_planks():
+    '''Each step is the plank grabbed and where it's placed, with lowercase allowed'''
+    assert parse_rc_solution(' ux-ix  GI-GQ ', RC_TO_PEG) == [((15, 30), (12, 15)),
+                                                             ((12, 22), (22, 24))]
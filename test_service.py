@@ -0,0 +1,70 @@
+'''Tests for the solve service of service.py; run with `python3 -m pytest`'''
+
+import asyncio
+from puzzles import Beginner1, Expert40
+from service import SolveService
+
+BEGINNER1_JOB = ('Beginner1', Beginner1(), None)
+
+
+def run_with_service(test, **options):
+    '''Runs a coroutine function with a started SolveService, and returns what it returns'''
+    async def run():
+        service = SolveService(workers=2, **options)
+        await service.start()
+        try:
+            return await test(service)
+        finally:
+            service.close()
+    return asyncio.run(run())
+
+def test_puzzles_asked_for_together_are_solved_once():
+    '''Everyone asking for a puzzle that's being solved waits for the same solve'''
+    async def test(service):
+        results = await asyncio.gather(*(service.solve((name, Beginner1(), None))
+                                         for name in ('first', 'second', 'third')))
+        assert [result['name'] for result in results] == ['first', 'second', 'third']
+        assert all(len(result['solution']) == 11 and not result['cached'] for result in results)
+        return service.counts
+    counts = run_with_service(test)
+    assert (counts['requests'], counts['solves'], counts['coalesced']) == (3, 1, 2)
+
+def test_solved_puzzles_are_cached():
+    '''A puzzle that has been solved before is answered from the cache'''
+    async def test(service):
+        first = await service.solve(BEGINNER1_JOB)
+        second = await service.solve(BEGINNER1_JOB)
+        assert not first['cached'] and second['cached']
+        assert second['solution'] == first['solution']
+        assert second['wall_time'] == first['wall_time']
+        # a different translator changes the RC solution, so it's a different request
+        translator = {peg: chr(ord('A') + peg) for peg in Beginner1().pegs}
+        assert 'rc_solution' in await service.solve(('Beginner1', Beginner1(), translator))
+        return service.counts
+    counts = run_with_service(test)
+    assert (counts['solves'], counts['cache_hits']) == (2, 1)
+
+def test_results_that_might_not_be_the_best_are_not_cached():
+    '''FEASIBLE and UNKNOWN results are solved again next time'''
+    async def test(service):
+        for _ in range(2):
+            result = await service.solve(('Expert40', Expert40(), None))
+            assert result['status'] in ('feasible', 'unknown') and not result['cached']
+        return service.counts
+    counts = run_with_service(test, time_limit=0)
+    assert (counts['solves'], counts['cache_hits']) == (2, 0)
+
+def test_pool_is_restarted_when_a_worker_dies():
+    '''A dead worker process breaks the pool, so a new one is started and the solve still works'''
+    async def test(service):
+        pool = service._pool # pylint: disable=protected-access
+        # with every worker process dead, the solve can't be run by one that is still alive
+        for process in pool._processes.values(): # pylint: disable=protected-access
+            process.kill()
+            process.join()
+        result = await service.solve(BEGINNER1_JOB)
+        assert len(result['solution']) == 11
+        assert service._pool is not pool # pylint: disable=protected-access
+        return service.counts
+    counts = run_with_service(test)
+    assert (counts['pool_restarts'], counts['errors']) == (1, 0)
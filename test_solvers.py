@@ -0,0 +1,212 @@
+'''Tests for the solvers of solvers.py; run with `python3 -m pytest`'''
+
+from copy import deepcopy
+import pytest
+from bitboard import CompactPuzzle
+from external import ExternalBFSSolver
+from framework import Board, count_grab_and_place, get_plank
+from frontier import VectorBFSSolver
+from generator import rate_puzzle
+from node_solvers import OPTIMAL, FEASIBLE, UNSOLVABLE, UNKNOWN, CancellationToken
+from node_solvers import BFSSolver as GeneralBFSSolver
+from puzzles import (SimplePuzzle, EasyMovePuzzle, Beginner1, Intermediate13, Expert31, Expert39,
+                     Expert40)
+from solvers import (BFSSolver, FrozenBFSSolver, MacroBFSSolver, CompactBFSSolver,
+                     ParallelBFSSolver, BidirectionalBFSSolver, BudgetedSolver,
+                     ShortestSolutionsSolver, IDDFSSolver, AStarSolver, IDAStarSolver,
+                     PlankBFSSolver, PlankTargetSolver)
+from solvers import _state_namer # pylint: disable=protected-access
+from state_space import StateSpace
+
+# {puzzle: (fewest moves, fewest grab and place moves)}
+SHORTEST = {
+    SimplePuzzle: (2, 0),
+    EasyMovePuzzle: (4, 2),
+    Beginner1: (11, 6),
+    Intermediate13: (36, 22),
+    Expert31: (56, 32),
+    Expert39: (76, 42),
+    Expert40: (103, 62),
+}
+
+def assert_solves(board, solution):
+    '''Checks that every move of the solution can be made, and that it solves the board'''
+    board = deepcopy(board)
+    for move in solution:
+        assert move in board.get_moves()
+        board.make_move(move)
+    assert board.solved()
+
+# {name: (solver, whether it finds the fewest grab and place moves instead of the fewest moves)}
+SOLVERS = {
+    'bfs': (BFSSolver(), False),
+    'frozen-bfs': (FrozenBFSSolver(), False),
+    'compact-bfs': (CompactBFSSolver(), False),
+    'component-bfs': (CompactBFSSolver(reduce_components=True), True),
+    'macro-bfs': (MacroBFSSolver(), True),
+    'vector-bfs': (VectorBFSSolver(), False),
+    'external-bfs': (ExternalBFSSolver(), False),
+    'bidirectional-bfs': (BidirectionalBFSSolver(), False),
+    'iddfs': (IDDFSSolver(), False),
+    'shortest-solutions': (ShortestSolutionsSolver(), False),
+    'component-shortest-solutions': (ShortestSolutionsSolver(reduce_components=True), True),
+    'budgeted': (BudgetedSolver(), False),
+    'astar': (AStarSolver(), True),
+    'component-astar': (AStarSolver(reduce_components=True), True),
+    'idastar': (IDAStarSolver(), True),
+    'component-idastar': (IDAStarSolver(reduce_components=True), True),
+}
+
+def get_unsolvable_board():
+    '''Returns a board with no planks to reach the finish with'''
+    return Board(1, 3, [1, 3], [])
+
+
+@pytest.mark.parametrize('puzzle_class', list(SHORTEST), ids=lambda cls: cls.__name__)
+@pytest.mark.parametrize('solver_name', list(SOLVERS))
+def test_solvers_find_shortest_solutions(solver_name, puzzle_class):
+    '''Every solver finds a shortest solution without changing the board'''
+    solver, counts_plank_moves = SOLVERS[solver_name]
+    board = puzzle_class()
+    state_key = board.get_state_key()
+    solution = solver.solve(board)
+    assert board.get_state_key() == state_key
+    assert_solves(board, solution)
+    if counts_plank_moves:
+        assert count_grab_and_place(solution) == SHORTEST[puzzle_class][1]
+    else:
+        assert len(solution) == SHORTEST[puzzle_class][0]
+
+@pytest.mark.parametrize('puzzle_class', list(SHORTEST), ids=lambda cls: cls.__name__)
+def test_parallel_bfs_finds_shortest_solutions(puzzle_class):
+    '''The pool of worker processes finds a solution with the fewest moves'''
+    board = puzzle_class()
+    with ParallelBFSSolver(workers=2) as solver:
+        solution = solver.solve(board)
+    assert_solves(board, solution)
+    assert len(solution) == SHORTEST[puzzle_class][0]
+
+@pytest.mark.parametrize('puzzle_class', list(SHORTEST), ids=lambda cls: cls.__name__)
+def test_state_space_finds_shortest_solutions(puzzle_class):
+    '''The distance table gives the fewest moves, and a solution that long'''
+    board = puzzle_class()
+    state_space = StateSpace(board)
+    assert state_space.get_distance(board) == SHORTEST[puzzle_class][0]
+    solution = state_space.get_solution(board)
+    assert_solves(board, solution)
+    assert len(solution) == SHORTEST[puzzle_class][0]
+
+@pytest.mark.parametrize('solver_name', list(SOLVERS))
+def test_solvers_find_unsolvable_boards(solver_name):
+    '''Every solver returns None for a board with no solution'''
+    solver, _ = SOLVERS[solver_name]
+    assert solver.solve(get_unsolvable_board()) is None
+
+@pytest.mark.parametrize('puzzle_class', list(SHORTEST), ids=lambda cls: cls.__name__)
+def test_budgeted_solver_without_a_budget_is_optimal(puzzle_class):
+    '''With nothing to stop it, solve_within finds the fewest moves and says so'''
+    board = puzzle_class()
+    result = BudgetedSolver().solve_within(board)
+    assert result.status == OPTIMAL
+    assert_solves(board, result.solution)
+    assert len(result.solution) == SHORTEST[puzzle_class][0]
+
+@pytest.mark.parametrize('puzzle_class', list(SHORTEST), ids=lambda cls: cls.__name__)
+def test_budgeted_solver_with_components_is_optimal(puzzle_class):
+    '''Searching component states, solve_within finds the fewest grab and place moves'''
+    board = puzzle_class()
+    result = BudgetedSolver(reduce_components=True).solve_within(board)
+    assert result.status == OPTIMAL
+    assert_solves(board, result.solution)
+    assert count_grab_and_place(result.solution) == SHORTEST[puzzle_class][1]
+
+@pytest.mark.parametrize('node_limit', [1, 200, 1000, 5000])
+def test_budgeted_solver_keeps_to_a_node_limit(node_limit):
+    '''No more nodes are expanded than the limit, and any solution found works'''
+    board = Expert40()
+    result = BudgetedSolver().solve_within(board, node_limit=node_limit)
+    assert result.nodes_expanded <= node_limit
+    if result.solution is None:
+        assert result.status == UNKNOWN
+    else:
+        assert result.status in (FEASIBLE, OPTIMAL)
+        assert_solves(board, result.solution)
+        assert len(result.solution) >= SHORTEST[Expert40][0]
+
+def test_budgeted_solver_gets_shorter_with_more_budget():
+    '''A bigger budget never gives a longer solution'''
+    lengths = [len(BudgetedSolver().solve_within(Expert40(), node_limit=node_limit).solution)
+               for node_limit in (5000, 10000, None)]
+    assert lengths == sorted(lengths, reverse=True)
+    assert lengths[-1] == SHORTEST[Expert40][0]
+
+def test_budgeted_solver_stops_when_cancelled():
+    '''A token that is already cancelled stops the solve before anything is expanded'''
+    token = CancellationToken()
+    token.cancel()
+    result = BudgetedSolver().solve_within(Expert40(), token=token)
+    assert (result.status, result.solution, result.nodes_expanded) == (UNKNOWN, None, 0)
+
+def test_budgeted_solver_finds_unsolvable_boards():
+    '''Searching every node without finding a goal proves the board is unsolvable'''
+    result = BudgetedSolver().solve_within(get_unsolvable_board())
+    assert (result.status, result.solution) == (UNSOLVABLE, None)
+
+
+@pytest.mark.parametrize('puzzle_class', [Beginner1, Intermediate13, Expert39])
+def test_plank_target_solver_matches_plank_bfs(puzzle_class):
+    '''Each target is reached in as many moves as PlankBFSSolver needs for it'''
+    start_board = puzzle_class()
+    solver = PlankTargetSolver(start_board)
+    target_board = deepcopy(start_board)
+    for move in CompactBFSSolver().solve(start_board):
+        target_board.make_move(move)
+        solution = solver.solve(target_board)
+        assert solver.can_reach(target_board)
+        assert len(solution) == len(PlankBFSSolver(target_board).solve(start_board))
+        reached_board = deepcopy(start_board)
+        for solution_move in solution:
+            reached_board.make_move(solution_move)
+        assert reached_board.planks == target_board.planks
+
+def test_plank_target_solver_rejects_other_puzzles():
+    '''Targets from a different puzzle can't be searched for'''
+    solver = PlankTargetSolver(Beginner1())
+    with pytest.raises(ValueError, match='same pegs'):
+        solver.solve(Intermediate13())
+
+@pytest.mark.parametrize('plank', [(4, 32), (4, 9)])
+def test_plank_target_solver_rejects_planks_that_cant_be_there(plank):
+    '''Targets with planks that can't be on the board are rejected'''
+    start_board = Beginner1()
+    target_board = deepcopy(start_board)
+    target_board.planks.add(get_plank(*plank))
+    with pytest.raises(ValueError):
+        PlankTargetSolver(start_board).solve(target_board)
+
+def test_shortest_solutions_count_each_plank_move_sequence_once():
+    '''Walking different ways between the same grab and place moves isn't another solution'''
+    board = Board(6, 3, [1, 2, 3, 6, 7], [(1, 2), (1, 6), (6, 7), (2, 7)])
+    solver = ShortestSolutionsSolver(reduce_components=True)
+    solutions = [tuple(solution) for solution in solver.iter_solutions(board)]
+    assert len(set(solutions)) == len(solutions)
+    assert solver.count_solutions(board) == len(solutions) == rate_puzzle(board).solutions == 4
+
+def test_solver_stats_count_the_search():
+    '''The stats of a search that has to go through every node match the nodes and moves'''
+    # the person can only walk between 32 and 22, and pick up or put down the plank at either:
+    # ...4 nodes, with 6 moves between them
+    board = Board(32, 4, [4, 14, 13, 23, 22, 32], [(22, 32)])
+    puzzle = CompactPuzzle(board)
+    solver = GeneralBFSSolver(_state_namer, puzzle.solved, puzzle.get_moves, puzzle.make_move)
+    stats = solver.enable_stats()
+    assert solver.solve(puzzle.encode(board)) is None
+    assert (stats.nodes_expanded, stats.nodes_generated) == (4, 6)
+    # every move but the 3 that first reach the other nodes finds a node already found
+    assert stats.duplicates_pruned == 3
+    # walking to 22 and picking up the plank at 32 are the second level
+    assert stats.peak_frontier == 2
+    assert stats.calls['namer'] == stats.calls['detector'] == 7
+    solver.disable_stats()
+    solver.solve(puzzle.encode(board))
+    assert stats.nodes_expanded == 4
@@ -51,6 +51,7 @@ class SolutionStepper: # pylint: disable=too-few-public-methods
     '''
     Class for stepping through River Crossing solution strings -
     Helpful for debugging
+    (replay.SolutionReplayer also checks that the moves are allowed, and is faster for many steps)
     '''
     def __init__(self, base_board_creator: Callable[[], Board],
                  solution_string: RiverCrossingSolution,